@@ -0,0 +1,152 @@
+import os
+import hashlib
+from datetime import datetime
+
+import serialization
+
+# --- 정렬 결과(materialized view) 저장소 ----------------------------------
+# process_files 결과를 timer_logs/<user>/<lecture>/.aligned/ 아래에 저장한다.
+# 파일 이름이 (기록 파일, SRT 해시, 기록 파일 해시, 정렬 버전) 을 모두 담고 있어서
+# 입력 중 하나라도 바뀌면 자동으로 다른 키가 되고, 이전 결과는 더 이상 쓰이지 않는다.
+# 기록 파일을 수정/삭제하는 경로에서는 invalidate() 로 오래된 결과를 지운다.
+
+# 정렬 알고리즘이나 artifact 형식이 바뀔 때 올린다.
+# v2: 부분 재정렬을 위해 cues / windows / texts 를 함께 저장
+# v3: 새 SRT 토크나이저 (CRLF 등을 다르게 나누므로 같은 SRT 에서도 자막 목록이 달라진다)
+ALIGNMENT_VERSION = 3
+
+ARTIFACT_DIRNAME = ".aligned"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return content_hash(f.read())
+
+
+def _artifact_dir(base_dir, lecture):
+    return os.path.join(base_dir, lecture, ARTIFACT_DIRNAME)
+
+
+def _record_stem(record):
+    return record[:-5] if record.endswith(".json") else record
+
+
+def _artifact_name(record, srt_hash, record_hash):
+    return f"{_record_stem(record)}.{srt_hash[:16]}.{record_hash[:16]}.v{ALIGNMENT_VERSION}.json"
+
+
+def _parse_name(name):
+    """artifact 파일 이름 -> (record stem, srt hash, record hash, version) 또는 None"""
+    parts = name[:-5].rsplit(".", 3) if name.endswith(".json") else []
+    if len(parts) != 4 or not parts[3].startswith("v"):
+        return None
+    return parts[0], parts[1], parts[2], parts[3][1:]
+
+
+def save(base_dir, lecture, record, srt_hash, record_hash, result, cues, cue_stats=None, calibration=None):
+    """alignment.align() 결과와 자막 목록 저장
+    (cue_stats: 롤링 자막 중복 제거 통계, calibration: calibration.calibrate() 의 시간 보정 정보)"""
+    directory = _artifact_dir(base_dir, lecture)
+    os.makedirs(directory, exist_ok=True)
+    artifact = {
+        "alignment_version": ALIGNMENT_VERSION,
+        "lecture": lecture,
+        "record": record,
+        "srt_sha256": srt_hash,
+        "record_sha256": record_hash,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "cues": [list(c) for c in cues],
+        "windows": result["windows"],
+        "texts": result["texts"],
+        "slides": result["slides"],
+    }
+    if cue_stats is not None:
+        artifact["cue_stats"] = cue_stats
+    if calibration is not None:
+        artifact["calibration"] = calibration
+    serialization.write_file(os.path.join(directory, _artifact_name(record, srt_hash, record_hash)), artifact)
+    return artifact
+
+
+def _read(path, record_hash):
+    try:
+        artifact = serialization.read_file(path)
+    except Exception:
+        return None
+    return artifact if artifact.get("record_sha256") == record_hash else None
+
+
+def iter_artifacts(base_dir, lecture, record, record_hash):
+    """기록 파일(현재 해시 기준)의 정렬 결과들을 최신순으로 반환 (SRT 별로 하나씩)"""
+    directory = _artifact_dir(base_dir, lecture)
+    if not os.path.isdir(directory):
+        return
+    stem = _record_stem(record)
+    candidates = []
+    for name in os.listdir(directory):
+        key = _parse_name(name)
+        if key and key[0] == stem and key[2] == record_hash[:16] and key[3] == str(ALIGNMENT_VERSION):
+            path = os.path.join(directory, name)
+            candidates.append((os.path.getmtime(path), path))
+    for _, path in sorted(candidates, reverse=True):
+        artifact = _read(path, record_hash)
+        if artifact is not None:
+            yield artifact
+
+
+def load(base_dir, lecture, record, record_hash, srt_hash=None):
+    """현재 기록 파일 해시에 맞는 정렬 결과를 반환. 없으면 None.
+
+    srt_hash 를 생략하면 (SRT 를 다시 올리지 않은 경우) 가장 최근 결과를 돌려준다.
+    """
+    if srt_hash is None:
+        return next(iter_artifacts(base_dir, lecture, record, record_hash), None)
+    path = os.path.join(_artifact_dir(base_dir, lecture), _artifact_name(record, srt_hash, record_hash))
+    return _read(path, record_hash) if os.path.exists(path) else None
+
+
+def latest_for_srt(base_dir, lecture, record, srt_hash):
+    """기록 파일 해시와 상관없이, 같은 SRT 로 만든 가장 최근 정렬 결과 (부분 재정렬용)"""
+    directory = _artifact_dir(base_dir, lecture)
+    if not os.path.isdir(directory):
+        return None
+    stem = _record_stem(record)
+    candidates = []
+    for name in os.listdir(directory):
+        key = _parse_name(name)
+        if key and key[0] == stem and key[1] == srt_hash[:16] and key[3] == str(ALIGNMENT_VERSION):
+            path = os.path.join(directory, name)
+            candidates.append((os.path.getmtime(path), path))
+    for _, path in sorted(candidates, reverse=True):
+        try:
+            artifact = serialization.read_file(path)
+        except Exception:
+            continue
+        if artifact.get("srt_sha256") == srt_hash:
+            return artifact
+    return None
+
+
+def invalidate(base_dir, lecture, record, keep_record_hash=None):
+    """기록 파일의 정렬 결과 중 keep_record_hash 와 맞지 않는 것 (생략 시 전부) 삭제"""
+    directory = _artifact_dir(base_dir, lecture)
+    if not os.path.isdir(directory):
+        return 0
+    stem = _record_stem(record)
+    removed = 0
+    for name in os.listdir(directory):
+        key = _parse_name(name)
+        if not key or key[0] != stem:
+            continue
+        if keep_record_hash is not None and key[2] == keep_record_hash[:16] and key[3] == str(ALIGNMENT_VERSION):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+        except OSError:
+            pass
+    return removed
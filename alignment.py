@@ -0,0 +1,104 @@
+from bisect import bisect_left, bisect_right
+
+import aligned_store
+import calibration
+from record_schema import validate_records
+
+# --- 기록 <-> 자막 정렬 ----------------------------------------------------
+# 슬라이드 구간 [start_ms, end_ms] 안에 완전히 들어가는 자막을 모아 슬라이드 텍스트로 만든다.
+# 자막은 start 기준으로 정렬된 인덱스를 만들어 두고 bisect 로 구간을 찾는다.
+#
+# 한 슬라이드의 텍스트는 (구간, 자막) 만의 함수이므로, 기록을 일부만 고쳤을 때는
+# 이전 결과에서 구간이 같은 슬라이드의 텍스트를 그대로 재사용하고
+# 바뀐 구간만 다시 계산하면 된다 (realign).
+# 시간 보정 (calibration.py) 을 거친 결과는 구간이 보정된 좌표로 저장되어 있다.
+
+
+def build_cue_index(cues):
+    """cues: [(start_ms, end_ms, text)] -> (정렬된 start 목록, 원래 순서의 인덱스 목록)"""
+    order = sorted(range(len(cues)), key=lambda i: cues[i][0])
+    starts = [cues[i][0] for i in order]
+    return starts, order
+
+
+def window_text(cues, cue_index, start_ms, end_ms):
+    """구간 안에 완전히 들어가는 자막 텍스트를 원래 자막 순서대로 공백으로 합침"""
+    starts, order = cue_index
+    lo = bisect_left(starts, start_ms)
+    hi = bisect_right(starts, end_ms)
+    hits = sorted(i for i in order[lo:hi] if cues[i][1] <= end_ms)
+    return ' '.join(cues[i][2] for i in hits)
+
+
+def record_windows(records):
+    """validate_records 로 검증된 레코드 목록 -> [(slide_number, start_ms, end_ms)]"""
+    return [(record['slide_number'], record['start_ms'], record['end_ms']) for record in records]
+
+
+def _result(windows, texts):
+    slides = [
+        {'Slide Number': number, 'Text': text}
+        for (number, _, _), text in zip(windows, texts)
+        if text  # 텍스트가 있는 경우에만 추가
+    ]
+    return {'windows': [list(w) for w in windows], 'texts': texts, 'slides': slides}
+
+
+def align(records, cues, cue_index=None):
+    """전체 정렬. {'windows', 'texts', 'slides'} 반환"""
+    if cue_index is None:
+        cue_index = build_cue_index(cues)
+    windows = record_windows(records)
+    texts = [window_text(cues, cue_index, start, end) for _, start, end in windows]
+    return _result(windows, texts)
+
+
+def realign(previous, records, cues, cue_index=None):
+    """이전 정렬 결과를 바탕으로 바뀐 구간만 다시 계산.
+
+    previous 는 align()/realign() 의 결과(또는 같은 키를 가진 artifact)다.
+    반환값에 'changed' (다시 계산한 슬라이드 수)가 추가된다.
+    """
+    known = {}
+    for (_, start, end), text in zip(previous.get('windows', []), previous.get('texts', [])):
+        known[(start, end)] = text
+
+    windows = record_windows(records)
+    texts = []
+    changed = 0
+    for _, start, end in windows:
+        text = known.get((start, end))
+        if text is None:
+            if cue_index is None:
+                cue_index = build_cue_index(cues)
+            text = window_text(cues, cue_index, start, end)
+            known[(start, end)] = text
+            changed += 1
+        texts.append(text)
+
+    result = _result(windows, texts)
+    result['changed'] = changed
+    return result
+
+
+def carry_over(base_dir, lecture, old_record, old_record_hash, new_record, new_record_hash, records):
+    """기록 파일이 수정(또는 다른 이름으로 저장)되었을 때, 이전 기록 파일의 정렬 결과들을
+    새 기록 기준으로 부분 재정렬하여 저장. 갱신한 결과 수를 반환."""
+    try:
+        records = validate_records(records, lecture)['records']
+    except ValueError:
+        return 0  # 잘못된 시간이 있는 기록은 SRT 를 다시 파싱할 때 오류를 보여준다
+    carried = 0
+    for artifact in aligned_store.iter_artifacts(base_dir, lecture, old_record, old_record_hash):
+        cues = [tuple(c) for c in artifact.get('cues', [])]
+        aligned_records, time_fit = records, None
+        if 'calibration' in artifact:
+            # 보정해서 만든 결과는 고친 기록으로 다시 보정한다 (보정값이 같으면 바뀐 구간만 다시 계산됨)
+            aligned_records, time_fit = calibration.calibrate(records, cues)
+        result = realign(artifact, aligned_records, cues)
+        aligned_store.save(
+            base_dir, lecture, new_record, artifact['srt_sha256'], new_record_hash, result, cues,
+            artifact.get('cue_stats'), time_fit,
+        )
+        carried += 1
+    return carried
@@ -0,0 +1,127 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import serialization
+import catalog
+from record_schema import upgrade
+
+# --- 강의별 세션 통계 -----------------------------------------------------
+# 한 강의의 모든 기록 파일을 병렬로 읽어 하나의 columnar DataFrame 으로 만들고,
+# 집계는 pandas/NumPy 벡터 연산으로 계산한다.
+# GitHub 저장소를 쓰더라도 로컬 미러(mirror.py)를 읽는다.
+# 파일 목록과 내용 해시는 사용자 카탈로그(catalog.py)에서 가져오고, 결과는
+# (파일 이름, 해시) 집합을 fingerprint 로 캐시하므로 파일이 바뀌지 않았다면 다시 볼 때 파일을 읽지 않는다.
+
+_MAX_WORKERS = 8
+
+_CACHE = {}  # (user_id, lecture) -> (fingerprint, stats)
+_CACHE_LOCK = threading.Lock()
+
+FRAME_COLUMNS = ["session", "session_date", "slide_number", "slide_title", "start_ms", "end_ms", "duration_ms"]
+
+
+def _local_sources(base_dir, lecture):
+    """[(filename, path, version)] — version 은 카탈로그에 기록된 파일 내용 해시"""
+    return [
+        (name, os.path.join(base_dir, lecture, name), entry["sha256"])
+        for name, entry in catalog.records(base_dir, lecture).items()
+    ]
+
+
+def _load_payload(lecture, path):
+    try:
+        return upgrade(serialization.read_file(path), lecture)
+    except Exception:
+        return None  # 깨진 파일은 통계에서 제외
+
+
+def _ms_or_nan(record, key):
+    value = record.get(key)
+    return value if isinstance(value, int) else np.nan
+
+
+def build_frame(sessions):
+    """[(session name, v2 payload)] -> 레코드 한 행씩 담은 columnar DataFrame"""
+    names, numbers, titles, starts, ends = [], [], [], [], []
+    for name, payload in sessions:
+        for record in payload.get("records", []):
+            names.append(name)
+            numbers.append(record.get("slide_number"))
+            titles.append(record.get("slide_title") or "")
+            starts.append(_ms_or_nan(record, "start_ms"))
+            ends.append(_ms_or_nan(record, "end_ms"))
+
+    start_ms = np.asarray(starts, dtype="float64")
+    end_ms = np.asarray(ends, dtype="float64")
+    session = pd.Series(names, dtype="object")
+    return pd.DataFrame({
+        "session": session,
+        # 파일 이름 규칙: YYYY-MM-DD_HHMMSS.json
+        "session_date": pd.to_datetime(session.str.slice(0, 17), format="%Y-%m-%d_%H%M%S", errors="coerce"),
+        "slide_number": pd.to_numeric(pd.Series(numbers, dtype="object"), errors="coerce"),
+        "slide_title": pd.Series(titles, dtype="object"),
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "duration_ms": end_ms - start_ms,
+    }, columns=FRAME_COLUMNS)
+
+
+def compute_stats(frame, top_n=10):
+    """슬라이드별 평균 시간, 가장 오래 걸린 슬라이드, 세션별 전체 길이 추이"""
+    valid = frame[frame["duration_ms"].ge(0) & frame["slide_number"].notna()]
+
+    per_slide = (
+        valid.groupby("slide_number")["duration_ms"]
+        .agg(["mean", "median", "std", "max", "count"])
+        .rename(columns={"count": "sessions"})
+        .sort_index()
+    )
+    per_slide[["mean", "median", "std", "max"]] = per_slide[["mean", "median", "std", "max"]] / 1000.0
+
+    slowest = per_slide.sort_values("mean", ascending=False).head(top_n)
+
+    sessions = (
+        valid.groupby("session")
+        .agg(
+            session_date=("session_date", "first"),
+            slides=("slide_number", "count"),
+            first_ms=("start_ms", "min"),
+            last_ms=("end_ms", "max"),
+            recorded_ms=("duration_ms", "sum"),
+        )
+        .sort_values(["session_date", "first_ms"])
+    )
+    sessions["total_min"] = (sessions["last_ms"] - sessions["first_ms"]) / 60000.0
+    sessions["recorded_min"] = sessions["recorded_ms"] / 60000.0
+
+    return {
+        "frame": frame,
+        "per_slide": per_slide,
+        "slowest": slowest,
+        "sessions": sessions[["session_date", "slides", "total_min", "recorded_min"]],
+    }
+
+
+def lecture_stats(user_id, lecture, base_dir):
+    """강의 하나의 통계. 기록 파일이 바뀌지 않았으면 캐시된 결과를 그대로 반환"""
+    sources = _local_sources(base_dir, lecture)
+    fingerprint = frozenset((name, version) for name, _, version in sources)
+
+    cache_key = (user_id, lecture)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(cache_key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        payloads = list(pool.map(lambda src: _load_payload(lecture, src[1]), sources))
+    sessions = [(src[0], payload) for src, payload in zip(sources, payloads) if payload]
+
+    stats = compute_stats(build_frame(sessions))
+    with _CACHE_LOCK:
+        _CACHE[cache_key] = (fingerprint, stats)
+    return stats
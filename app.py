@@ -1,9 +1,10 @@
 import streamlit as st
-from slide_timer import lecture_timer_tab
-from srt_parser import srt_parser_tab
-from settings import settings_tab
 from auth import validate_user, register_user
 
+# 탭 모듈(slide_timer / srt_parser / settings)은 pandas, numpy 등 무거운 의존성을
+# 끌고 오므로 로그인 후 해당 탭을 그릴 때 import 한다. 로그인 화면은 이것들을 import 하지 않는다.
+# (import 시간 측정: python benchmarks/import_time.py)
+
 st.set_page_config(
 page_title="Slide Scribe",
 page_icon="📝",
@@ -46,6 +47,48 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def sync_storage(user_id):
+    """GitHub 저장소를 쓰면 로컬 미러(timer_logs/<user>)를 원격과 맞춘다.
+
+    처음 한 번은 동기화가 끝날 때까지 기다리고, 이후에는 SYNC_INTERVAL 마다 백그라운드에서 맞춘다.
+    """
+    from github_storage import github_enabled
+    if not github_enabled():
+        return
+    import mirror
+    import background
+    from utils import get_user_base_dir
+
+    base_dir = get_user_base_dir()
+    if not mirror.has_manifest(base_dir):
+        with st.spinner("GitHub 기록 동기화 중..."):
+            try:
+                mirror.sync(user_id, base_dir)
+            except Exception as e:
+                st.warning(f"GitHub 기록을 동기화하지 못했습니다: {e}")
+    elif mirror.needs_sync(user_id):
+        background.executor().submit(mirror.sync, user_id, base_dir, False)
+
+
+def drop_stale_listings():
+    """사용자 데이터 세대 (shared_state) 가 지난 rerun 이후 바뀌었으면 세션에 캐시된 강의/파일 목록을 버린다.
+
+    기록 저장, 강의 추가/삭제, mirror 동기화 등은 모두 카탈로그를 고치며 세대를 올린다.
+    공유 저장소를 쓰면 다른 프로세스 (replica) 에서 바뀐 것도 여기서 반영된다.
+    """
+    import shared_state
+    from utils import get_user_base_dir
+
+    generation = shared_state.generation(get_user_base_dir())
+    previous = st.session_state.get('data_generation')
+    st.session_state.data_generation = generation
+    if previous is None or previous == generation:
+        return
+    st.session_state.pop('lecture_names', None)
+    for key in [k for k in st.session_state if str(k).startswith("json_files_")]:
+        del st.session_state[key]
+
+
 def main():
     st.title('Slide Scribe')
     st.markdown('Made by 차유진')
@@ -63,6 +106,10 @@ def main():
             if submitted:
                 if validate_user(username, password):
                     st.session_state.user_id = username
+                    # 첫 화면을 막지 않고 강의 목록과 최근 기록을 미리 읽어 둔다
+                    from background import start_prefetch
+                    from utils import get_user_base_dir
+                    start_prefetch(username, get_user_base_dir())
                     st.rerun()
                 else:
                     st.error("아이디 또는 비밀번호가 틀렸습니다.")
@@ -90,6 +137,9 @@ def main():
                 register_form()
             return
         
+        sync_storage(st.session_state.user_id)
+        drop_stale_listings()
+
         # 세션 상태 초기화
         if 'result_df' not in st.session_state:
             st.session_state.result_df = None
@@ -99,15 +149,28 @@ def main():
         # st.markdown('Made by 차유진')
         # 탭 생성
         tab1, tab2, tab3 = st.tabs(["⏱️ Slide Timer", "📜 SRT Parser", "⚙️ Settings"])
-        
-        with tab1:
-            lecture_timer_tab()
-        
-        with tab2:
-            srt_parser_tab()
-            
-        with tab3:
-            settings_tab()
+
+        # 관리자가 Settings 에서 프로파일링을 켜 두었으면 이번 rerun 을 탭 함수별로 프로파일링한다
+        import profiling
+        with profiling.rerun(st.session_state.user_id):
+            with tab1:
+                from slide_timer import lecture_timer_tab
+                with profiling.section("lecture_timer_tab"):
+                    lecture_timer_tab()
+
+            with tab2:
+                from srt_parser import srt_parser_tab
+                with profiling.section("srt_parser_tab"):
+                    srt_parser_tab()
+
+            with tab3:
+                from settings import settings_tab
+                with profiling.section("settings_tab"):
+                    settings_tab()
+
+        # 이번 rerun 의 세션 메모리 사용량 기록 (예산을 넘거나 오래 안 쓴 큰 값은 디스크로 내보냄)
+        import session_memory
+        session_memory.account(st.session_state.user_id)
     except Exception as e:
         st.error(f"Error in main function: {e}")
 
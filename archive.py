@@ -0,0 +1,146 @@
+import os
+import sys
+import zipfile
+import argparse
+import tempfile
+import posixpath
+
+import serialization
+import catalog
+from aligned_store import file_hash
+from record_schema import validate_records
+
+# --- 강의 / 사용자 전체 기록 zip 내보내기·가져오기 --------------------------
+# zip 안의 경로는 항상 "<lecture>/<record>.json" 이다. 강의 하나만 내보내도
+# 같은 구조이므로, 가져올 때는 어느 쪽이든 같은 방식으로 처리한다.
+#
+# 내보내기는 파일을 하나씩 디스크에서 읽어 압축하며, 결과는 SpooledTemporaryFile
+# 에 쓰므로 일정 크기를 넘으면 임시 파일로 넘어간다 (메모리 사용량이 zip 크기에 비례하지 않음).
+# 가져오기는 zip 멤버를 하나씩 읽어 validate_records 로 검증하고 바로 표준 v2 형식으로 저장한다.
+
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+MAX_MEMBER_BYTES = 20 * 1024 * 1024
+MAX_MEMBERS = 5000
+
+
+def _lecture_dirs(base_dir, lecture=None):
+    if lecture is not None:
+        return [lecture] if os.path.isdir(os.path.join(base_dir, lecture)) else []
+    if not os.path.isdir(base_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(base_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(base_dir, name))
+    )
+
+
+def export_zip(base_dir, lecture=None, out=None):
+    """base_dir(timer_logs/<user>) 의 기록을 zip 으로 내보냄. lecture 를 주면 그 강의만.
+
+    out 을 생략하면 SpooledTemporaryFile 을 만들어 처음 위치로 되감아 반환한다.
+    """
+    if out is None:
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for lecture_name in _lecture_dirs(base_dir, lecture):
+            lecture_dir = os.path.join(base_dir, lecture_name)
+            # 빈 강의도 목록이 옮겨지도록 디렉토리 항목을 넣는다
+            zf.writestr(zipfile.ZipInfo(f"{lecture_name}/"), b"")
+            for name in sorted(os.listdir(lecture_dir)):
+                path = os.path.join(lecture_dir, name)
+                if name.endswith(".json") and os.path.isfile(path):
+                    zf.write(path, f"{lecture_name}/{name}")
+    out.seek(0)
+    return out
+
+
+def _member_target(name):
+    """zip 멤버 이름 -> (lecture, filename). 디렉토리면 filename 은 None. 허용되지 않으면 ValueError"""
+    normalized = posixpath.normpath(name.replace("\\", "/"))
+    parts = [p for p in normalized.split("/") if p]
+    if (
+        name.startswith("/") or not parts or len(parts) > 2
+        or any(p in (".", "..") or p.startswith(".") for p in parts)
+    ):
+        raise ValueError(f"허용되지 않는 경로입니다: {name}")
+    if len(parts) == 1:
+        if name.endswith("/"):
+            return parts[0], None
+        raise ValueError(f"강의 폴더 밖의 파일입니다: {name}")
+    if not parts[1].endswith(".json"):
+        raise ValueError(f"JSON 파일이 아닙니다: {name}")
+    return parts[0], parts[1]
+
+
+def _read_member(zf, info):
+    if info.file_size > MAX_MEMBER_BYTES:
+        raise ValueError(f"파일이 너무 큽니다: {info.filename}")
+    with zf.open(info) as src:
+        data = src.read(MAX_MEMBER_BYTES + 1)
+    if len(data) > MAX_MEMBER_BYTES:
+        raise ValueError(f"파일이 너무 큽니다: {info.filename}")
+    return data
+
+
+def import_zip(base_dir, source, lecture=None):
+    """zip 의 기록 파일들을 검증하여 base_dir 아래에 저장.
+
+    lecture 를 주면 zip 안의 강의 이름과 상관없이 그 강의로 가져온다.
+    반환값: (imported, errors)
+      imported: [(lecture, filename, path, 덮어쓰기 전 파일 해시 또는 None, v2 records)]
+      errors:   [(zip 멤버 이름, 오류 메시지)]
+    """
+    imported, errors = [], []
+    with zipfile.ZipFile(source) as zf:
+        members = zf.infolist()
+        if len(members) > MAX_MEMBERS:
+            raise ValueError(f"zip 파일에 항목이 너무 많습니다 ({len(members)}개).")
+        for info in members:
+            try:
+                member_lecture, filename = _member_target(info.filename)
+                target_lecture = lecture or member_lecture
+                lecture_dir = os.path.join(base_dir, target_lecture)
+                if filename is None:
+                    os.makedirs(lecture_dir, exist_ok=True)
+                    catalog.add_lecture(base_dir, target_lecture)
+                    continue
+                payload = validate_records(serialization.loads(_read_member(zf, info)), target_lecture)
+                os.makedirs(lecture_dir, exist_ok=True)
+                path = os.path.join(lecture_dir, filename)
+                old_hash = file_hash(path) if os.path.exists(path) else None
+                serialization.write_file(path, payload)
+                catalog.update_record(base_dir, target_lecture, filename)
+                imported.append((target_lecture, filename, path, old_hash, payload["records"]))
+            except (ValueError, RuntimeError, OSError, zipfile.BadZipFile) as e:
+                errors.append((info.filename, str(e)))
+    return imported, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Slide Scribe 기록 zip 내보내기 / 가져오기")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export", help="timer_logs/<user> 를 zip 으로 내보내기")
+    export_cmd.add_argument("base_dir")
+    export_cmd.add_argument("zip_path")
+    export_cmd.add_argument("--lecture")
+    import_cmd = sub.add_parser("import", help="zip 을 timer_logs/<user> 로 가져오기")
+    import_cmd.add_argument("base_dir")
+    import_cmd.add_argument("zip_path")
+    import_cmd.add_argument("--lecture")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        with open(args.zip_path, "wb") as out:
+            export_zip(args.base_dir, args.lecture, out)
+        print(f"exported to {args.zip_path}")
+        return 0
+
+    imported, errors = import_zip(args.base_dir, args.zip_path, args.lecture)
+    for name, error in errors:
+        print(f"skipped: {name} ({error})", file=sys.stderr)
+    print(f"{len(imported)} imported, {len(errors)} skipped")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
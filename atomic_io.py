@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# fcntl 은 POSIX 에만 있다. 없으면 (Windows) 프로세스 내부 잠금만 사용한다.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# --- 원자적 로컬 파일 쓰기 -------------------------------------------------
+# 여러 세션(조교 여러 명)이 한 서버를 같이 쓰면 같은 파일에 동시에 쓸 수 있다.
+#  • 같은 프로세스 안: 경로별 RLock 으로 쓰기를 직렬화
+#  • 다른 프로세스와: ".<파일명>.lock" 에 대한 advisory flock
+#  • 쓰기 자체는 임시 파일 + fsync + os.replace 이므로, 읽는 쪽은 항상
+#    이전 내용 또는 새 내용 전체만 보게 된다 (잘린 파일이 생기지 않음).
+# locked() 는 재진입 가능하므로 read-modify-write 를 감싼 안에서 다시 써도 된다.
+
+# mkstemp 는 0600 으로 만들고 os.replace 는 그 권한을 그대로 남긴다.
+# 그래서 교체 전에 기존 파일의 권한 (새 파일이면 0666 & ~umask) 으로 맞춘다.
+# umask 는 읽으려면 바꿔야 하므로 (스레드에 안전하지 않음) import 할 때 한 번만 읽는다.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_REGISTRY_LOCK = threading.Lock()
+_PATH_STATES = {}  # abs path -> _PathState
+
+
+class _PathState:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+def _state_for(path):
+    key = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        state = _PATH_STATES.get(key)
+        if state is None:
+            state = _PATH_STATES[key] = _PathState()
+        return state
+
+
+def lock_path(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.lock")
+
+
+@contextmanager
+def locked(path):
+    """path 에 대한 쓰기 잠금 (프로세스 내부 + 프로세스 간). 재진입 가능."""
+    state = _state_for(path)
+    with state.lock:
+        if state.depth == 0 and fcntl is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            state.fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(state.fd, fcntl.LOCK_EX)
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0 and state.fd is not None:
+                fcntl.flock(state.fd, fcntl.LOCK_UN)
+                os.close(state.fd)
+                state.fd = None
+
+
+def _fsync_directory(directory):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_mode(path):
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write_bytes(path, data: bytes):
+    """임시 파일에 쓰고 fsync 한 뒤 rename 으로 교체"""
+    directory = os.path.dirname(os.path.abspath(path))
+    with locked(path):
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, _file_mode(path))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        _fsync_directory(directory)
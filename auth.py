@@ -1,6 +1,6 @@
 import os
-import json
-import streamlit as st
+import atomic_io
+import serialization
 from github_storage import github_enabled, load_global_json, save_global_json
 
 _USERS_FILE = "users.json"  # stored at repo root when using GitHub or local disk otherwise
@@ -14,15 +14,13 @@ def _read_local():
     if not os.path.exists(_local_users_path()):
         return {}
     try:
-        with open(_local_users_path(), "r", encoding="utf-8") as f:
-            return json.load(f)
+        return serialization.read_file(_local_users_path())
     except Exception:
         return {}
 
 
 def _write_local(data: dict):
-    with open(_local_users_path(), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    serialization.write_file(_local_users_path(), data)
 
 
 def _load_users():
@@ -40,6 +38,15 @@ def _save_users(data: dict):
 
 
 def register_user(username: str, password: str) -> bool:
+    if not github_enabled():
+        # 로컬 users.json 은 여러 세션이 동시에 가입할 수 있으므로 잠금 안에서 읽고-쓴다
+        with atomic_io.locked(_local_users_path()):
+            users = _read_local()
+            if username in users:
+                return False
+            users[username] = password
+            _write_local(users)
+        return True
     users = _load_users()
     if username in users:
         return False
@@ -53,4 +60,16 @@ def validate_user(username: str, password: str) -> bool:
 
 
 def list_users():
-    return list(_load_users().keys()) 
\ No newline at end of file
+    return list(_load_users().keys())
+
+
+def is_admin(username) -> bool:
+    """secrets.toml 의 ADMIN_USERS (목록 또는 쉼표로 구분한 문자열) 에 있는 사용자인지"""
+    try:
+        import streamlit as st
+        admins = st.secrets.get("ADMIN_USERS", [])
+    except Exception:
+        return False
+    if isinstance(admins, str):
+        admins = [name.strip() for name in admins.split(",")]
+    return bool(username) and username in admins
@@ -0,0 +1,176 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import catalog
+import mirror
+import shared_state
+from github_storage import github_enabled
+
+# --- 백그라운드 작업 ------------------------------------------------------
+# 프로세스 전체가 공유하는 작은 스레드 풀.
+# 작업 스레드에는 Streamlit 스크립트 컨텍스트가 없으므로 st.session_state 를 만지면 안 된다.
+# 결과는 모듈 수준 캐시에 넣고, 화면 코드가 다음 rerun 에서 꺼내 쓴다.
+
+_MAX_WORKERS = 4
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="slide-scribe")
+        return _EXECUTOR
+
+
+# --- 재시도하는 백그라운드 작업 -------------------------------------------
+# "기록 저장" 처럼 네트워크 왕복이 긴 작업을 스크립트 스레드 밖에서 실행한다.
+# 화면 코드는 Job 을 session_state 에 넣어 두고 rerun 때마다 상태만 확인한다.
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0  # 초. 시도할 때마다 두 배로 늘어난다
+
+
+class Job:
+    """submit_job() 이 돌려주는 작업 핸들"""
+
+    def __init__(self, label, attempts):
+        self.label = label
+        self.attempts = attempts
+        self.attempt = 0          # 현재 (또는 마지막) 시도 번호
+        self.error = None         # 마지막 실패 메시지
+        self.used_fallback = False
+        self.submitted_at = time.time()
+        self.future = None
+
+    def done(self):
+        return self.future.done()
+
+    def failed(self):
+        return self.done() and self.future.exception() is not None
+
+    def result(self):
+        """완료된 작업의 결과. 실패했거나 아직 끝나지 않았으면 None"""
+        if not self.done() or self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+    def status(self):
+        if not self.done():
+            if self.attempt > 1:
+                return f"{self.label} 재시도 중 ({self.attempt}/{self.attempts}): {self.error}"
+            return f"{self.label} 중…"
+        if self.failed():
+            return f"{self.label} 실패: {self.future.exception()}"
+        return f"{self.label} 완료"
+
+
+def _run_job(job, fn, args, fallback):
+    delay = RETRY_BACKOFF
+    for attempt in range(1, job.attempts + 1):
+        job.attempt = attempt
+        try:
+            return fn(*args)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            if attempt < job.attempts:
+                time.sleep(delay)  # 작업 스레드에서만 기다린다
+                delay *= 2
+    if fallback is None:
+        raise RuntimeError(job.error)
+    job.used_fallback = True
+    return fallback(*args)
+
+
+def submit_job(label, fn, *args, attempts=RETRY_ATTEMPTS, fallback=None):
+    """fn(*args) 를 백그라운드에서 실행. 예외가 나면 backoff 후 재시도하고,
+    모두 실패하면 fallback(*args) 를 (있으면) 실행한다. Job 을 바로 반환."""
+    job = Job(label, attempts)
+    job.future = executor().submit(_run_job, job, fn, args, fallback)
+    return job
+
+
+# --- 로그인 직후 prefetch -------------------------------------------------
+# 로그인하면 (GitHub 저장소를 쓰는 경우 로컬 미러를 먼저 맞춘 뒤) 사용자의 강의 목록과
+# 강의별 기록 파일 목록을 미리 읽어 둔다. 첫 화면은 이 작업을 기다리지 않는다.
+# 읽은 뒤 (다른 프로세스에서라도) 데이터 세대가 바뀌었으면 그 결과는 쓰지 않는다.
+
+PREFETCH_TTL = 300  # 초. 이보다 오래된 prefetch 결과는 쓰지 않는다
+
+_PREFETCH = {}  # user_id -> {"started", "done", "base_dir", "generation", "lectures", "json_files"}
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _warm(user_id, base_dir, entry):
+    if github_enabled():
+        try:
+            mirror.sync(user_id, base_dir)
+        except Exception:
+            pass  # 동기화하지 못해도 로컬에 있는 내용은 보여줄 수 있다
+    # 카탈로그가 없으면 (처음 로그인한 사용자) 여기서 한 번 만들어 둔다
+    catalog.load(base_dir)
+    generation = shared_state.generation(base_dir)
+    with _PREFETCH_LOCK:
+        entry["generation"] = generation
+    lectures = catalog.lectures(base_dir)
+    with _PREFETCH_LOCK:
+        entry["lectures"] = lectures
+    for lecture in lectures:
+        files = catalog.record_paths(base_dir, lecture)
+        with _PREFETCH_LOCK:
+            entry["json_files"][lecture] = files
+
+
+def _run_prefetch(user_id, base_dir, entry):
+    try:
+        _warm(user_id, base_dir, entry)
+    finally:
+        with _PREFETCH_LOCK:
+            entry["done"] = True
+
+
+def start_prefetch(user_id, base_dir):
+    """사용자 데이터 prefetch 를 백그라운드로 시작 (이미 최근에 했으면 무시). 바로 반환한다."""
+    now = time.monotonic()
+    with _PREFETCH_LOCK:
+        entry = _PREFETCH.get(user_id)
+        if entry is not None and now - entry["started"] < PREFETCH_TTL:
+            return
+        entry = {"started": now, "done": False, "base_dir": base_dir, "generation": None,
+                 "lectures": None, "json_files": {}}
+        _PREFETCH[user_id] = entry
+    executor().submit(_run_prefetch, user_id, base_dir, entry)
+
+
+def _fresh_entry(user_id):
+    entry = _PREFETCH.get(user_id)
+    if entry is None or time.monotonic() - entry["started"] >= PREFETCH_TTL:
+        return None
+    if entry["generation"] is None or entry["generation"] != shared_state.generation(entry["base_dir"]):
+        return None
+    return entry
+
+
+def prefetched_lectures(user_id):
+    """prefetch 된 강의 목록. 아직 없으면 None"""
+    with _PREFETCH_LOCK:
+        entry = _fresh_entry(user_id)
+        return list(entry["lectures"]) if entry and entry["lectures"] is not None else None
+
+
+def prefetched_json_files(user_id, lecture):
+    """prefetch 된 강의의 기록 파일 목록. 아직 없으면 None"""
+    with _PREFETCH_LOCK:
+        entry = _fresh_entry(user_id)
+        if entry is None or lecture not in entry["json_files"]:
+            return None
+        return list(entry["json_files"][lecture])
+
+
+def forget_prefetch(user_id):
+    """사용자 데이터가 바뀌었으므로 prefetch 결과를 버림"""
+    with _PREFETCH_LOCK:
+        _PREFETCH.pop(user_id, None)
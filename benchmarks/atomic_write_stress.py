@@ -0,0 +1,122 @@
+"""Multi-threaded stress test for atomic_io / serialization.write_file.
+
+Several writer threads repeatedly rewrite a small set of shared record files
+while reader threads parse them continuously, and a group of threads performs
+locked read-modify-write increments on one counter file (the same pattern as
+auth.register_user). Reports write throughput, torn/failed reads and whether
+any increment was lost. The plain open('w') writer is measured as a baseline.
+
+    python benchmarks/atomic_write_stress.py --threads 16 --writes 200
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import atomic_io  # noqa: E402
+import serialization  # noqa: E402
+from record_schema import encode_records, format_time_ms  # noqa: E402
+
+
+def _payload(writer, i, slides):
+    records = [{
+        "slide_title": f"writer {writer} pass {i}",
+        "slide_number": str(n + 1),
+        "start_time": format_time_ms(n * 60000),
+        "end_time": format_time_ms((n + 1) * 60000),
+        "notes": "x" * 40,
+    } for n in range(slides)]
+    return encode_records(records, "stress")
+
+
+def _plain_write(path, obj):
+    with open(path, "wb") as f:
+        f.write(serialization.dumps(obj))
+
+
+def run_writes(directory, write, threads, writes, files, slides):
+    paths = [os.path.join(directory, f"record_{n}.json") for n in range(files)]
+    for path in paths:
+        _plain_write(path, _payload(-1, 0, slides))
+
+    stop = threading.Event()
+    bad_reads = [0]
+    reads = [0]
+
+    def reader():
+        while not stop.is_set():
+            for path in paths:
+                try:
+                    payload = serialization.read_file(path)
+                    if payload["record_count"] != len(payload["records"]):
+                        bad_reads[0] += 1
+                except (OSError, ValueError, KeyError):
+                    bad_reads[0] += 1
+                reads[0] += 1
+
+    def writer(w):
+        for i in range(writes):
+            write(paths[(w + i) % files], _payload(w, i, slides))
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(w,)) for w in range(threads)]
+    for t in readers:
+        t.start()
+    start = time.perf_counter()
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in readers:
+        t.join()
+    return threads * writes / elapsed, reads[0], bad_reads[0]
+
+
+def run_counter(directory, threads, increments):
+    path = os.path.join(directory, "counter.json")
+    serialization.write_file(path, {"count": 0}, compression=None)
+
+    def worker():
+        for _ in range(increments):
+            with atomic_io.locked(path):
+                data = serialization.read_file(path)
+                data["count"] += 1
+                serialization.write_file(path, data, compression=None)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return serialization.read_file(path)["count"], threads * increments, threads * increments / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=100, help="writes per thread")
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--slides", type=int, default=60, help="records per file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, write in (("plain open('w')", _plain_write), ("atomic write_file", serialization.write_file)):
+            rate, reads, bad = run_writes(directory, write, args.threads, args.writes, args.files, args.slides)
+            print(f"{label:18s} {rate:9.1f} writes/s   reads={reads:<7d} torn/failed reads={bad}")
+
+        count, expected, rate = run_counter(directory, args.threads, args.writes)
+        lost = expected - count
+        print(f"{'locked RMW':18s} {rate:9.1f} updates/s  final={count} expected={expected} lost={lost}")
+    return 1 if lost else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Accuracy and timing benchmark for the clock-offset calibration.
+
+Builds a synthetic lecture (``--minutes`` of captions, slide changes in the
+pauses between cues), moves the timer record by a known offset and clock
+drift, and checks that ``calibration.calibrate`` recovers an alignment that
+uses as many cues as the unmoved record (and reports how many slide texts
+are identical). Also reports how many cues the uncalibrated alignment would
+have used, and times the search with and without the drift search.
+
+Then checks that moderate offsets (2 s to 10 min, either way, plus
+``--drift``) of a fully captioned lecture are corrected, and runs a
+partial-coverage regression over ``--seeds`` lectures whose
+slide changes fall at arbitrary times (mid-cue) and whose captions cover only
+``--coverage`` of the record span. A record that is already aligned must be
+left alone, and the same record moved by ``--offset-ms`` must still be
+recovered.
+
+    python benchmarks/calibration_search.py
+    python benchmarks/calibration_search.py --minutes 180 --offset-ms 32400000 --drift 0.0015 --contiguous
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import alignment  # noqa: E402
+import calibration  # noqa: E402
+
+TOLERANCE = 0.005  # 맞춘 기록이 쓰는 자막 수 대비
+
+
+def make_lecture(minutes, contiguous=False, seed=0):
+    """(cues, slide boundaries) — 경계는 모두 자막 사이 빈틈에 있다"""
+    rng = random.Random(seed)
+    cues, t = [], 0
+    while t < minutes * 60_000:
+        duration = rng.randint(1200, 4000)
+        gap = 0 if contiguous and rng.random() < 0.8 else rng.randint(150, 1500)
+        cues.append((t, t + duration, f"cue {len(cues)}"))
+        t += duration + gap
+    bounds, i = [0], 0
+    while True:
+        i += rng.randint(8, 40)
+        if i >= len(cues):
+            break
+        bounds.append((cues[i - 1][1] + cues[i][0]) // 2)
+    bounds.append(cues[-1][1] + 200)
+    return cues, bounds
+
+
+def records_for(bounds, offset_ms=0, drift=0.0):
+    """녹화 시각 b 를 기록 시각 offset + b / (1 + drift) 로 옮긴 기록"""
+    return [
+        {
+            "slide_number": str(n + 1),
+            "start_ms": round(offset_ms + start / (1 + drift)),
+            "end_ms": round(offset_ms + end / (1 + drift)),
+        }
+        for n, (start, end) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def partial_lecture(minutes, coverage, seed):
+    """(captions covering `coverage` of the lecture, slide boundaries at arbitrary times)"""
+    cues, _ = make_lecture(minutes, seed=seed)
+    rng = random.Random(seed)
+    bounds = [0]
+    while bounds[-1] < cues[-1][1]:
+        bounds.append(bounds[-1] + rng.randint(20_000, 120_000))
+    keep = int(len(cues) * coverage)
+    first = rng.randint(0, len(cues) - keep)
+    return cues[first:first + keep], bounds
+
+
+MODERATE_OFFSETS_MS = (2_000, 30_000, 120_000, 300_000, 600_000, -5_000, -300_000, -600_000)
+
+
+def moderate_offsets(args, cues, bounds, ideal_used):
+    """자막이 기록 전체를 덮을 때 몇 초~몇 분 어긋난 기록을 바로잡는지. 통과하면 True"""
+    missed = []
+    for offset in MODERATE_OFFSETS_MS:
+        _, info = calibration.calibrate(records_for(bounds, offset, args.drift), cues)
+        if not info["applied"] or info["kept_after"] < ideal_used * (1 - TOLERANCE):
+            missed.append(f"offset {offset} ms: applied={info['applied']}, {info['kept_after']}/{info['cues']} cues used")
+    print(f"moderate offsets ({len(MODERATE_OFFSETS_MS)} offsets, drift {args.drift:+.3%}): {len(missed)} not corrected")
+    for problem in missed:
+        print(f"  ! {problem}", file=sys.stderr)
+    return not missed
+
+
+def partial_coverage(args):
+    """이미 맞는 기록은 옮기지 않고, 원점이 어긋난 기록은 되찾는지. 통과하면 True"""
+    moved_aligned, missed = [], []
+    for seed in range(args.seeds):
+        cues, bounds = partial_lecture(args.minutes, args.coverage, seed)
+        aligned = records_for(bounds)
+        _, info = calibration.calibrate(aligned, cues)
+        if info["applied"]:
+            moved_aligned.append(f"seed {seed}: shift {info['shift_ms']} ms, scale {info['scale']}")
+        _, info = calibration.calibrate(records_for(bounds, args.offset_ms, args.drift), cues)
+        if info["kept_after"] < calibration.kept_cues([(r["start_ms"], r["end_ms"]) for r in aligned], cues) * (1 - TOLERANCE):
+            missed.append(f"seed {seed}: {info['kept_after']}/{info['cues']} cues used")
+    print(f"partial coverage ({args.coverage:.0%} of the span, {args.seeds} seeds): "
+          f"{len(moved_aligned)} aligned record(s) moved, {len(missed)} offset record(s) not recovered")
+    for problem in moved_aligned + missed:
+        print(f"  ! {problem}", file=sys.stderr)
+    return not moved_aligned and not missed
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--offset-ms", type=int, default=9 * 3600_000 + 12_345)
+    parser.add_argument("--drift", type=float, default=0.001)
+    parser.add_argument("--contiguous", action="store_true", help="most cues touch (auto-generated captions)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--coverage", type=float, default=0.6, help="caption coverage for the partial-coverage check")
+    parser.add_argument("--seeds", type=int, default=8, help="lectures in the partial-coverage check")
+    args = parser.parse_args(argv)
+
+    cues, bounds = make_lecture(args.minutes, args.contiguous)
+    ideal = alignment.align(records_for(bounds), cues)["texts"]
+    ideal_used = calibration.kept_cues([(r["start_ms"], r["end_ms"]) for r in records_for(bounds)], cues)
+    records = records_for(bounds, args.offset_ms, args.drift)
+    print(f"{args.minutes} min, {len(cues)} cues, {len(records)} slides, "
+          f"offset {args.offset_ms} ms, drift {args.drift:+.3%}")
+    print(f"{'uncalibrated':>14}: {calibration.kept_cues([(r['start_ms'], r['end_ms']) for r in records], cues)} cues used")
+
+    ok = True
+    for drift in (False, True):
+        elapsed, (fitted, info) = timed(lambda: calibration.calibrate(records, cues, drift=drift), args.repeat)
+        texts = alignment.align(fitted, cues)["texts"]
+        same = sum(a == b for a, b in zip(texts, ideal))
+        label = "offset+drift" if drift else "offset only"
+        print(f"{label:>14}: {elapsed * 1000:7.1f} ms  shift {info['shift_ms']} ms, scale {info['scale']}, "
+              f"{info['kept_after']}/{info['cues']} cues used, {same}/{len(ideal)} slides match")
+        if drift or not args.drift:
+            ok = ok and info["kept_after"] >= ideal_used * (1 - TOLERANCE)
+    if not ok:
+        print(f"MISMATCH: calibrated alignment uses fewer cues than the unmoved record ({ideal_used})", file=sys.stderr)
+    if not moderate_offsets(args, cues, bounds, ideal_used):
+        ok = False
+    if not partial_coverage(args):
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""In-memory stand-in for the part of the GitHub REST API that Slide Scribe uses.
+
+Serves ``/repos/<owner>/<repo>`` plus its ``contents``, ``git/trees`` and
+``git/blobs`` endpoints from a dict of ``path -> bytes``, with rate-limit
+headers, so the app (auth, mirror sync, write-through pushes) can run against
+it without a network or a token. Used by ``benchmarks/load_test.py``.
+
+    python benchmarks/fake_github.py --port 8765
+    # then point github_storage._API_URL at http://127.0.0.1:8765
+"""
+import sys
+import json
+import base64
+import hashlib
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RATE_LIMIT = 5000
+DEFAULT_BRANCH = "main"
+
+
+def blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeGitHub:
+    """저장소 하나 (path -> bytes). 디렉토리 / 트리 SHA 는 내용으로부터 계산한다."""
+
+    def __init__(self, repo="load/test"):
+        self.repo = repo
+        self.files = {}
+        self.trees = {}  # tree sha -> 디렉토리 prefix
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _tree_sha(self, prefix):
+        items = sorted((p, blob_sha(b)) for p, b in self.files.items() if p.startswith(prefix + "/"))
+        if not items:
+            return None
+        sha = hashlib.sha1(json.dumps(items).encode("utf-8")).hexdigest()
+        self.trees[sha] = prefix
+        return sha
+
+    def handle(self, method, path, body):
+        """(status, payload) 반환"""
+        with self.lock:
+            self.requests += 1
+            parsed = urllib.parse.urlsplit(path)
+            route = urllib.parse.unquote(parsed.path)
+            base = f"/repos/{self.repo}"
+            if route == base:
+                return 200, {"full_name": self.repo, "default_branch": DEFAULT_BRANCH}
+            if not route.startswith(base + "/"):
+                return 404, {"message": "Not Found"}
+            route = route[len(base):]
+            if route.startswith("/git/trees/"):
+                return self._tree(route[len("/git/trees/"):])
+            if route.startswith("/git/blobs/"):
+                return self._blob(route[len("/git/blobs/"):])
+            if route.startswith("/contents/"):
+                return self._contents(method, route[len("/contents/"):], body)
+            return 404, {"message": "Not Found"}
+
+    def _tree(self, sha):
+        if ":" in sha:  # "<branch>:<경로>"
+            branch, path = sha.split(":", 1)
+            sha = self._tree_sha(path.strip("/")) if branch == DEFAULT_BRANCH else None
+        prefix = self.trees.get(sha)
+        if prefix is None:
+            return 404, {"message": "Not Found"}
+        entries, dirs = [], set()
+        for path, data in self.files.items():
+            if path.startswith(prefix + "/"):
+                rel = path[len(prefix) + 1:]
+                parts = rel.split("/")
+                for depth in range(1, len(parts)):
+                    dirs.add("/".join(parts[:depth]))
+                entries.append({"path": rel, "type": "blob", "sha": blob_sha(data)})
+        entries += [{"path": d, "type": "tree"} for d in sorted(dirs)]
+        return 200, {"sha": sha, "tree": entries, "truncated": False}
+
+    def _blob(self, sha):
+        for data in self.files.values():
+            if blob_sha(data) == sha:
+                return 200, {"sha": sha, "content": base64.b64encode(data).decode("ascii"), "encoding": "base64"}
+        return 404, {"message": "Not Found"}
+
+    def _contents(self, method, path, body):
+        path = path.strip("/")
+        if method == "GET":
+            if path in self.files:
+                data = self.files[path]
+                return 200, {"path": path, "sha": blob_sha(data), "content": base64.b64encode(data).decode("ascii")}
+            children = {}
+            for other in self.files:
+                if other.startswith(path + "/"):
+                    name = other[len(path) + 1:].split("/", 1)[0]
+                    is_dir = "/" in other[len(path) + 1:]
+                    children[name] = "dir" if is_dir else "file"
+            if not children:
+                return 404, {"message": "Not Found"}
+            listing = []
+            for name, kind in sorted(children.items()):
+                full = f"{path}/{name}"
+                sha = self._tree_sha(full) if kind == "dir" else blob_sha(self.files[full])
+                listing.append({"name": name, "path": full, "type": kind, "sha": sha})
+            return 200, listing
+        current = blob_sha(self.files[path]) if path in self.files else None
+        if method == "PUT":
+            if current is not None and body.get("sha") != current:
+                return 409, {"message": "sha mismatch"}
+            data = base64.b64decode(body["content"])
+            self.files[path] = data
+            return (201 if current is None else 200), {"content": {"path": path, "sha": blob_sha(data)}}
+        if method == "DELETE":
+            if current is None:
+                return 404, {"message": "Not Found"}
+            if body.get("sha") != current:
+                return 409, {"message": "sha mismatch"}
+            del self.files[path]
+            return 200, {"commit": {}}
+        return 405, {"message": "Method Not Allowed"}
+
+
+def _handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            status, payload = fake.handle(self.command, self.path, body)
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("X-RateLimit-Limit", str(RATE_LIMIT))
+            self.send_header("X-RateLimit-Remaining", str(max(RATE_LIMIT - fake.requests, 0)))
+            self.send_header("X-RateLimit-Reset", "4102444800")
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_PUT = do_DELETE = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(fake, port=0):
+    """백그라운드 스레드에서 서버 시작. (server, base_url) 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(fake))
+    threading.Thread(target=server.serve_forever, name="fake-github", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repo", default="load/test")
+    args = parser.parse_args(argv)
+    server, url = serve(FakeGitHub(args.repo), args.port)
+    print(f"fake GitHub for {args.repo} at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Cold-start import budget for Slide Scribe.
+
+Runs each entry point in a fresh interpreter with ``python -X importtime``
+and reports the cumulative import time of every project module plus the
+heaviest third-party packages it pulled in. The login path (``import app``,
+which only renders the login form until a user signs in) must not import
+pandas or numpy and must fit within ``--budget-ms``.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 800 --top 15
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, code to run, modules that must NOT be imported, enforce budget?)
+ENTRY_POINTS = [
+    ("login path (import app)", "import app", ("pandas", "numpy"), True),
+    ("auth", "import auth", ("pandas", "numpy"), False),
+    ("slide_timer tab", "import slide_timer", (), False),
+    ("srt_parser tab", "import srt_parser", (), False),
+    ("settings tab", "import settings", (), False),
+]
+
+PROJECT_MODULES = {
+    os.path.splitext(name)[0] for name in os.listdir(ROOT) if name.endswith(".py")
+}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(code):
+    """Returns [(module, self_us, cumulative_us, depth)] in import order."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    if proc.returncode != 0:
+        raise RuntimeError(f"`{code}` failed:\n{proc.stderr[-2000:]}")
+    return rows
+
+
+def report(label, rows, forbidden, top):
+    total_us = sum(r[1] for r in rows)
+    imported = {r[0] for r in rows}
+    print(f"\n== {label}: {total_us / 1000:.1f} ms total, {len(rows)} modules")
+
+    project = [r for r in rows if r[0] in PROJECT_MODULES]
+    for module, _, cumulative_us, _ in sorted(project, key=lambda r: -r[2]):
+        print(f"   {cumulative_us / 1000:8.1f} ms  {module} (cumulative)")
+
+    third_party = {}
+    for module, self_us, _, _ in rows:
+        package = module.split(".")[0]
+        if package not in PROJECT_MODULES:
+            third_party[package] = third_party.get(package, 0) + self_us
+    print("   heaviest packages (self time):")
+    for package, us in sorted(third_party.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"   {us / 1000:8.1f} ms  {package}")
+
+    leaked = sorted(m for m in forbidden if m in imported)
+    if leaked:
+        print(f"   !! imports deferred dependencies: {', '.join(leaked)}")
+    return total_us / 1000, leaked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="login path import budget")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for label, code, forbidden, enforce in ENTRY_POINTS:
+        runs = [measure(code) for _ in range(args.repeat)]
+        best = min(runs, key=lambda rows: sum(r[1] for r in rows))
+        total_ms, leaked = report(label, best, forbidden, args.top)
+        if leaked:
+            failed = True
+        if enforce and total_ms > args.budget_ms:
+            print(f"   !! over budget: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""Concurrent-session load test for Slide Scribe, driven by Streamlit's AppTest.
+
+Runs ``app.py`` headlessly with N simulated lecturers at once (one AppTest
+per session, all in this process, like the real Streamlit server) for each
+N in ``--sessions``. Each session:
+
+  1. logs in through the login form (``auth.validate_user``),
+  2. selects its lecture, presses Start and then Record Time ``--records`` times,
+  3. presses 기록 저장 and reruns until the background save finishes,
+  4. uploads a synthetic SRT in the SRT Parser tab, selects the saved record
+     and presses Parse SRT.
+
+Storage is the local disk by default, or an in-process fake GitHub server
+(``benchmarks/fake_github.py``) with ``--github``; ``--shared-state`` keeps
+active timers and data generations in SQLite as a multi-replica deployment
+would (``shared_state.py``). Everything runs in a temporary working
+directory. For each concurrency level the script prints per-step rerun
+latency percentiles, throughput (reruns/s) and memory per session
+(session_memory accounting and process RSS growth).
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --sessions 1 4 16 --records 30 --github
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+APP = os.path.join(ROOT, "app.py")
+PASSWORD = "load-test"
+LECTURE = "부하 테스트"
+SAVE_TIMEOUT = 60
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_srt(duration_ms, cue_ms=2500):
+    def stamp(ms):
+        h, rem = divmod(ms, 3_600_000)
+        m, rem = divmod(rem, 60_000)
+        s, ms = divmod(rem, 1000)
+        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+    blocks = []
+    for i, start in enumerate(range(0, max(duration_ms, cue_ms), cue_ms), 1):
+        blocks.append(f"{i}\n{stamp(start)} --> {stamp(start + cue_ms)}\n자막 {i} 번째 문장 입니다 load test")
+    return ("\n\n".join(blocks) + "\n").encode("utf-8")
+
+
+def share_server_state():
+    """AppTest 를 여러 스레드에서 동시에 돌릴 수 있도록, 실제 서버처럼 세션들이 공유하는 상태를 맞춘다.
+
+    • AppTest 는 run() 마다 Runtime._instance 에 mock 을 넣고 끝나면 None 으로 되돌린다.
+      다른 세션이 실행 중에 None 이 되지 않도록 되돌리는 것만 막는다.
+    • AppTest 는 run() 마다 새 ScriptCache 로 app.py 를 다시 compile 한다. 서버처럼 하나를 같이 쓴다
+      (Python 3.11 은 여러 스레드에서 동시에 ast.parse 하면 SystemError 가 날 수 있다).
+    • AppTest 는 run() 동안만 global.appTest 옵션을 켰다가 되돌린다. 먼저 끝난 세션이 끄지 않도록
+      프로세스 전체에서 켜 둔다 (되돌릴 값도 True 가 된다).
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    config.set_option("global.appTest", True)
+
+    class _Meta(type(Runtime)):
+        def __setattr__(cls, name, value):
+            if name == "_instance":
+                if value is not None:
+                    Runtime._instance = value
+                return
+            super().__setattr__(name, value)
+
+    class SharedRuntime(Runtime, metaclass=_Meta):
+        pass
+
+    app_test.Runtime = SharedRuntime
+
+
+class Session:
+    def __init__(self, user, secrets, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.user = user
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.at.secrets.update(secrets)
+        self.timings = defaultdict(list)  # step -> [초]
+        self.errors = []
+
+    def _run(self, step, action=None):
+        start = time.perf_counter()
+        (action or self.at).run()
+        self.timings[step].append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(f"{step}: {self.at.exception[0].value}")
+        for error in self.at.error:
+            self.errors.append(f"{step}: {error.value}")
+
+    def _button(self, label):
+        for button in self.at.button:
+            if button.label == label:
+                return button
+        raise LookupError(f"{label} 버튼이 없습니다")
+
+    def login(self):
+        self._run("first render")
+        self.at.text_input[0].input(self.user)
+        self.at.text_input[1].input(PASSWORD)
+        self._run("login", self._button("Login").click())
+        if self.at.session_state["user_id"] != self.user:
+            raise RuntimeError(f"{self.user}: 로그인 실패")
+
+    def record(self, presses):
+        self._run("select lecture", self.at.selectbox(key="lecture_name").select(LECTURE))
+        self._run("start", self._button("Start").click())
+        for _ in range(presses):
+            self._run("record time", self.at.button(key="record_button").click())
+
+    def save(self):
+        start = time.perf_counter()
+        self._run("save click", self._button("기록 저장").click())
+        deadline = time.monotonic() + SAVE_TIMEOUT
+        while self.at.session_state["save_job"] is not None:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{self.user}: 저장이 {SAVE_TIMEOUT}초 안에 끝나지 않았습니다")
+            time.sleep(0.05)
+            self._run("save poll")
+        self.timings["save (end to end)"].append(time.perf_counter() - start)
+        return self.at.session_state["selected_json_file"]
+
+    def parse(self, json_path, srt):
+        self._run("srt upload", self.at.file_uploader(key="srt_uploader").upload("load.srt", srt))
+        self._run("srt lecture", self.at.selectbox(key="lecture_selector").select(LECTURE))
+        self._run("srt record", self.at.selectbox(key="json_file_selector").select(os.path.basename(json_path)))
+        self._run("parse srt", self._button("Parse SRT").click())
+        if not any("slide-number" in str(block.value) for block in self.at.markdown):
+            self.errors.append("parse srt: 정렬 결과가 없습니다")
+
+    def script(self, presses, srt):
+        self.login()
+        self.record(presses)
+        saved = self.save()
+        if saved:
+            self.parse(saved, srt)
+
+
+def prepare_users(users):
+    import auth
+    import catalog
+    for user in users:
+        auth.register_user(user, PASSWORD)
+        base_dir = os.path.join("timer_logs", user)
+        os.makedirs(os.path.join(base_dir, LECTURE), exist_ok=True)
+        catalog.add_lecture(base_dir, LECTURE)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_level(level, args, secrets):
+    import session_memory
+    users = [f"load{level}_{i}" for i in range(level)]
+    prepare_users(users)
+    srt = make_srt(args.records * 1000)
+    sessions = [Session(user, secrets, args.timeout) for user in users]
+    rss_before = rss_mb()
+    barrier = threading.Barrier(level)
+
+    def drive(session):
+        barrier.wait()  # 모든 세션이 동시에 시작
+        try:
+            session.script(args.records, srt)
+        except Exception as e:
+            session.errors.append(f"{type(e).__name__}: {e}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        list(pool.map(drive, sessions))
+    wall = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    steps = defaultdict(list)
+    for session in sessions:
+        for step, values in session.timings.items():
+            steps[step].extend(values)
+    reruns = sum(len(v) for step, v in steps.items() if step != "save (end to end)")
+    report = [row for row in session_memory.report() if row["user"] in users]
+    per_session_kb = [(row["resident_bytes"] + row["spilled_bytes"]) / 1024 for row in report]
+    errors = [error for session in sessions for error in session.errors]
+
+    print(f"\n== {level} concurrent session(s): {wall:.1f} s wall, {reruns} reruns, "
+          f"{reruns / wall:.1f} reruns/s, {len(errors)} error(s)")
+    print(f"{'step':>20} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, values in steps.items():
+        ms = [v * 1000 for v in values]
+        print(f"{step:>20} {len(ms):>5} {percentile(ms, 50):>9.1f} {percentile(ms, 95):>9.1f} "
+              f"{percentile(ms, 99):>9.1f} {max(ms):>9.1f}")
+    if per_session_kb:
+        print(f"session state: mean {statistics.mean(per_session_kb):.0f} KB, max {max(per_session_kb):.0f} KB per session")
+    print(f"process RSS: {rss_before:.0f} MB -> {rss_after:.0f} MB "
+          f"({(rss_after - rss_before) / level:+.1f} MB per session)")
+    for error in errors[:10]:
+        print(f"  ! {error}")
+    return not errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--records", type=int, default=20, help="Record Time presses per session")
+    parser.add_argument("--github", action="store_true", help="use an in-process fake GitHub server")
+    parser.add_argument("--shared-state", action="store_true", help="keep timers and data generations in SQLite (shared_state.py)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary working directory")
+    args = parser.parse_args(argv)
+
+    share_server_state()
+    workdir = tempfile.mkdtemp(prefix="slide-scribe-load-")
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    secrets = {"LOAD_TEST": "1"}
+    if args.github:
+        import fake_github
+        import github_storage
+        server, url = fake_github.serve(fake_github.FakeGitHub("load/test"))
+        github_storage._API_URL = url
+        secrets.update(GITHUB_TOKEN="load-test", GITHUB_REPO="load/test")
+    if args.shared_state:
+        secrets["SHARED_STATE"] = "sqlite:///shared_state.sqlite3"
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.writelines(f'{key} = "{value}"\n' for key, value in secrets.items())
+    os.chdir(workdir)
+    # 탭 모듈 import 비용이 첫 단계의 세션당 메모리로 잡히지 않도록 미리 불러 둔다
+    import slide_timer, srt_parser, settings  # noqa: E401,F401
+    print(f"storage: {'fake GitHub' if args.github else 'local disk'}, workdir {workdir}, {os.cpu_count()} CPUs")
+    ok = True
+    try:
+        for level in args.sessions:
+            ok = run_level(level, args, secrets) and ok
+    finally:
+        os.chdir(ROOT)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
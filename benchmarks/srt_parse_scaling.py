@@ -0,0 +1,106 @@
+"""Scaling benchmark for the chunked caption parser.
+
+Generates a synthetic caption file (machine-generated style, ``--cues`` cues,
+SRT / WebVTT / SBV), checks that ``captions.parse_cues_parallel`` returns
+exactly what the serial ``captions.parse_cues`` returns (and, for SRT, what
+the legacy ``captions.read_srt_file`` returns), and times both over a range
+of worker counts, from a local path (mmap) and from in-memory bytes (upload).
+
+    python benchmarks/srt_parse_scaling.py
+    python benchmarks/srt_parse_scaling.py --format vtt --cues 300000 --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import captions  # noqa: E402
+
+WORDS = "그래서 오늘은 슬라이드 강의 내용 정리 다음 예제 보면 이렇게 됩니다 the model data result".split()
+
+
+def _stamp(ms, sep=","):
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+def _timing(fmt, start, end):
+    if fmt == "vtt":
+        return f"{_stamp(start, '.')} --> {_stamp(end, '.')} align:start position:10%"
+    if fmt == "sbv":
+        return f"{_stamp(start, '.')[1:]},{_stamp(end, '.')[1:]}"
+    return f"{_stamp(start)} --> {_stamp(end)}"
+
+
+def make_captions(cues, fmt="srt", seed=0):
+    rng = random.Random(seed)
+    blocks, t = [], 0
+    for i in range(1, cues + 1):
+        duration = rng.randint(800, 4000)
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 2))]
+        index = "" if fmt == "sbv" else f"{i}\n"
+        blocks.append(index + _timing(fmt, t, t + duration) + "\n" + "\n".join(lines))
+        t += duration + rng.randint(0, 300)
+    header = "WEBVTT\n\nNOTE generated\n\n" if fmt == "vtt" else ""
+    # 블록 사이 빈 줄이 여러 개인 경우도 섞는다
+    body = "\n\n".join(blocks[:cues // 2]) + "\n\n\n\n" + "\n\n".join(blocks[cues // 2:]) + "\n"
+    return (header + body).encode("utf-8")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=120_000)
+    parser.add_argument("--format", choices=captions.FORMATS, default="srt")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    data = make_captions(args.cues, args.format)
+    with tempfile.NamedTemporaryFile(suffix="." + args.format, delete=False) as f:
+        f.write(data)
+        path = f.name
+    try:
+        print(f"{args.cues} {args.format} cues, {len(data) / 1024 / 1024:.1f} MB, {os.cpu_count()} CPUs")
+        if captions.detect_format(data) != args.format:
+            print(f"MISDETECTED: {captions.detect_format(data)}", file=sys.stderr)
+            return 1
+        serial_s, expected = timed(lambda: captions.parse_cues(data.decode("utf-8")), args.repeat)
+        print(f"{'serial':>14}: {serial_s * 1000:8.1f} ms")
+        if args.format == "srt":
+            legacy_s, legacy = timed(lambda: captions.read_srt_file(data.decode("utf-8")), args.repeat)
+            legacy = [(round(s["start_time"] * 1000), round(s["end_time"] * 1000), s["text"]) for s in legacy]
+            if legacy != expected:
+                print("MISMATCH: tokenizer vs read_srt_file", file=sys.stderr)
+                return 1
+            print(f"{'legacy srt':>14}: {legacy_s * 1000:8.1f} ms")
+        for workers in args.workers:
+            captions.parse_cues_parallel(path, workers=workers)  # 작업 프로세스 시작 비용은 측정에서 뺀다
+            for label, source in (("path", path), ("bytes", data)):
+                elapsed, result = timed(lambda: captions.parse_cues_parallel(source, workers=workers), args.repeat)
+                if result != expected:
+                    print(f"MISMATCH: {label} with {workers} workers", file=sys.stderr)
+                    return 1
+                print(f"{label + ' x' + str(workers):>14}: {elapsed * 1000:8.1f} ms  (x{serial_s / elapsed:.2f})")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
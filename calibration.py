@@ -0,0 +1,202 @@
+import numpy as np
+
+# --- 기록 <-> 자막 시간 보정 ----------------------------------------------
+# 기록은 벽시계 (또는 사용자가 입력한 Start Time) 기준이고, 자막은 녹화 시작이 0 이다.
+# 원점이 다르면 자막이 모두 슬라이드 구간 밖에 놓여 정렬 결과가 조용히 비어 버린다.
+# calibrate() 는 기록 시간에 적용할 변환  t' = pivot + shift + (t - pivot) * scale  을 찾는다
+# (pivot 은 첫 슬라이드 시작, scale 은 녹화와 타이머 사이의 시계 drift).
+#
+# 점수 = 변환한 기록 구간 안에서 시작하는 자막 수 - 자막 한가운데에 떨어진 슬라이드 경계 수
+# (경계가 자막 사이 빈틈에 떨어져야 그 자막이 버려지지 않는다). 즉 정렬에 쓰이는 자막 수다.
+# scale 후보마다 shift 후보 (수만~수십만 개) 를 한꺼번에 채점한다.
+#  • (경계, 빈틈) 쌍마다 "이 경계가 이 빈틈에 떨어지는 shift 구간" 이 정해지므로, 구간 시작/끝을
+#    shift 격자에 bincount 하고 누적합을 내면 모든 shift 의 "빈틈에 떨어진 경계 수" 가 나온다
+#  • 구간 안 자막 수도 자막 시작 시각의 누적 히스토그램으로 한 번에 구한다
+# 먼저 겹칠 수 있는 모든 shift 를 COARSE_STEP_MS 간격으로 훑고, 가장 좋은 후보 주변만
+# STEP_MS 간격과 더 촘촘한 scale 로 다시 찾는다. 점수가 같은 shift 가 이어지면 그 가운데
+# (경계가 빈틈 한가운데) 를 고르고, 그런 구간이 여럿이면 0 에 가장 가까운 것을 고른다.
+#
+#
+# 쓰이는 자막 수만으로는 적용 여부를 정할 수 없다. 몇 분 어긋나도 대부분의 자막은 (엉뚱한 슬라이드에)
+# 여전히 쓰이고, 자막이 기록 구간의 일부만 덮으면 점수가 shift 에 따라 거의 바뀌지 않아 잡음으로
+# 생긴 최고점이 몇 개 더 쓰일 뿐인 엉뚱한 곳에 생긴다. 맞는 shift 에서는 경계들이 한꺼번에 빈틈에
+# 떨어지므로 점수가 뾰족하게 솟는다. 그래서 다음 중 하나이고, 쓰이는 자막도 MIN_GAIN 이상 늘 때만 적용한다.
+#  • 최고점이 PEAK_WIDTH_MS 보다 먼 shift 들의 최고점보다 경계 수의 PROMINENCE 만큼 높다 (뚜렷한 봉우리)
+#  • 원점이 어긋난 기록: 보정 전에 쓰이는 자막이, 기록 길이의 구간에 들어갈 수 있는 최대 자막 수의
+#    POOR_FIT 도 안 된다 (벽시계 기록처럼 자막과 거의 겹치지 않음. 이때는 어디로 옮겨도 낫다)
+
+COARSE_STEP_MS = 100
+STEP_MS = 10
+MAX_DRIFT = 0.002        # scale 은 1 ± MAX_DRIFT 안에서 찾는다 (1시간에 ±7.2초)
+COARSE_SCALES = 41
+FINE_SCALES = 21
+MIN_GAIN = 0.01          # 전체 자막 대비
+PEAK_WIDTH_MS = 5000     # 이보다 먼 shift 는 다른 봉우리로 본다
+PROMINENCE = 0.25        # 슬라이드 경계 수 대비
+MIN_PROMINENCE = 2
+POOR_FIT = 0.5           # 기록 길이의 구간에 들어갈 수 있는 최대 자막 수 대비
+MAX_SHIFTS = 400_000     # 기록/자막이 아주 길면 coarse 격자 간격을 늘린다
+_CELLS_PER_BATCH = 1_000_000  # (경계 x 빈틈) 행렬을 이 크기씩 나눠 계산
+
+
+def _cue_arrays(cues):
+    ordered = sorted(cues, key=lambda c: c[0])
+    starts = np.fromiter((c[0] for c in ordered), dtype=np.float64, count=len(ordered))
+    ends = np.fromiter((c[1] for c in ordered), dtype=np.float64, count=len(ordered))
+    # 앞선 자막 중 가장 늦게 끝나는 시각 (겹치는 자막이 있어도 빈틈을 바로 구한다)
+    return starts, np.maximum.accumulate(ends)
+
+
+def _gaps(starts, reach):
+    """자막이 없는 구간 [(왼쪽, 오른쪽)]. 첫 자막 앞과 마지막 자막 뒤도 포함"""
+    left = np.concatenate(([-np.inf], reach))
+    right = np.concatenate((starts, [np.inf]))
+    keep = left <= right
+    return left[keep], right[keep]
+
+
+def _scan(starts, gaps, span, edges, pivot, scale, low, step, count):
+    """shift 격자 (low + step * i, i < count) 전체의 점수 배열"""
+    # 빈틈에 떨어진 경계 수: 경계 b 가 빈틈 (l, r) 에 떨어지는 shift 는 [l - b, r - b].
+    # 격자 사이에 끼는 좁은 빈틈 (이어 붙은 자동 자막은 폭이 0) 도 놓치지 않도록 반 칸씩 넓힌다.
+    moved = (pivot + (edges - pivot) * scale) / step
+    gap_lo = (gaps[0] - low) / step - 0.5
+    gap_hi = (gaps[1] - low) / step + 0.5
+    delta = np.zeros(count + 1, dtype=np.int64)
+    batch = max(1, _CELLS_PER_BATCH // len(gap_lo))
+    for i in range(0, len(moved), batch):
+        part = moved[i:i + batch, None]
+        lo = np.clip(np.ceil(gap_lo - part), 0, count)
+        hi = np.clip(np.floor(gap_hi - part) + 1, 0, count)
+        hit = lo < hi
+        delta += np.bincount(lo[hit].astype(np.int64), minlength=count + 1)
+        delta -= np.bincount(hi[hit].astype(np.int64), minlength=count + 1)
+    in_gap = np.cumsum(delta[:count])
+
+    # 구간 [S', E'] 안에서 시작하는 자막 수 (S' = pivot + shift, E' = S' + 길이 * scale)
+    #   S' 보다 먼저 시작한 자막: (start - pivot - low) / step < i
+    #   E' 까지 시작한 자막:     (start - pivot - low - 길이 * scale) / step <= i
+    position = (starts - pivot - low) / step
+    before = np.bincount(np.clip(np.floor(position) + 1, 0, count).astype(np.int64), minlength=count + 1)
+    position -= (span[1] - pivot) * scale / step
+    until = np.bincount(np.clip(np.ceil(position), 0, count).astype(np.int64), minlength=count + 1)
+    inside = np.cumsum(until[:count] - before[:count])
+    return inside - (len(edges) - in_gap)
+
+
+def _best_index(scores, low, step):
+    """가장 높은 점수가 이어지는 구간들 중 shift 가 0 에 가장 가까운 구간의 가운데 인덱스"""
+    top = np.flatnonzero(scores == scores.max())
+    breaks = np.flatnonzero(np.diff(top) > 1)
+    centers = (top[np.r_[0, breaks + 1]] + top[np.r_[breaks, len(top) - 1]]) // 2
+    return int(centers[np.argmin(np.abs(low + step * centers))])
+
+
+def _search(starts, gaps, span, edges, pivot, scales, low, high, step):
+    """[low, high] 의 step 간격 shift 와 scales 중 가장 좋은 (점수, shift, scale, 다른 봉우리의 최고 점수).
+
+    점수가 같으면 1 에 가까운 scale. 다른 봉우리는 같은 scale 에서 PEAK_WIDTH_MS 보다 먼 shift (없으면 None).
+    """
+    step = max(step, (high - low) / MAX_SHIFTS)
+    count = int((high - low) // step) + 1
+    best = None
+    for scale in sorted(scales, key=lambda s: abs(s - 1)):
+        scores = _scan(starts, gaps, span, edges, pivot, scale, low, step, count)
+        index = _best_index(scores, low, step)
+        if best is None or scores[index] > best[0]:
+            far = np.abs(np.arange(count) - index) * step > PEAK_WIDTH_MS
+            second = int(scores[far].max()) if far.any() else None
+            best = (int(scores[index]), low + step * index, float(scale), second)
+    return best
+
+
+def _max_inside(starts, length):
+    """길이 length 인 구간 하나에서 시작할 수 있는 자막 수의 최댓값"""
+    return int((np.searchsorted(starts, starts + length, side="right") - np.arange(len(starts))).max())
+
+
+def transform(windows, shift_ms, scale, pivot_ms):
+    """[(start_ms, end_ms)] 를 변환한 정수 밀리초 구간 목록"""
+    return [
+        (round(pivot_ms + shift_ms + (start - pivot_ms) * scale), round(pivot_ms + shift_ms + (end - pivot_ms) * scale))
+        for start, end in windows
+    ]
+
+
+def kept_cues(windows, cues):
+    """구간 하나 안에 완전히 들어가는 자막 수 (alignment.window_text 가 쓰는 자막)"""
+    if not windows or not cues:
+        return 0
+    order = sorted(windows)
+    w_starts = np.array([w[0] for w in order], dtype=np.float64)
+    w_reach = np.maximum.accumulate(np.array([w[1] for w in order], dtype=np.float64))
+    c_starts = np.array([c[0] for c in cues], dtype=np.float64)
+    c_ends = np.array([c[1] for c in cues], dtype=np.float64)
+    k = np.searchsorted(w_starts, c_starts, side="right") - 1
+    return int(np.count_nonzero((k >= 0) & (c_ends <= w_reach[np.clip(k, 0, None)])))
+
+
+def calibrate(records, cues, drift=True):
+    """기록 (validate_records 의 records) 과 자막 [(start_ms, end_ms, text)] 사이의 시간 변환을 찾음.
+
+    (보정한 records, 정보 dict) 반환. 정보: applied, shift_ms, scale, pivot_ms, kept_before, kept_after, cues.
+    적용할 만큼 좋아지지 않으면 records 를 그대로 돌려준다 (applied=False). 기록이나 자막이 없으면 (records, None).
+    """
+    windows = [(r["start_ms"], r["end_ms"]) for r in records]
+    if not windows or not cues:
+        return records, None
+    span = (min(w[0] for w in windows), max(w[1] for w in windows))
+    pivot = span[0]
+    before = kept_cues(windows, cues)
+    info = {
+        "applied": False,
+        "shift_ms": 0,
+        "scale": 1.0,
+        "pivot_ms": pivot,
+        "kept_before": before,
+        "kept_after": before,
+        "cues": len(cues),
+    }
+    required = before + max(1, MIN_GAIN * len(cues))
+    if required > len(cues):
+        return records, info  # 어떻게 옮겨도 적용할 만큼 좋아질 수 없다
+
+    starts, reach = _cue_arrays(cues)
+    gaps = _gaps(starts, reach)
+    # 첫 시작 (pivot) 을 뺀 모든 슬라이드 경계. 그 앞의 자막은 inside 에서 빠진다
+    edges = np.unique(np.asarray(windows, dtype=np.float64).ravel())[1:]
+
+    # 변환한 기록 구간이 자막과 조금이라도 겹치는 모든 shift
+    length = span[1] - pivot
+    low = starts[0] - length * (1 + MAX_DRIFT if drift else 1) - pivot
+    high = reach[-1] - pivot
+    coarse = np.linspace(1 - MAX_DRIFT, 1 + MAX_DRIFT, COARSE_SCALES) if drift else [1.0]
+    score, shift, scale, second = _search(starts, gaps, span, edges, pivot, coarse, low, high, COARSE_STEP_MS)
+    prominent = second is None or score - second >= max(MIN_PROMINENCE, PROMINENCE * len(edges))
+    poor_fit = before < POOR_FIT * _max_inside(starts, length)
+    if not (prominent or poor_fit):
+        return records, info
+
+    # coarse 격자 간격 (와 scale 간격만큼 끝쪽 경계가 움직이는 거리) 안에서 다시 찾는다
+    radius = 2 * max(COARSE_STEP_MS, (high - low) / MAX_SHIFTS)
+    if drift:
+        spacing = coarse[1] - coarse[0]
+        fine = np.append(np.linspace(scale - spacing, scale + spacing, FINE_SCALES), scale)
+        radius += spacing * length
+    else:
+        fine = [1.0]
+    _, shift, scale, _ = _search(starts, gaps, span, edges, pivot, fine, shift - radius, shift + radius, STEP_MS)
+    scale = round(scale, 7)
+
+    # 마지막으로 격자 한 칸 안을 1ms 간격으로, 실제 정렬에 쓰이는 자막 수로 고른다 (같으면 가운데)
+    center = round(shift)
+    candidates = sorted(range(center - STEP_MS, center + STEP_MS + 1), key=lambda s: abs(s - center))
+    shift = max(candidates, key=lambda s: kept_cues(transform(windows, s, scale, pivot), cues))
+
+    moved = transform(windows, shift, scale, pivot)
+    after = kept_cues(moved, cues)
+    if after < required:
+        return records, info
+    info.update(applied=True, shift_ms=shift, scale=scale, kept_after=after)
+    calibrated = [dict(r, start_ms=start, end_ms=end) for r, (start, end) in zip(records, moved)]
+    return calibrated, info
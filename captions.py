@@ -0,0 +1,362 @@
+import os
+import re
+import html
+import mmap
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# --- 자막 파일 파싱 -------------------------------------------------------
+# streamlit / pandas 를 import 하지 않는 가벼운 모듈이다.
+# 병렬 파싱의 작업 프로세스가 이 모듈만 import 하면 되도록 srt_parser 에서 분리했다.
+#
+# 병렬 파싱은 입력을 빈 줄(큐 경계) 위치에서 byte 범위로 나누고, 범위마다
+# parse_cues 로 프로세스 풀에서 파싱한 뒤 순서대로 이어 붙인다.
+# 경계는 항상 연속된 줄바꿈이 끝나는 위치이므로, 나눠서 파싱한 결과는 전체를
+# 한 번에 파싱한 결과와 같다. 로컬 파일은 mmap 으로 열어 작업 프로세스가 자기 범위만 읽는다.
+
+PARALLEL_THRESHOLD_BYTES = 4 * 1024 * 1024  # 이보다 큰 입력은 (코어가 여러 개면) 병렬 파싱
+MIN_CHUNK_BYTES = 256 * 1024
+
+_TIME_RANGE = re.compile(r"(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})")
+
+
+def parse_srt_time(time_str):
+    """SRT 및 CSV 시간 문자열을 초 단위로 변환"""
+    time_str = time_str.replace('.', ',')
+    try:
+        time_obj = datetime.strptime(time_str, "%H:%M:%S,%f")
+        return time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1e6
+    except ValueError as e:
+        raise ValueError(f"Invalid time format: {time_str}. Expected HH:MM:SS,fff") from e
+
+
+def read_srt_file(srt_content):
+    """SRT 파일 내용을 읽고 자막 데이터를 파싱 (이전 dict 형식. 정렬에는 parse_cues 를 쓴다)"""
+    subtitles = []
+    blocks = srt_content.strip().split('\n\n')
+
+    for block in blocks:
+        lines = block.strip().split('\n')
+        if len(lines) < 3:
+            continue
+        index = lines[0]
+        time_range = lines[1]
+        text = ' '.join(lines[2:]).replace('\n', ' ')
+
+        try:
+            start_time, end_time = _TIME_RANGE.match(time_range).groups()
+            subtitles.append({
+                'index': index,
+                'start_time': parse_srt_time(start_time),
+                'end_time': parse_srt_time(end_time),
+                'text': text
+            })
+        except (re.error, ValueError):
+            continue
+
+    return subtitles
+
+
+# --- 형식 감지 + 단일 패스 토크나이저 ------------------------------------
+# SRT / WebVTT / SBV 를 한 줄씩 한 번만 훑는 상태 기계로 읽는다 (정규식 없음).
+#   SRT:    [번호]  "HH:MM:SS,mmm --> HH:MM:SS,mmm"  텍스트...  빈 줄
+#   WebVTT: "WEBVTT" 헤더, NOTE/STYLE/REGION 블록, [식별자]
+#           "[HH:]MM:SS.mmm --> [HH:]MM:SS.mmm [cue settings]"  텍스트...  빈 줄
+#   SBV:    "H:MM:SS.mmm,H:MM:SS.mmm"  텍스트...  빈 줄
+# 결과는 정렬 엔진이 쓰는 (start_ms, end_ms, text) 목록이다.
+# 큐는 항상 빈 줄에서 끝나므로, 빈 줄 경계에서 나눈 조각을 따로 읽어도 결과가 같다 (병렬 파싱).
+
+FORMATS = ("srt", "vtt", "sbv")
+UPLOAD_TYPES = ["srt", "vtt", "sbv"]
+
+_SEEK, _TEXT, _SKIP = 0, 1, 2
+
+
+def detect_format(head):
+    """파일 앞부분(bytes 또는 str)으로 형식 판별. 알 수 없으면 "srt" """
+    if isinstance(head, (bytes, bytearray, memoryview)):
+        head = bytes(head[:4096]).decode("utf-8", errors="ignore")
+    head = head.lstrip("\ufeff")
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    for line in head.split("\n")[:10]:
+        line = line.strip()
+        if not line:
+            continue
+        if "-->" in line:
+            return "srt" if "," in line.split("-->", 1)[0] else "vtt"
+        if _sbv_timing(line) is not None:
+            return "sbv"
+    return "srt"
+
+
+def _timestamp_ms(text):
+    """"[H]H:MM:SS,mmm" / "MM:SS.mmm" / "H:MM:SS.mmm" -> 밀리초. 형식이 아니면 None"""
+    text = text.strip()
+    if not text:
+        return None
+    for sep in (",", "."):
+        if sep in text:
+            clock, fraction = text.rsplit(sep, 1)
+            break
+    else:
+        clock, fraction = text, "0"
+    parts = clock.split(":")
+    if not 2 <= len(parts) <= 3 or not fraction.isdigit() or not all(p.isdigit() for p in parts):
+        return None
+    if len(parts) == 2:
+        parts.insert(0, "0")
+    hours, minutes, seconds = (int(p) for p in parts)
+    if minutes >= 60 or seconds >= 60:
+        return None
+    millis = int((fraction + "00")[:3])
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+
+def _arrow_timing(line):
+    """"a --> b [settings]" -> (start_ms, end_ms) 또는 None"""
+    if "-->" not in line:
+        return None
+    left, right = line.split("-->", 1)
+    right = right.strip().split(" ", 1)[0].split("\t", 1)[0]  # WebVTT cue settings 무시
+    start, end = _timestamp_ms(left), _timestamp_ms(right)
+    return (start, end) if start is not None and end is not None else None
+
+
+def _sbv_timing(line):
+    """"0:00:01.000,0:00:03.000" -> (start_ms, end_ms) 또는 None"""
+    if line.count(",") != 1 or "-->" in line:
+        return None
+    left, right = line.split(",")
+    start, end = _timestamp_ms(left), _timestamp_ms(right)
+    return (start, end) if start is not None and end is not None else None
+
+
+def _strip_tags(text):
+    """WebVTT 태그 (<c>, <v 화자>, <00:00:01.000> 등) 제거 + HTML entity 해제"""
+    if "<" in text:
+        out, depth = [], 0
+        for ch in text:
+            if ch == "<":
+                depth = 1
+            elif ch == ">" and depth:
+                depth = 0
+            elif not depth:
+                out.append(ch)
+        text = "".join(out)
+    return html.unescape(text) if "&" in text else text
+
+
+def parse_cues(text, fmt=None):
+    """자막 텍스트 -> [(start_ms, end_ms, text)]. fmt 를 생략하면 detect_format 으로 판별."""
+    fmt = fmt or detect_format(text)
+    timing = _sbv_timing if fmt == "sbv" else _arrow_timing
+    is_vtt = fmt == "vtt"
+    cues = []
+    state = _SEEK
+    start = end = None
+    lines = []
+    for raw in text.lstrip("\ufeff").split("\n"):
+        line = raw.rstrip("\r")
+        if not line.strip():
+            if state == _TEXT and lines:
+                body = " ".join(lines).strip()
+                cues.append((start, end, _strip_tags(body) if is_vtt else body))
+            state, lines = _SEEK, []
+            continue
+        if state == _SKIP:
+            continue
+        if state == _TEXT:
+            lines.append(line)
+            continue
+        # _SEEK: 타이밍 줄을 찾는다. 그 앞의 줄 (SRT 번호, WebVTT 식별자) 은 무시한다
+        if is_vtt and (line.startswith("WEBVTT") or line.startswith("NOTE")
+                       or line.startswith("STYLE") or line.startswith("REGION")):
+            state = _SKIP
+            continue
+        window = timing(line)
+        if window is not None:
+            start, end = window
+            state = _TEXT
+    if state == _TEXT and lines:
+        body = " ".join(lines).strip()
+        cues.append((start, end, _strip_tags(body) if is_vtt else body))
+    return cues
+
+
+# --- 병렬 파싱 ------------------------------------------------------------
+
+def _blank_line_end(data, pos, size):
+    """pos 이후 첫 빈 줄을 찾아, 그 뒤로 이어지는 줄바꿈까지 지난 위치를 반환. 없으면 -1"""
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            return -1
+        nxt = nl + 1
+        if data[nxt:nxt + 1] == b"\n" or data[nxt:nxt + 2] == b"\r\n":
+            end = nxt
+            while end < size and data[end:end + 1] in (b"\r", b"\n"):
+                end += 1  # 연속된 줄바꿈이 끝나는 곳에서 자른다
+            return end
+        pos = nxt
+
+
+def chunk_ranges(data, parts):
+    """data(bytes/mmap) 를 빈 줄 경계에서 최대 parts 개의 (start, end) 범위로 나눔"""
+    size = len(data)
+    target = max(MIN_CHUNK_BYTES, size // max(parts, 1) + 1)
+    ranges, start = [], 0
+    while start < size:
+        end = _blank_line_end(data, min(start + target, size), size)
+        if end < 0 or end >= size:
+            ranges.append((start, size))
+            break
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _parse_range(path, start, end, fmt):
+    """작업 프로세스: 파일의 [start, end) 범위를 파싱"""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return parse_cues(view[start:end].decode("utf-8"), fmt)
+
+
+def _parse_bytes(chunk, fmt):
+    return parse_cues(chunk.decode("utf-8"), fmt)
+
+
+_POOL = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _pool(workers):
+    """작업 프로세스 풀 (재사용). 서버 프로세스에는 스레드가 많으므로 fork 대신 spawn 을 쓴다."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_pool(pool):
+    """작업 프로세스가 죽어 (OOM 등) 못 쓰게 된 풀을 버림. 다음 병렬 파싱 때 새로 만든다."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL, _POOL_WORKERS = None, 0
+    pool.shutdown(wait=False)
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def parse_cues_parallel(source, fmt=None, workers=None):
+    """parse_cues 와 같은 결과를 여러 프로세스로 계산.
+
+    source 는 로컬 파일 경로(str) 또는 파일 내용(bytes).
+    """
+    workers = workers or default_workers()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                fmt = fmt or detect_format(view[:4096])
+                ranges = chunk_ranges(view, workers)
+        jobs = [(_parse_range, (source, start, end, fmt)) for start, end in ranges]
+    else:
+        fmt = fmt or detect_format(source)
+        ranges = chunk_ranges(source, workers)
+        jobs = [(_parse_bytes, (source[start:end], fmt)) for start, end in ranges]
+
+    if workers <= 1 or len(jobs) <= 1:
+        parts = [fn(*args) for fn, args in jobs]
+    else:
+        pool = _pool(workers)
+        try:
+            futures = [pool.submit(fn, *args) for fn, args in jobs]
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # 이번 요청은 이 프로세스에서 직렬로 파싱한다
+            _discard_pool(pool)
+            parts = [fn(*args) for fn, args in jobs]
+    return [cue for part in parts for cue in part]
+
+
+def read_captions(source):
+    """SRT / WebVTT / SBV 파일 -> [(start_ms, end_ms, text)].
+
+    형식은 앞부분으로 판별하고, 크기에 따라 직렬/병렬 파싱을 자동으로 고른다.
+    source 는 파일 경로 또는 bytes.
+    """
+    size = os.path.getsize(source) if isinstance(source, str) else len(source)
+    if size >= PARALLEL_THRESHOLD_BYTES and default_workers() > 1:
+        return parse_cues_parallel(source)
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            source = f.read()
+    return parse_cues(source.decode("utf-8"))
+
+
+# --- 롤링 자막 중복 제거 --------------------------------------------------
+# 자동 생성 자막은 두 줄이 번갈아 올라가며 (rolling caption) 앞 큐의 끝부분이
+# 다음 큐의 앞부분으로 반복된다. 그대로 이어 붙이면 슬라이드 텍스트가 실제 발화보다
+# 1.5~2배 길어지므로, 정렬 전에 인접한 큐 사이의 겹침 (앞 큐의 접미사 == 다음 큐의 접두사)
+# 을 단어 단위 rolling hash 로 찾아 다음 큐에서 잘라낸다. 큐 하나당 O(단어 수).
+
+MIN_OVERLAP_WORDS = 2  # 이보다 짧은 겹침 ("the", "그래서" 등) 은 우연일 수 있어 두지 않는다
+
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
+
+def _overlap(prev, cur):
+    """prev 의 접미사와 cur 의 접두사가 같은 가장 긴 단어 수"""
+    limit = min(len(prev), len(cur))
+    prefix = suffix = 0
+    power = 1
+    candidates = []
+    for k in range(1, limit + 1):
+        prefix = (prefix * _HASH_BASE + hash(cur[k - 1])) % _HASH_MOD
+        suffix = (suffix + hash(prev[-k]) * power) % _HASH_MOD
+        power = power * _HASH_BASE % _HASH_MOD
+        if prefix == suffix:
+            candidates.append(k)
+    for k in reversed(candidates):  # 해시 충돌 대비: 실제로 같은지 확인
+        if k >= MIN_OVERLAP_WORDS and prev[-k:] == cur[:k]:
+            return k
+    return 0
+
+
+def collapse_rolling(cues):
+    """[(start_ms, end_ms, text)] -> (겹침을 잘라낸 큐 목록, 통계 dict).
+
+    겹침은 항상 원래 (잘라내기 전) 앞 큐와 비교한다. 내용이 모두 앞 큐와 겹치는 큐는 뺀다.
+    """
+    collapsed = []
+    prev = []
+    for start, end, text in cues:
+        words = text.split()
+        k = _overlap(prev, words) if prev else 0
+        prev = words
+        if k == 0:
+            collapsed.append((start, end, text))
+        elif k < len(words):
+            collapsed.append((start, end, " ".join(words[k:])))
+    stats = {
+        "cues_in": len(cues),
+        "cues_out": len(collapsed),
+        "chars_in": sum(len(c[2]) for c in cues),
+        "chars_out": sum(len(c[2]) for c in collapsed),
+    }
+    return collapsed, stats
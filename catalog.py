@@ -0,0 +1,242 @@
+import os
+import sys
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+
+import serialization
+import shared_state
+from atomic_io import locked
+from record_schema import upgrade
+
+# --- 사용자별 기록 카탈로그 -----------------------------------------------
+# 강의 / 기록 파일 목록과 기록별 메타데이터를 timer_logs/<user>/.catalog.json 하나에 모아 둔다.
+# 목록이 필요할 때마다 디렉토리를 훑는 대신 이 작은 파일만 읽는다 (프로세스 안에서는
+# 파일의 mtime/size 가 같으면 다시 읽지도 않는다).
+#  • 기록을 저장 / 삭제 / 업로드 / 가져오기 / 동기화하는 모든 경로에서 update_record() 등으로
+#    잠금 아래 read-modify-write 하므로, 동시에 고쳐도 변경이 사라지지 않는다
+#  • 파일이 없으면 (처음 쓰는 사용자, 이전 버전 데이터) 전체를 훑어 새로 만든다
+#  • 고칠 때마다 shared_state 의 데이터 세대를 올려, 다른 프로세스 (replica) 의 세션도 목록 캐시를 버리게 한다
+#  • 앱 밖에서 파일을 직접 고쳤다면 `python catalog.py rebuild timer_logs/<user>` 로 다시 만든다
+#
+# 기록 항목: size, mtime_ns, sha256 (파일 bytes), slides, first_ms / last_ms (첫 슬라이드 시작 /
+# 마지막 슬라이드 끝), saved_at. 읽을 수 없는 파일은 "error" 만 남기고 목록에는 그대로 보인다.
+
+CATALOG_NAME = ".catalog.json"
+CATALOG_VERSION = 1
+
+_CACHE = {}  # catalog path -> ((mtime_ns, size), catalog)
+_CACHE_LOCK = threading.Lock()
+
+
+def catalog_path(base_dir):
+    return os.path.join(base_dir, CATALOG_NAME)
+
+
+def _empty():
+    return {"version": CATALOG_VERSION, "lectures": {}}
+
+
+def _is_lecture_dir(base_dir, name):
+    return not name.startswith(".") and os.path.isdir(os.path.join(base_dir, name))
+
+
+def _is_record_name(name):
+    return name.endswith(".json") and not name.startswith(".")
+
+
+def describe_record(path, lecture=None):
+    """기록 파일 하나의 카탈로그 항목"""
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+    entry = {
+        "size": len(data),
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    try:
+        payload = upgrade(serialization.loads(data), lecture)
+    except Exception as e:
+        entry["error"] = str(e) or type(e).__name__
+        return entry
+    records = payload.get("records", [])
+    starts = [r["start_ms"] for r in records if isinstance(r.get("start_ms"), int)]
+    ends = [r["end_ms"] for r in records if isinstance(r.get("end_ms"), int)]
+    entry.update({
+        "slides": len(records),
+        "first_ms": min(starts) if starts else None,
+        "last_ms": max(ends) if ends else None,
+        "saved_at": payload.get("saved_at"),
+    })
+    return entry
+
+
+def scan(base_dir):
+    """디렉토리를 모두 훑어 카탈로그를 만듦 (저장하지는 않음)"""
+    catalog = _empty()
+    if not os.path.isdir(base_dir):
+        return catalog
+    for lecture in sorted(os.listdir(base_dir)):
+        if not _is_lecture_dir(base_dir, lecture):
+            continue
+        lecture_dir = os.path.join(base_dir, lecture)
+        records = {}
+        for name in sorted(os.listdir(lecture_dir)):
+            path = os.path.join(lecture_dir, name)
+            if _is_record_name(name) and os.path.isfile(path):
+                records[name] = describe_record(path, lecture)
+        catalog["lectures"][lecture] = {"records": records}
+    return catalog
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read(base_dir):
+    """저장된 카탈로그 (파일이 바뀌지 않았으면 캐시). 없거나 깨졌으면 None"""
+    path = catalog_path(base_dir)
+    key = _stat_key(path)
+    if key is None:
+        return None
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    try:
+        catalog = serialization.read_file(path)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(catalog, dict) or catalog.get("version") != CATALOG_VERSION:
+        return None
+    with _CACHE_LOCK:
+        _CACHE[path] = (key, catalog)
+    return catalog
+
+
+def _write(base_dir, catalog):
+    path = catalog_path(base_dir)
+    serialization.write_file(path, catalog, compression=None)
+    with _CACHE_LOCK:
+        _CACHE[path] = (_stat_key(path), catalog)
+
+
+def rebuild(base_dir):
+    """디렉토리를 다시 훑어 카탈로그를 새로 저장 (복구용). 새 카탈로그 반환"""
+    with locked(catalog_path(base_dir)):
+        catalog = scan(base_dir)
+        if os.path.isdir(base_dir):
+            _write(base_dir, catalog)
+            shared_state.bump_generation(base_dir)
+    return catalog
+
+
+def load(base_dir):
+    """카탈로그 반환. 아직 없으면 디렉토리를 훑어 만든다. 반환값은 고치지 말 것."""
+    catalog = _read(base_dir)
+    if catalog is not None:
+        return catalog
+    with locked(catalog_path(base_dir)):
+        catalog = _read(base_dir)  # 기다리는 동안 다른 쪽에서 만들었을 수 있음
+        return catalog if catalog is not None else rebuild(base_dir)
+
+
+@contextmanager
+def _transaction(base_dir):
+    """잠금 아래 카탈로그를 읽고, 블록에서 고친 내용을 원자적으로 저장"""
+    with locked(catalog_path(base_dir)):
+        current = _read(base_dir)
+        catalog = scan(base_dir) if current is None else {
+            "version": CATALOG_VERSION,
+            "lectures": {name: {"records": dict(info["records"])} for name, info in current["lectures"].items()},
+        }
+        yield catalog
+        _write(base_dir, catalog)
+        shared_state.bump_generation(base_dir)
+
+
+# --- 조회 -----------------------------------------------------------------
+
+def lectures(base_dir):
+    """강의 이름 목록 (이름 순)"""
+    return sorted(load(base_dir)["lectures"])
+
+
+def record_names(base_dir, lecture):
+    """강의의 기록 파일 이름 목록 (최신 파일이 앞)"""
+    info = load(base_dir)["lectures"].get(lecture)
+    return sorted(info["records"], reverse=True) if info else []
+
+
+def record_paths(base_dir, lecture):
+    return [os.path.join(base_dir, lecture, name) for name in record_names(base_dir, lecture)]
+
+
+def records(base_dir, lecture):
+    """{기록 파일 이름: 메타데이터}"""
+    info = load(base_dir)["lectures"].get(lecture)
+    return dict(info["records"]) if info else {}
+
+
+def record_info(base_dir, lecture, filename):
+    info = load(base_dir)["lectures"].get(lecture)
+    return info["records"].get(filename) if info else None
+
+
+# --- 변경 -----------------------------------------------------------------
+
+def add_lecture(base_dir, lecture):
+    with _transaction(base_dir) as catalog:
+        catalog["lectures"].setdefault(lecture, {"records": {}})
+
+
+def remove_lecture(base_dir, lecture):
+    with _transaction(base_dir) as catalog:
+        catalog["lectures"].pop(lecture, None)
+
+
+def update_record(base_dir, lecture, filename):
+    """기록 파일을 저장한 뒤 호출. 파일이 없으면 항목을 지운다."""
+    path = os.path.join(base_dir, lecture, filename)
+    with _transaction(base_dir) as catalog:
+        info = catalog["lectures"].setdefault(lecture, {"records": {}})
+        if os.path.isfile(path):
+            info["records"][filename] = describe_record(path, lecture)
+        else:
+            info["records"].pop(filename, None)
+
+
+def remove_record(base_dir, lecture, filename):
+    with _transaction(base_dir) as catalog:
+        info = catalog["lectures"].get(lecture)
+        if info:
+            info["records"].pop(filename, None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Slide Scribe 기록 카탈로그 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = sub.add_parser("rebuild", help="디렉토리를 다시 훑어 카탈로그 재생성")
+    rebuild_cmd.add_argument("base_dir", help="timer_logs/<user> 디렉토리")
+    show_cmd = sub.add_parser("show", help="카탈로그 내용 출력")
+    show_cmd.add_argument("base_dir")
+    args = parser.parse_args(argv)
+
+    catalog = rebuild(args.base_dir) if args.command == "rebuild" else load(args.base_dir)
+    for lecture, info in sorted(catalog["lectures"].items()):
+        print(f"{lecture}: {len(info['records'])} records")
+        if args.command == "show":
+            for name, entry in sorted(info["records"].items(), reverse=True):
+                detail = entry.get("error") or f"{entry['slides']} slides, {entry['size']} bytes"
+                print(f"  {name}  {detail}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
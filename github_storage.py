@@ -1,139 +1,267 @@
 import json
+import time
 import base64
+import hashlib
+import threading
+import urllib.error
+import urllib.request
 from datetime import datetime
 import streamlit as st
 
-from github import Github
+import serialization
 
+# GitHub REST API 를 urllib 로 직접 호출한다 (로그인 경로에서 무거운 클라이언트 라이브러리를
+# import 하지 않도록). 기록 파일의 읽기/쓰기는 mirror.py 가 repo_api() 로 한다.
 
-# --- Simple manual cache --------------------------------------------------
-# lru_cache 는 *실패한* 호출 결과(None)도 캐시해 버리기 때문에, 첫 호출 시 토큰이
-# 설정되지 않았거나 일시적인 오류가 나면 세션 내내 GitHub 를 사용할 수 없게 된다.
-#
-# 아래 방식은 "성공한 경우"에만 캐싱하므로 이런 문제를 피할 수 있다.
+_API_URL = "https://api.github.com"
+_API_TIMEOUT = 10
 
-_REPO_CACHE = None  # type: ignore
 
+# lru_cache 는 *실패한* 호출 결과도 캐시해 버리기 때문에, 첫 호출 시 토큰이 설정되지 않았거나
+# 일시적인 오류가 나면 세션 내내 GitHub 를 사용할 수 없게 된다. 그래서 성공한 경우에만 기억한다.
+_REPO_REACHABLE = False  # REST 로 저장소 접근이 확인되었는지 (성공한 경우에만 True)
 
-def _get_repo():
-    """Return PyGithub Repository object, caching it after first success.
-
-    • 성공적으로 Repo 객체를 가져온 뒤에만 캐시한다.
-    • 첫 호출이 실패했더라도, 이후 토큰이 설정되면 재시도 가능하다.
-    """
-
-    global _REPO_CACHE
-
-    # 이미 성공적으로 받아온 Repo 가 있으면 그대로 사용
-    if _REPO_CACHE is not None:
-        return _REPO_CACHE
 
+def _secrets():
     token = st.secrets.get("GITHUB_TOKEN") if hasattr(st, "secrets") else None
     repo_name = st.secrets.get("GITHUB_REPO") if hasattr(st, "secrets") else None
+    return token, repo_name
 
-    if not token or not repo_name or Github is None:
-        return None
 
+def _rest(method: str, path: str, body=None):
+    """GitHub REST API 호출. 응답 JSON 을 반환"""
+    token, _ = _secrets()
+    request = urllib.request.Request(
+        f"{_API_URL}{path}",
+        data=json.dumps(body).encode("utf-8") if body is not None else None,
+        method=method,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "Content-Type": "application/json",
+        },
+    )
+    kind = _READ if method == "GET" else _WRITE
+    if not _admit(kind):
+        _count("denied")
+        raise RuntimeError("GitHub API 요청 한도에 걸려 잠시 요청을 보내지 않습니다")
     try:
-        gh = Github(token)
-        _REPO_CACHE = gh.get_repo(repo_name)
-        return _REPO_CACHE
-    except Exception:
-        return None
+        with urllib.request.urlopen(request, timeout=_API_TIMEOUT) as response:
+            _record_headers(response.headers)
+            return json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        _record_error(e)
+        raise
 
 
-def github_enabled() -> bool:
-    return _get_repo() is not None
+# --- GitHub API 사용량(rate limit) 관리 -------------------------------------
+# 여러 사용자가 토큰 하나를 같이 쓰면 시간당 요청 한도를 금방 다 쓴다.
+# 응답 헤더(X-RateLimit-*)로 토큰별 남은 요청 수를 추적하고:
+#  • 한도에 걸리면 (403/429) 초기화 시각 (또는 Retry-After) 까지 요청을 보내지 않는다
+#  • 남은 요청이 적으면 WRITE_RESERVE 만큼은 쓰기용으로 남겨 두고 읽기를 보류한다
+#  • 쓰기는 짧은 backoff 라면 기다렸다가 보낸다
+# 읽기가 보류되거나 실패해도 화면의 목록은 로컬 미러 (mirror.py) 에서 읽으므로 비지 않는다.
 
+WRITE_RESERVE = 20    # 이만큼은 쓰기용으로 남겨 둔다
+MAX_WRITE_WAIT = 5.0  # 초. backoff 가 이보다 짧으면 쓰기는 기다렸다가 보낸다
+DEFAULT_BACKOFF = 60.0
 
-def _user_base_dir(user_id: str) -> str:
-    return f"timer_logs/{user_id}"
+_READ, _WRITE = "read", "write"
 
+_BUDGET_LOCK = threading.Lock()
+_BUDGETS = {}  # token 해시 -> 사용량 상태
 
-def list_lectures(user_id: str):
-    repo = _get_repo()
-    if repo is None:
-        return []
-    base = _user_base_dir(user_id)
-    try:
-        contents = repo.get_contents(base)
-        return [c.name for c in contents if c.type == "dir"]
-    except Exception:
-        return []
 
+def _token_key():
+    token, _ = _secrets()
+    return hashlib.sha256((token or "").encode("utf-8")).hexdigest()[:12]
+
+
+def _budget():
+    key = _token_key()
+    budget = _BUDGETS.get(key)
+    if budget is None:
+        budget = _BUDGETS[key] = {
+            "remaining": None, "limit": None, "reset_at": None, "backoff_until": 0.0,
+            "requests": [], "reads": 0, "writes": 0, "denied": 0, "rate_limited": 0,
+        }
+    return budget
+
+
+def _note_request(budget, kind):
+    now = time.time()
+    budget["requests"] = [t for t in budget["requests"] if now - t < 60] + [now]
+    budget["writes" if kind == _WRITE else "reads"] += 1
+
+
+def _admit(kind):
+    """요청을 보내도 되는지. 쓰기는 짧은 backoff 동안 기다린다."""
+    with _BUDGET_LOCK:
+        budget = _budget()
+        wait = budget["backoff_until"] - time.time()
+    if wait > 0:
+        if kind == _READ or wait > MAX_WRITE_WAIT:
+            return False
+        time.sleep(wait)
+    with _BUDGET_LOCK:
+        budget = _budget()
+        remaining = budget["remaining"]
+        if kind == _READ and remaining is not None:
+            if remaining <= WRITE_RESERVE:
+                return False
+        if kind == _WRITE and remaining == 0:
+            return False
+        _note_request(budget, kind)
+        return True
 
-def list_json(user_id: str, lecture: str):
-    repo = _get_repo()
-    if repo is None:
-        return []
-    path = f"{_user_base_dir(user_id)}/{lecture}"
-    try:
-        contents = repo.get_contents(path)
-        return [c.name for c in contents if c.name.endswith(".json")]
-    except Exception:
-        return []
 
+def _update_budget(remaining, limit, reset_at):
+    with _BUDGET_LOCK:
+        budget = _budget()
+        budget["remaining"], budget["limit"], budget["reset_at"] = remaining, limit, reset_at
 
-def load_json(user_id: str, lecture: str, filename: str):
-    repo = _get_repo()
-    if repo is None:
-        return []
-    path = f"{_user_base_dir(user_id)}/{lecture}/{filename}"
+
+def _record_headers(headers):
+    """응답 헤더의 X-RateLimit-* 값 반영"""
+    if not headers:
+        return
     try:
-        file_content = repo.get_contents(path)
-        raw = base64.b64decode(file_content.content).decode()
-        return json.loads(raw)
-    except Exception:
-        return []
+        remaining = int(headers.get("X-RateLimit-Remaining") or headers.get("x-ratelimit-remaining"))
+        limit = int(headers.get("X-RateLimit-Limit") or headers.get("x-ratelimit-limit"))
+        reset_at = float(headers.get("X-RateLimit-Reset") or headers.get("x-ratelimit-reset"))
+    except (TypeError, ValueError):
+        return
+    _update_budget(remaining, limit, reset_at)
+
 
+def _record_error(error):
+    """rate limit 오류이면 backoff 설정. 오류의 HTTP 상태 코드 반환 (없으면 None)"""
+    status = getattr(error, "status", None) or getattr(error, "code", None)
+    headers = getattr(error, "headers", None) or {}
+    if status not in (403, 429):
+        return status
+    retry_after = headers.get("Retry-After") or headers.get("retry-after")
+    remaining = headers.get("X-RateLimit-Remaining") or headers.get("x-ratelimit-remaining")
+    if retry_after is None and remaining != "0" and status == 403:
+        return status  # 권한 오류 등 rate limit 과 무관한 403
+    _record_headers(headers)
+    reset_at = headers.get("X-RateLimit-Reset") or headers.get("x-ratelimit-reset")
+    now = time.time()
+    with _BUDGET_LOCK:
+        budget = _budget()
+        if retry_after is not None:
+            until = now + float(retry_after)
+        elif reset_at is not None:
+            until = float(reset_at)
+        elif budget["reset_at"]:
+            until = budget["reset_at"]
+        else:
+            until = now + DEFAULT_BACKOFF
+        budget["backoff_until"] = max(budget["backoff_until"], until)
+        budget["rate_limited"] += 1
+    return status
 
-def save_json(user_id: str, lecture: str, filename: str, data):
-    """Create or update a JSON file in GitHub."""
-    repo = _get_repo()
-    if repo is None:
+
+def _in_backoff():
+    with _BUDGET_LOCK:
+        return _budget()["backoff_until"] > time.time()
+
+
+def _count(field):
+    with _BUDGET_LOCK:
+        _budget()[field] += 1
+
+
+def budget_status():
+    """Settings 에 보여줄 사용량 지표"""
+    now = time.time()
+    with _BUDGET_LOCK:
+        budget = dict(_budget())
+    return {
+        "requests_per_min": len([t for t in budget["requests"] if now - t < 60]),
+        "remaining": budget["remaining"],
+        "limit": budget["limit"],
+        "reset_in": max(0.0, budget["reset_at"] - now) if budget["reset_at"] else None,
+        "backoff": max(0.0, budget["backoff_until"] - now),
+        "reads": budget["reads"],
+        "writes": budget["writes"],
+        "denied": budget["denied"],
+        "rate_limited": budget["rate_limited"],
+    }
+
+
+def repo_api(method: str, subpath: str, body=None):
+    """설정된 저장소 아래 REST API 호출 (예: repo_api("GET", "/git/trees/<sha>"))"""
+    _, repo_name = _secrets()
+    return _rest(method, f"/repos/{repo_name}{subpath}", body)
+
+
+def github_enabled() -> bool:
+    """GitHub 저장소를 사용할 수 있는지 (REST 로 확인)"""
+    global _REPO_REACHABLE
+
+    if _REPO_REACHABLE:
+        return True
+    token, repo_name = _secrets()
+    if not token or not repo_name:
         return False
-    path = f"{_user_base_dir(user_id)}/{lecture}/{filename}"
-    raw = json.dumps(data, ensure_ascii=False, indent=2)
-    message = f"{lecture}/{filename} updated {datetime.utcnow().isoformat()}"
     try:
-        existing = repo.get_contents(path)
-        repo.update_file(path, message, raw, existing.sha)
+        _rest("GET", f"/repos/{repo_name}")
     except Exception:
-        # create new file (or directory missing)
-        try:
-            repo.create_file(path, message, raw)
-        except Exception:
-            return False
+        # 요청 한도에 걸린 경우는 저장소가 없는 것이 아니므로 로컬로 바꾸지 않는다
+        return _in_backoff()
+    _REPO_REACHABLE = True
     return True
 
 
+def _user_base_dir(user_id: str) -> str:
+    return f"timer_logs/{user_id}"
+
+
+def user_path(user_id: str, path: str = "") -> str:
+    """저장소 안에서 사용자 기록 경로 (timer_logs/<user>/<path>)"""
+    return f"{_user_base_dir(user_id)}/{path}" if path else _user_base_dir(user_id)
+
+
 # -------- global file helpers --------
 
 
+def _get_global_contents(filename: str):
+    _, repo_name = _secrets()
+    try:
+        return _rest("GET", f"/repos/{repo_name}/contents/{filename}")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+
 def load_global_json(filename: str):
-    repo = _get_repo()
-    if repo is None:
+    if not github_enabled():
         return None
     try:
-        file_content = repo.get_contents(filename)
-        raw = base64.b64decode(file_content.content).decode()
-        return json.loads(raw)
+        contents = _get_global_contents(filename)
+        if contents is None:
+            return None
+        return serialization.loads(base64.b64decode(contents["content"]))
     except Exception:
         return None
 
 
 def save_global_json(filename: str, data):
-    repo = _get_repo()
-    if repo is None:
+    if not github_enabled():
         return False
-    raw = json.dumps(data, ensure_ascii=False, indent=2)
-    message = f"{filename} updated {datetime.utcnow().isoformat()}"
+    _, repo_name = _secrets()
+    raw = serialization.dumps(data, serialization.configured_compression())
+    body = {
+        "message": f"{filename} updated {datetime.utcnow().isoformat()}",
+        "content": base64.b64encode(raw).decode("ascii"),
+    }
     try:
-        existing = repo.get_contents(filename)
-        repo.update_file(filename, message, raw, existing.sha)
+        existing = _get_global_contents(filename)
+        if existing is not None:
+            body["sha"] = existing["sha"]
+        _rest("PUT", f"/repos/{repo_name}/contents/{filename}", body)
     except Exception:
-        try:
-            repo.create_file(filename, message, raw)
-        except Exception:
-            return False
+        return False
     return True 
\ No newline at end of file
@@ -0,0 +1,310 @@
+import os
+import time
+import base64
+import hashlib
+import threading
+import urllib.error
+import urllib.parse
+from datetime import datetime
+
+import serialization
+import search_index
+import catalog
+from atomic_io import atomic_write_bytes, locked
+from github_storage import repo_api, user_path
+
+# --- GitHub 저장소의 로컬 미러 --------------------------------------------
+# GitHub 저장소를 쓰더라도 모든 읽기는 로컬 timer_logs/<user> 에서 한다.
+# 이 디렉토리를 GitHub 의 timer_logs/<user> 와 맞춰 두는 것이 sync() 이다.
+#  • 원격 트리 SHA 가 지난번과 같으면 트리를 다시 받지 않는다 (요청 한 번)
+#  • 바뀌었으면 트리를 받아 blob SHA 가 다른 기록 파일만 내려받는다
+#  • 로컬에서 바뀐 (아직 올리지 못한) 파일은 git blob SHA 로 찾아 다시 올린다
+#  • 양쪽에서 모두 바뀐 파일은 원격 내용을 받고, 로컬 내용은 "<이름>.local.json" 으로 남긴다
+# 쓰기는 로컬에 먼저 저장한 뒤 push() 로 GitHub 에 올린다 (write-through).
+# 마지막으로 맞춘 상태는 timer_logs/<user>/.mirror.json 에 기록한다.
+# sync 로 바뀐 로컬 파일은 검색 인덱스와 사용자 카탈로그(catalog.py)에도 반영한다
+# (카탈로그가 바뀌면 shared_state 의 데이터 세대가 올라가 세션들의 목록 캐시가 갱신된다).
+
+MANIFEST_NAME = ".mirror.json"
+SYNC_INTERVAL = 30  # 초. 이보다 자주 원격 트리를 확인하지 않는다
+
+_SYNC_LOCKS = {}  # user_id -> threading.Lock
+_LAST_SYNC = {}   # user_id -> 마지막 sync 시각 (monotonic)
+_DEFAULT_BRANCH = None
+_STATE_LOCK = threading.Lock()
+
+
+def _sync_lock(user_id):
+    with _STATE_LOCK:
+        return _SYNC_LOCKS.setdefault(user_id, threading.Lock())
+
+
+def _manifest_path(base_dir):
+    return os.path.join(base_dir, MANIFEST_NAME)
+
+
+def has_manifest(base_dir):
+    return os.path.exists(_manifest_path(base_dir))
+
+
+def _load_manifest(base_dir):
+    try:
+        manifest = serialization.read_file(_manifest_path(base_dir))
+    except (OSError, ValueError):
+        return {"tree_sha": None, "blobs": {}}
+    manifest.setdefault("tree_sha", None)
+    manifest.setdefault("blobs", {})
+    return manifest
+
+
+def _save_manifest(base_dir, manifest):
+    serialization.write_file(_manifest_path(base_dir), manifest, compression=None)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """GitHub 가 돌려주는 blob SHA 와 같은 값 (git hash-object)"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _is_record_path(path):
+    """"<lecture>/<record>.json" 만 미러링한다 (.aligned 등 로컬 전용 파일 제외)"""
+    parts = path.split("/")
+    return len(parts) == 2 and parts[1].endswith(".json") and not any(p.startswith(".") for p in parts)
+
+
+def _local_records(base_dir):
+    """{"<lecture>/<record>.json": 로컬 경로}"""
+    found = {}
+    if not os.path.isdir(base_dir):
+        return found
+    for lecture in os.listdir(base_dir):
+        lecture_dir = os.path.join(base_dir, lecture)
+        if lecture.startswith(".") or not os.path.isdir(lecture_dir):
+            continue
+        for name in os.listdir(lecture_dir):
+            path = f"{lecture}/{name}"
+            if _is_record_path(path) and os.path.isfile(os.path.join(lecture_dir, name)):
+                found[path] = os.path.join(lecture_dir, name)
+    return found
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _contents_url(user_id, path):
+    return "/contents/" + urllib.parse.quote(user_path(user_id, path))
+
+
+def _default_branch():
+    global _DEFAULT_BRANCH
+    if _DEFAULT_BRANCH is None:
+        _DEFAULT_BRANCH = repo_api("GET", "")["default_branch"]
+    return _DEFAULT_BRANCH
+
+
+def _remote_tree_sha(user_id):
+    """원격 timer_logs/<user> 트리 SHA. 원격에 없으면 (404) None.
+
+    /contents/timer_logs 목록은 1,000개까지만 돌려주므로 사용자 트리를 "<branch>:<경로>" 로 바로 찾는다.
+    404 가 아닌 실패는 예외로 던진다 (원격이 비었다고 보고 로컬 파일을 지우지 않도록).
+    """
+    ref = urllib.parse.quote(f"{_default_branch()}:{user_path(user_id)}", safe="/:")
+    try:
+        tree = repo_api("GET", f"/git/trees/{ref}")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return tree["sha"]
+
+
+def _remote_tree(tree_sha):
+    """트리 SHA -> ({기록 파일 경로: blob SHA}, {강의 이름})"""
+    tree = repo_api("GET", f"/git/trees/{tree_sha}?recursive=1")
+    blobs, lectures = {}, set()
+    for entry in tree.get("tree", []):
+        path = entry.get("path", "")
+        if entry.get("type") == "tree" and "/" not in path and not path.startswith("."):
+            lectures.add(path)
+        elif entry.get("type") == "blob" and _is_record_path(path):
+            blobs[path] = entry["sha"]
+    return blobs, lectures
+
+
+def _download_blob(sha):
+    blob = repo_api("GET", f"/git/blobs/{sha}")
+    return base64.b64decode(blob["content"])
+
+
+def _reindex(base_dir, path, data):
+    lecture, record = path.split("/", 1)
+    try:
+        payload = serialization.loads(data)
+    except ValueError:
+        return
+    records = payload.get("records", []) if isinstance(payload, dict) else payload
+    search_index.index_records(base_dir, lecture, record, records)
+
+
+def _put(user_id, path, data, sha):
+    """파일 하나를 GitHub 에 올리고 새 blob SHA 반환"""
+    lecture, record = path.split("/", 1)
+    body = {
+        "message": f"{lecture}/{record} updated {datetime.utcnow().isoformat()}",
+        "content": base64.b64encode(data).decode("ascii"),
+    }
+    if sha:
+        body["sha"] = sha
+    try:
+        response = repo_api("PUT", _contents_url(user_id, path), body)
+    except urllib.error.HTTPError as e:
+        if e.code not in (409, 422):
+            raise
+        # 원격 SHA 가 manifest 와 다름 (다른 곳에서 먼저 저장) -> 현재 SHA 로 한 번 더 시도
+        try:
+            body["sha"] = repo_api("GET", _contents_url(user_id, path))["sha"]
+        except urllib.error.HTTPError as get_error:
+            if get_error.code != 404:
+                raise
+            body.pop("sha", None)
+        response = repo_api("PUT", _contents_url(user_id, path), body)
+    return response["content"]["sha"]
+
+
+def push(user_id, base_dir, lecture, filename):
+    """로컬 기록 파일을 GitHub 에 올림 (write-through). 실패하면 예외를 그대로 던진다."""
+    path = f"{lecture}/{filename}"
+    # 진행 중인 sync 가 같은 파일을 올리고 있을 수 있으므로 sync 와 직렬화한다
+    with _sync_lock(user_id):
+        data = _read_bytes(os.path.join(base_dir, lecture, filename))
+        with locked(_manifest_path(base_dir)):
+            sha = _load_manifest(base_dir)["blobs"].get(path)
+        new_sha = _put(user_id, path, data, sha)
+        with locked(_manifest_path(base_dir)):
+            manifest = _load_manifest(base_dir)
+            manifest["blobs"][path] = new_sha
+            _save_manifest(base_dir, manifest)
+    return os.path.join(base_dir, lecture, filename)
+
+
+def _delete(user_id, path, sha):
+    body = {"message": f"{path} deleted {datetime.utcnow().isoformat()}", "sha": sha}
+    try:
+        repo_api("DELETE", _contents_url(user_id, path), body)
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            raise
+
+
+def remove(user_id, base_dir, lecture, filename):
+    """GitHub 에서 기록 파일 삭제 (로컬 파일은 호출한 쪽에서 이미 지웠다고 가정)"""
+    path = f"{lecture}/{filename}"
+    with _sync_lock(user_id):
+        with locked(_manifest_path(base_dir)):
+            sha = _load_manifest(base_dir)["blobs"].get(path)
+        if sha is None:
+            try:
+                sha = repo_api("GET", _contents_url(user_id, path))["sha"]
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    return True  # 원격에 없음
+                raise
+        _delete(user_id, path, sha)
+        with locked(_manifest_path(base_dir)):
+            manifest = _load_manifest(base_dir)
+            manifest["blobs"].pop(path, None)
+            _save_manifest(base_dir, manifest)
+    return True
+
+
+def sync(user_id, base_dir, wait=True):
+    """로컬 미러를 원격과 맞춤. 바뀐 로컬 파일 수를 반환 (이미 다른 sync 가 진행 중이고 wait=False 면 None)"""
+    lock = _sync_lock(user_id)
+    if not lock.acquire(blocking=wait):
+        return None
+    try:
+        return _sync(user_id, base_dir)
+    finally:
+        with _STATE_LOCK:
+            _LAST_SYNC[user_id] = time.monotonic()
+        lock.release()
+
+
+def _sync(user_id, base_dir):
+    os.makedirs(base_dir, exist_ok=True)
+    with locked(_manifest_path(base_dir)):
+        manifest = _load_manifest(base_dir)
+    known = manifest["blobs"]
+    local = _local_records(base_dir)
+    local_sha = {path: git_blob_sha(_read_bytes(full)) for path, full in local.items()}
+
+    tree_sha = _remote_tree_sha(user_id)
+    if tree_sha == manifest["tree_sha"]:
+        remote, lectures = dict(known), set()
+    elif tree_sha is None:
+        remote, lectures = {}, set()
+    else:
+        remote, lectures = _remote_tree(tree_sha)
+
+    changed = 0
+    for lecture in lectures:
+        if not os.path.isdir(os.path.join(base_dir, lecture)):
+            os.makedirs(os.path.join(base_dir, lecture), exist_ok=True)
+            catalog.add_lecture(base_dir, lecture)
+
+    # 원격에서 바뀌었거나 새로 생긴 파일 내려받기
+    for path, sha in list(remote.items()):
+        mine = local_sha.get(path)
+        if mine == sha:
+            continue
+        if known.get(path) == sha:
+            if mine is None:
+                # 로컬에서 지웠는데 원격 삭제가 아직 안 됨 -> 지금 지운다
+                _delete(user_id, path, sha)
+                del remote[path]
+            continue  # 로컬에서만 바뀐 파일은 아래에서 올린다
+        data = _download_blob(sha)
+        full = os.path.join(base_dir, *path.split("/"))
+        if mine is not None and mine != known.get(path):
+            # 양쪽에서 모두 바뀜: 로컬 내용을 따로 남겨 두고 (아래에서 올라간다) 원격 내용을 받는다
+            os.replace(full, full[:-5] + ".local.json")
+            catalog.update_record(base_dir, *(path[:-5] + ".local.json").split("/", 1))
+        atomic_write_bytes(full, data)
+        _reindex(base_dir, path, data)
+        catalog.update_record(base_dir, *path.split("/", 1))
+        local_sha[path] = sha
+        changed += 1
+
+    # 원격에서 삭제된 파일 지우기 (한 번도 원격에 없던 로컬 파일은 아래에서 올린다)
+    if tree_sha != manifest["tree_sha"]:
+        for path in set(known) - set(remote):
+            if local_sha.get(path) == known[path]:
+                lecture, record = path.split("/", 1)
+                try:
+                    os.remove(os.path.join(base_dir, lecture, record))
+                except OSError:
+                    continue
+                search_index.remove_record(base_dir, lecture, record)
+                catalog.remove_record(base_dir, lecture, record)
+                local_sha.pop(path)
+                changed += 1
+
+    # 로컬에서 새로 생겼거나 바뀐 (아직 올리지 못한) 파일 올리기
+    for path in sorted(set(_local_records(base_dir))):
+        data = _read_bytes(os.path.join(base_dir, *path.split("/")))
+        sha = git_blob_sha(data)
+        if remote.get(path) == sha:
+            continue
+        remote[path] = _put(user_id, path, data, remote.get(path))
+
+    with locked(_manifest_path(base_dir)):
+        _save_manifest(base_dir, {"tree_sha": tree_sha, "blobs": remote})
+    return changed
+
+
+def needs_sync(user_id):
+    with _STATE_LOCK:
+        last = _LAST_SYNC.get(user_id)
+    return last is None or time.monotonic() - last >= SYNC_INTERVAL
@@ -0,0 +1,213 @@
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# --- rerun 프로파일링 (관리자용) ------------------------------------------
+# Settings 탭에서 관리자가 arm(N) 하면, 그 뒤로 실행되는 app.main rerun N 번을
+# 탭 함수별로 프로파일링한다 (대상 사용자를 정하면 그 사용자의 rerun 만).
+#  • cProfile: 탭 함수별 pstats (snakeviz, `python -m pstats` 등으로 열 수 있다)
+#  • 샘플링: 같은 스레드의 call stack 을 SAMPLE_INTERVAL 마다 찍어 collapsed stack
+#    ("탭;함수;함수 횟수") 으로 모은다. flamegraph.pl, speedscope 등에 그대로 넣으면 flame graph 가 된다.
+# 프로파일러는 프로세스에 하나만 켤 수 있으므로 (Python 3.12+ 는 sys.monitoring 사용)
+# 한 번에 rerun 하나만 잡는다. 다른 세션의 rerun 이 진행 중이면 그 rerun 은 건너뛴다.
+# 캡처하지 않을 때 rerun 마다 드는 비용은 전역 값 하나를 읽는 것뿐이다.
+
+SAMPLE_INTERVAL = 0.005  # 초
+MAX_RUNS = 50
+
+_LOCK = threading.Lock()
+_CAPTURE_LOCK = threading.Lock()  # 동시에 한 rerun 만 프로파일링
+_STATE = {
+    "remaining": 0,   # 앞으로 잡을 rerun 수
+    "user": None,     # None 이면 모든 사용자
+    "requested": 0,
+    "runs": 0,
+    "stats": {},      # section -> pstats.Stats
+    "wall": Counter(),  # section -> 누적 wall time (초)
+    "calls": Counter(),  # section -> 잡힌 횟수
+    "stacks": Counter(),  # (section, frame, ...) -> 샘플 수
+}
+_ACTIVE = threading.local()
+
+
+def arm(runs, user=None):
+    """다음 runs 번의 rerun 을 프로파일링하도록 설정 (이전 결과는 지운다)"""
+    with _LOCK:
+        _STATE.update(
+            remaining=max(1, min(int(runs), MAX_RUNS)), user=user or None, requested=int(runs), runs=0,
+            stats={}, wall=Counter(), calls=Counter(), stacks=Counter(),
+        )
+
+
+def disarm():
+    with _LOCK:
+        _STATE["remaining"] = 0
+
+
+def clear():
+    with _LOCK:
+        _STATE.update(remaining=0, requested=0, runs=0, stats={}, wall=Counter(), calls=Counter(), stacks=Counter())
+
+
+def status():
+    with _LOCK:
+        return {
+            "armed": _STATE["remaining"] > 0,
+            "user": _STATE["user"],
+            "requested": _STATE["requested"],
+            "runs": _STATE["runs"],
+            "sections": sorted(_STATE["stats"]),
+        }
+
+
+def _claim(user_id):
+    """이번 rerun 을 잡을지 결정. 잡으면 True (캡처 잠금을 쥔 상태)"""
+    if _STATE["remaining"] <= 0:
+        return False
+    if not _CAPTURE_LOCK.acquire(blocking=False):
+        return False
+    with _LOCK:
+        if _STATE["remaining"] > 0 and _STATE["user"] in (None, user_id):
+            _STATE["remaining"] -= 1
+            return True
+    _CAPTURE_LOCK.release()
+    return False
+
+
+class _Sampler(threading.Thread):
+    """대상 스레드의 stack 을 주기적으로 찍는다"""
+
+    def __init__(self, thread_id):
+        super().__init__(name="slide-scribe-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.section = None
+        self.base_depth = 0
+        self.stop_event = threading.Event()
+        self.stacks = Counter()
+
+    def run(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            section = self.section
+            frame = sys._current_frames().get(self.thread_id)
+            if section is None or frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[(section,) + tuple(stack[self.base_depth:])] += 1
+
+
+def _depth():
+    """section() 을 연 함수 (app.main) 까지의 stack 깊이. 샘플에서 그 바깥 frame 은 잘라낸다."""
+    # 0: _depth, 1: section, 2: contextlib __enter__, 3: section() 을 연 함수
+    depth, frame = 0, sys._getframe(3)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+@contextmanager
+def rerun(user_id):
+    """app.main 의 rerun 한 번을 감싼다. 잡힌 rerun 이면 안쪽 section() 들이 프로파일링된다."""
+    if not _claim(user_id):
+        yield
+        return
+    sampler = _Sampler(threading.get_ident())
+    _ACTIVE.sampler = sampler
+    sampler.start()
+    try:
+        yield
+    finally:
+        _ACTIVE.sampler = None
+        sampler.stop_event.set()
+        sampler.join()
+        with _LOCK:
+            _STATE["runs"] += 1
+            _STATE["stacks"].update(sampler.stacks)
+        _CAPTURE_LOCK.release()
+
+
+@contextmanager
+def section(name):
+    """탭 함수 하나를 감싼다. 잡힌 rerun 안에서만 프로파일링한다."""
+    sampler = getattr(_ACTIVE, "sampler", None)
+    if sampler is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    sampler.base_depth = _depth()
+    sampler.section = name
+    start = time.perf_counter()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        elapsed = time.perf_counter() - start
+        sampler.section = None
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:  # 기록된 호출이 없음
+            stats = None
+        with _LOCK:
+            if stats is not None and name in _STATE["stats"]:
+                _STATE["stats"][name].add(stats)
+            elif stats is not None:
+                _STATE["stats"][name] = stats
+            _STATE["wall"][name] += elapsed
+            _STATE["calls"][name] += 1
+
+
+def summary():
+    """탭 함수별 [{section, reruns, total_ms, mean_ms}]"""
+    with _LOCK:
+        return [
+            {
+                "section": name,
+                "reruns": _STATE["calls"][name],
+                "total_ms": round(_STATE["wall"][name] * 1000, 1),
+                "mean_ms": round(_STATE["wall"][name] * 1000 / max(_STATE["calls"][name], 1), 1),
+            }
+            for name in sorted(_STATE["calls"])
+        ]
+
+
+def top_functions(name, limit=20):
+    """section 안에서 누적 시간이 긴 함수 [{function, calls, tottime_ms, cumtime_ms}]"""
+    with _LOCK:
+        stats = _STATE["stats"].get(name)
+        raw = dict(stats.stats) if stats is not None else {}
+    rows = [
+        {
+            "function": f"{func} ({filename.rsplit('/', 1)[-1]}:{line})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2),
+        }
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in raw.items()
+    ]
+    return sorted(rows, key=lambda row: row["cumtime_ms"], reverse=True)[:limit]
+
+
+def pstats_bytes(name):
+    """section 의 pstats 파일 내용 (pstats.Stats.dump_stats 와 같은 형식)"""
+    with _LOCK:
+        stats = _STATE["stats"].get(name)
+        return marshal.dumps(stats.stats) if stats is not None else b""
+
+
+def collapsed_stacks():
+    """모든 section 의 샘플을 collapsed stack 형식 텍스트로"""
+    with _LOCK:
+        stacks = list(_STATE["stacks"].items())
+    lines = [";".join(frame.replace(";", ":") for frame in stack) + f" {count}" for stack, count in stacks]
+    return "\n".join(sorted(lines)) + ("\n" if lines else "")
@@ -0,0 +1,95 @@
+import math
+
+# --- 기록 편집 패치 ---------------------------------------------------------
+# Settings 탭의 기록 편집기는 파일 전체가 아니라 한 페이지 (window) 씩만 브라우저에 보낸다.
+# 편집 내용은 행 단위 패치로 서버 (session_state) 에 모아 두었다가 저장할 때 한 번에 적용한다.
+#
+# 패치: {"base_hash": 편집을 시작한 파일의 sha256, "rows": {행 id: 행 dict 또는 None}, "next_id": int}
+#  • 행 id 는 파일에서의 위치 (0 ~ n-1). 새로 추가한 행은 n 부터 next_id 로 번호를 받는다
+#  • rows[id] 가 dict 면 그 행을 바꾸거나 추가, None 이면 삭제
+# 화면의 행 순서는 파일 행 (삭제 제외) 다음에 추가한 행이다.
+
+COLUMNS = ("slide_title", "slide_number", "start_time", "end_time", "notes")
+
+
+def new_patch(base_hash, base_count):
+    return {"base_hash": base_hash, "rows": {}, "next_id": base_count}
+
+
+def _cell(value):
+    """편집기 값 비교용 정규화 (None / NaN / 빈 문자열은 모두 빈 값)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _row(record):
+    return {column: _cell(record.get(column)) for column in COLUMNS}
+
+
+def view(base_rows, patch):
+    """패치를 적용한 [(행 id, 행 dict)] (삭제한 행 제외). 바꾸지 않은 행은 파일의 행 그대로"""
+    rows = patch["rows"]
+    shown = []
+    for row_id, record in enumerate(base_rows):
+        if row_id in rows:
+            if rows[row_id] is not None:
+                shown.append((row_id, rows[row_id]))
+        else:
+            shown.append((row_id, record))
+    shown.extend((row_id, rows[row_id]) for row_id in sorted(rows) if row_id >= len(base_rows) and rows[row_id] is not None)
+    return shown
+
+
+def window(shown, page, page_size):
+    """page (1부터) 번째 페이지의 [(행 id, 행 dict)]"""
+    start = (page - 1) * page_size
+    return shown[start:start + page_size]
+
+
+def page_count(shown, page_size):
+    return max(1, math.ceil(len(shown) / page_size))
+
+
+def merge_window(patch, base_rows, page_rows, edited):
+    """편집기가 돌려준 한 페이지를 패치에 반영. 바뀐 행 수를 반환.
+
+    page_rows 는 편집기에 보낸 [(행 id, 행 dict)], edited 는 편집 결과 [(편집기 안 위치, 행 dict)].
+    위치가 page_rows 범위를 넘으면 (또는 None 이면) 새 행, edited 에 없는 위치의 행은 삭제된 것이다.
+    """
+    rows, changed = patch["rows"], 0
+    kept = {position: record for position, record in edited if position is not None and position < len(page_rows)}
+    added = [record for position, record in edited if position is None or position >= len(page_rows)]
+
+    for position, (row_id, shown) in enumerate(page_rows):
+        if position not in kept:
+            new = None
+        else:
+            new = _row(kept[position])
+            if new == _row(shown):
+                continue
+        changed += 1
+        if row_id < len(base_rows) and new is not None and new == _row(base_rows[row_id]):
+            rows.pop(row_id, None)  # 원래 값으로 되돌림
+        elif row_id >= len(base_rows) and new is None:
+            rows.pop(row_id, None)  # 추가했던 행을 다시 삭제
+        else:
+            rows[row_id] = new
+
+    for record in added:
+        new = _row(record)
+        if not any(new.values()):
+            continue  # 추가만 하고 비워둔 행
+        rows[patch["next_id"]] = new
+        patch["next_id"] += 1
+        changed += 1
+    return changed
+
+
+def changed_rows(patch):
+    return len(patch["rows"])
+
+
+def apply(base_rows, patch):
+    """저장할 전체 레코드 목록 (v1 형태)"""
+    return [dict(record) for _, record in view(base_rows, patch)]
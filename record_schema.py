@@ -0,0 +1,254 @@
+import os
+import re
+import sys
+import math
+import argparse
+from datetime import datetime
+
+import serialization
+
+# --- 타이머 기록 파일 스키마 ------------------------------------------------
+# v1: 레코드 dict 의 리스트. 시간은 "HH:MM:SS.fff" 문자열.
+# v2: 헤더(버전, 강의명, 저장 시각, 레코드 수, 전체 길이) + 레코드 리스트.
+#     시간은 정수 밀리초(start_ms / end_ms)로 저장하여 로드 시 파싱이 필요 없다.
+#
+# 디스크에는 항상 v2 로 쓰고, 읽을 때는 upgrade() 가 v1 을 투명하게 변환한다.
+
+SCHEMA_VERSION = 2
+
+# v1 레코드의 시간 필드 <-> v2 밀리초 필드
+_MS_KEYS = {"start_time": "start_ms", "end_time": "end_ms"}
+_STR_KEYS = {v: k for k, v in _MS_KEYS.items()}
+
+# 예전 CSV 변환본에서 쓰던 키 이름
+_LEGACY_KEYS = {
+    "Slide Title": "slide_title",
+    "Slide Number": "slide_number",
+    "Start Time": "start_time",
+    "End Time": "end_time",
+    "Notes": "notes",
+}
+
+
+# "HH:MM:SS.fff" / "HH:MM:SS,fff" (소수부 0~6자리, datetime.strptime 의 %f 와 같은 범위)
+_TIME_RE = re.compile(r"(\d{1,2}):([0-5]?\d):([0-5]?\d)(?:[.,](\d{1,6}))?")
+
+# 기록 한 행의 표준 필드와 기본값
+RECORD_FIELDS = ("slide_title", "slide_number", "start_ms", "end_ms", "notes")
+
+
+class RecordValidationError(ValueError):
+    """기록 파일 검증 실패. errors 에 발견된 모든 문제가 담긴다."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def parse_time_ms(value) -> int:
+    """"HH:MM:SS.fff" (또는 "HH:MM:SS,fff") 문자열을 정수 밀리초로 변환"""
+    match = _TIME_RE.fullmatch(value.strip()) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError(f"Invalid time format: {value}. Expected HH:MM:SS.fff")
+    hours, minutes, seconds, frac = match.groups()
+    millis = int((frac + '000')[:3]) if frac else 0
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + millis
+
+
+def format_time_ms(ms: int) -> str:
+    """정수 밀리초를 "HH:MM:SS.fff" 문자열로 변환"""
+    seconds, millis = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def is_v2(payload) -> bool:
+    return isinstance(payload, dict) and payload.get("version") == SCHEMA_VERSION
+
+
+def _encode_record(record: dict) -> dict:
+    out = {}
+    for key, value in record.items():
+        key = _LEGACY_KEYS.get(key, key)
+        ms_key = _MS_KEYS.get(key)
+        if ms_key is None:
+            out[key] = value
+            continue
+        try:
+            out[ms_key] = parse_time_ms(value)
+        except ValueError:
+            # 편집기에서 잘못 입력된 값도 손실 없이 보존한다
+            out[key] = value
+    return out
+
+
+def encode_records(records, lecture=None) -> dict:
+    """화면에서 쓰는 v1 형태의 레코드 리스트를 v2 payload 로 변환"""
+    encoded = [_encode_record(r) for r in records]
+    starts = [r["start_ms"] for r in encoded if isinstance(r.get("start_ms"), int)]
+    ends = [r["end_ms"] for r in encoded if isinstance(r.get("end_ms"), int)]
+    return {
+        "version": SCHEMA_VERSION,
+        "lecture": lecture,
+        "saved_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "record_count": len(encoded),
+        "duration_ms": (max(ends) - min(starts)) if starts and ends else 0,
+        "records": encoded,
+    }
+
+
+def upgrade(payload, lecture=None) -> dict:
+    """v1/v2 어떤 형태든 v2 payload 로 반환 (v2 는 그대로 통과)"""
+    if is_v2(payload):
+        return payload
+    if isinstance(payload, list):
+        return encode_records(payload, lecture)
+    raise ValueError("지원하지 않는 기록 파일 형식입니다.")
+
+
+def decode_records(payload) -> list:
+    """v2 payload(또는 v1 리스트)를 화면에서 쓰는 v1 형태 레코드 리스트로 변환"""
+    if isinstance(payload, list):
+        return payload
+    records = []
+    for record in payload.get("records", []):
+        out = {}
+        for key, value in record.items():
+            if key in _STR_KEYS:
+                out[_STR_KEYS[key]] = format_time_ms(value)
+            else:
+                out[key] = value
+        records.append(out)
+    return records
+
+
+def record_time_ms(record: dict, which: str) -> int:
+    """v2 레코드에서 'start' / 'end' 시간을 밀리초로 반환 (보존된 원문 값은 파싱)"""
+    value = record.get(f"{which}_ms")
+    if isinstance(value, int):
+        return value
+    return parse_time_ms(record.get(f"{which}_time"))
+
+
+def _is_blank(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def _text_field(value):
+    return "" if _is_blank(value) else str(value)
+
+
+def _time_field(record, which, position, errors):
+    ms_key, str_key = f"{which}_ms", f"{which}_time"
+    value = record.get(ms_key)
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    if value is None:
+        value = record.get(str_key)
+    try:
+        return parse_time_ms(value)
+    except ValueError:
+        errors.append(f"{position}번째 기록: {str_key} 값이 올바르지 않습니다 ({value!r}).")
+        return None
+
+
+def validate_records(payload, lecture=None) -> dict:
+    """기록 파일(v1 리스트 / v2 payload, 두 가지 키 스타일 모두)을 검사하고 표준 v2 payload 로 변환.
+
+    모든 레코드가 RECORD_FIELDS 만 갖고, 시간은 정수 밀리초, slide_number / 제목 / 메모는 문자열이다.
+    완전히 빈 행(편집기에서 추가만 하고 비워둔 행)은 버린다.
+    문제가 하나라도 있으면 발견된 문제를 모두 담은 RecordValidationError 를 던진다.
+    """
+    if is_v2(payload):
+        lecture = payload.get("lecture") or lecture
+        rows = payload.get("records")
+    else:
+        rows = payload
+    if not isinstance(rows, list):
+        raise RecordValidationError(["기록 파일은 레코드 목록이어야 합니다."])
+
+    errors, records = [], []
+    for position, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(f"{position}번째 기록: 객체가 아닙니다.")
+            continue
+        row = {_LEGACY_KEYS.get(k, k): v for k, v in row.items()}
+        if all(_is_blank(v) for v in row.values()):
+            continue
+        if _is_blank(row.get("slide_number")):
+            errors.append(f"{position}번째 기록: slide_number 가 없습니다.")
+        start_ms = _time_field(row, "start", position, errors)
+        end_ms = _time_field(row, "end", position, errors)
+        if start_ms is not None and end_ms is not None and end_ms < start_ms:
+            errors.append(f"{position}번째 기록: end_time 이 start_time 보다 빠릅니다.")
+        records.append({
+            "slide_title": _text_field(row.get("slide_title")),
+            "slide_number": _text_field(row.get("slide_number")),
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "notes": _text_field(row.get("notes")),
+        })
+    if errors:
+        raise RecordValidationError(errors)
+
+    payload = encode_records([], lecture)
+    payload["records"] = records
+    payload["record_count"] = len(records)
+    if records:
+        payload["duration_ms"] = max(r["end_ms"] for r in records) - min(r["start_ms"] for r in records)
+    return payload
+
+
+def migrate_file(path: str, dry_run: bool = False) -> bool:
+    """v1 기록 파일 하나를 v2 로 변환. 변환했으면 True"""
+    payload = serialization.read_file(path)
+    if is_v2(payload):
+        return False
+    lecture = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    upgraded = upgrade(payload, lecture)
+    if not dry_run:
+        serialization.write_file(path, upgraded)
+    return True
+
+
+def migrate_tree(root: str = "timer_logs", dry_run: bool = False):
+    """timer_logs/ 트리 전체의 v1 기록 파일을 v2 로 일괄 변환"""
+    migrated, skipped, failed = [], [], []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # .aligned/ 정렬 결과, .catalog.json / .mirror.json 등은 기록 파일이 아니다
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in sorted(filenames):
+            if not name.endswith(".json") or name.startswith("."):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                (migrated if migrate_file(path, dry_run) else skipped).append(path)
+            except (OSError, ValueError) as e:
+                failed.append((path, str(e)))
+    return migrated, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Slide Scribe 기록 파일 스키마 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="v1 기록 파일을 v2 로 변환")
+    migrate.add_argument("root", nargs="?", default="timer_logs")
+    migrate.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    migrated, skipped, failed = migrate_tree(args.root, args.dry_run)
+    for path in migrated:
+        print(f"migrated: {path}")
+    for path, error in failed:
+        print(f"failed:   {path} ({error})", file=sys.stderr)
+    print(f"{len(migrated)} migrated, {len(skipped)} already v2, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import os
+import sys
+import sqlite3
+import argparse
+from contextlib import closing
+
+import serialization
+from record_schema import upgrade
+
+# --- 전문 검색 인덱스 -----------------------------------------------------
+# timer_logs/<user>/search_index.sqlite3 에 사용자별로 저장한다.
+# slides 테이블이 원본이고, slide_fts 는 slides 를 content 로 쓰는 FTS5 인덱스다.
+# 한국어는 공백 단위 토큰화가 잘 맞지 않으므로 trigram 토크나이저를 쓴다.
+# (trigram 은 3글자 이상만 매칭되므로 짧은 검색어는 LIKE 로 처리)
+
+INDEX_FILENAME = "search_index.sqlite3"
+
+KIND_TRANSCRIPT = "transcript"
+KIND_TITLE = "title"
+KIND_NOTES = "notes"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slides (
+    id INTEGER PRIMARY KEY,
+    lecture TEXT NOT NULL,
+    record TEXT NOT NULL,
+    slide_number TEXT,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS slides_record ON slides (lecture, record, kind);
+CREATE VIRTUAL TABLE IF NOT EXISTS slide_fts USING fts5(
+    text, content='slides', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS slides_ai AFTER INSERT ON slides BEGIN
+    INSERT INTO slide_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS slides_ad AFTER DELETE ON slides BEGIN
+    INSERT INTO slide_fts (slide_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_MIN_MATCH_CHARS = 3
+
+
+def index_path(base_dir):
+    return os.path.join(base_dir, INDEX_FILENAME)
+
+
+def _tokenizer():
+    """trigram 토크나이저는 SQLite 3.34+ 에서만 지원된다."""
+    return "trigram" if sqlite3.sqlite_version_info >= (3, 34, 0) else "unicode61"
+
+
+def _connect(base_dir):
+    os.makedirs(base_dir, exist_ok=True)
+    conn = sqlite3.connect(index_path(base_dir), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA.format(tokenizer=_tokenizer()))
+    return conn
+
+
+def _replace(conn, lecture, record, kinds, rows):
+    placeholders = ",".join("?" * len(kinds))
+    conn.execute(
+        f"DELETE FROM slides WHERE lecture = ? AND record = ? AND kind IN ({placeholders})",
+        (lecture, record, *kinds),
+    )
+    conn.executemany(
+        "INSERT INTO slides (lecture, record, slide_number, kind, text) VALUES (?, ?, ?, ?, ?)",
+        [(lecture, record, str(number), kind, text) for number, kind, text in rows if text],
+    )
+
+
+def _record_rows(records):
+    rows = []
+    for record in records:
+        number = record.get("slide_number", record.get("Slide Number"))
+        for kind, key in ((KIND_TITLE, "slide_title"), (KIND_NOTES, "notes")):
+            value = record.get(key)
+            if isinstance(value, str) and value.strip():
+                rows.append((number, kind, value.strip()))
+    return rows
+
+
+# 색인 갱신은 저장 경로에서 호출되므로, 실패해도 저장 자체를 막지 않도록
+# 예외를 삼키고 False 를 반환한다 (github_storage 와 같은 방식).
+
+def index_records(base_dir, lecture, record, records):
+    """기록 파일 하나의 slide_title / notes 를 (재)색인"""
+    try:
+        with closing(_connect(base_dir)) as conn, conn:
+            _replace(conn, lecture, record, (KIND_TITLE, KIND_NOTES), _record_rows(records))
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def index_transcript(base_dir, lecture, record, slides):
+    """정렬된 자막 결과 [(slide_number, text)] 를 (재)색인"""
+    rows = [(number, KIND_TRANSCRIPT, text) for number, text in slides]
+    try:
+        with closing(_connect(base_dir)) as conn, conn:
+            _replace(conn, lecture, record, (KIND_TRANSCRIPT,), rows)
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def remove_record(base_dir, lecture, record):
+    try:
+        with closing(_connect(base_dir)) as conn, conn:
+            conn.execute("DELETE FROM slides WHERE lecture = ? AND record = ?", (lecture, record))
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def remove_lecture(base_dir, lecture):
+    try:
+        with closing(_connect(base_dir)) as conn, conn:
+            conn.execute("DELETE FROM slides WHERE lecture = ?", (lecture,))
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def search(base_dir, query, limit=50):
+    """query 가 포함된 슬라이드를 관련도 순으로 반환"""
+    query = query.strip()
+    if not query or not os.path.exists(index_path(base_dir)):
+        return []
+    with closing(_connect(base_dir)) as conn:
+        if len(query) >= _MIN_MATCH_CHARS or _tokenizer() != "trigram":
+            phrase = '"' + query.replace('"', '""') + '"'
+            cursor = conn.execute(
+                """
+                SELECT s.lecture, s.record, s.slide_number, s.kind,
+                       snippet(slide_fts, 0, '[', ']', '…', 16), bm25(slide_fts)
+                FROM slide_fts JOIN slides s ON s.id = slide_fts.rowid
+                WHERE slide_fts MATCH ?
+                ORDER BY bm25(slide_fts)
+                LIMIT ?
+                """,
+                (phrase, limit),
+            )
+        else:
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            cursor = conn.execute(
+                """
+                SELECT lecture, record, slide_number, kind, substr(text, 1, 120), 0.0
+                FROM slides WHERE text LIKE ? ESCAPE '\\'
+                ORDER BY lecture, record, id
+                LIMIT ?
+                """,
+                (f"%{escaped}%", limit),
+            )
+        keys = ("lecture", "record", "slide_number", "kind", "snippet", "score")
+        return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+
+def rebuild(base_dir):
+    """base_dir 아래 모든 기록 파일의 slide_title / notes 를 다시 색인.
+    자막(transcript) 색인은 정렬할 때마다 갱신되므로 그대로 둔다."""
+    count = 0
+    if not os.path.isdir(base_dir):
+        return count
+    with closing(_connect(base_dir)) as conn, conn:
+        conn.execute("DELETE FROM slides WHERE kind != ?", (KIND_TRANSCRIPT,))
+        for lecture in sorted(os.listdir(base_dir)):
+            lecture_dir = os.path.join(base_dir, lecture)
+            if not os.path.isdir(lecture_dir):
+                continue
+            for name in sorted(os.listdir(lecture_dir)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    payload = upgrade(serialization.read_file(os.path.join(lecture_dir, name)), lecture)
+                except Exception:
+                    continue
+                _replace(conn, lecture, name, (KIND_TITLE, KIND_NOTES), _record_rows(payload["records"]))
+                count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Slide Scribe 검색 인덱스 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = sub.add_parser("rebuild", help="기록 파일로부터 인덱스 재생성")
+    rebuild_cmd.add_argument("base_dir", help="timer_logs/<user> 디렉토리")
+    search_cmd = sub.add_parser("search", help="인덱스 검색")
+    search_cmd.add_argument("base_dir")
+    search_cmd.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        print(f"{rebuild(args.base_dir)} record files indexed")
+    else:
+        for hit in search(args.base_dir, args.query):
+            print(f"{hit['lecture']}/{hit['record']} slide {hit['slide_number']} [{hit['kind']}] {hit['snippet']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
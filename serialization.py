@@ -0,0 +1,93 @@
+import gzip
+import json
+
+import atomic_io
+
+# orjson / zstandard 는 선택 의존성이다. 설치되어 있지 않으면 stdlib 로 동작한다.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 압축 형식은 확장자가 아니라 payload 앞의 magic bytes 로 판별한다.
+# 그래서 파일 이름은 계속 *.json 이고, 압축 여부와 상관없이 loads() 로 읽을 수 있다.
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def configured_compression():
+    """secrets.toml 의 STORAGE_COMPRESSION ("gzip" / "zstd") 값. 없으면 None"""
+    try:
+        import streamlit as st
+        value = st.secrets.get("STORAGE_COMPRESSION")
+    except Exception:
+        return None
+    if value == "zstd" and zstandard is None:
+        return "gzip"
+    return value if value in COMPRESSIONS else None
+
+
+def _encode_json(obj) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # orjson 이 지원하지 않는 타입은 stdlib 로 처리
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj, compression=None) -> bytes:
+    """obj 를 compact JSON bytes 로 직렬화하고, 필요하면 압축"""
+    raw = _encode_json(obj)
+    if compression == "gzip":
+        # mtime=0: 같은 내용이면 항상 같은 bytes (GitHub diff / content hash 안정)
+        return gzip.compress(raw, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd 압축을 사용하려면 zstandard 패키지가 필요합니다.")
+        return zstandard.ZstdCompressor().compress(raw)
+    return raw
+
+
+def decompress(data: bytes) -> bytes:
+    """magic bytes 로 압축 형식을 판별하여 원본 JSON bytes 반환"""
+    if data[:2] == _GZIP_MAGIC:
+        return gzip.decompress(data)
+    if data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("zstd 로 압축된 파일을 읽으려면 zstandard 패키지가 필요합니다.")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def loads(data):
+    """JSON bytes/str (압축 여부 무관)를 파싱"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    raw = decompress(data)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_file(path, obj, compression="default"):
+    """obj 를 path 에 원자적으로 저장. compression 을 생략하면 configured_compression() 사용"""
+    if compression == "default":
+        compression = configured_compression()
+    data = dumps(obj, compression)
+    atomic_io.atomic_write_bytes(path, data)
+    return len(data)
+
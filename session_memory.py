@@ -0,0 +1,264 @@
+import os
+import sys
+import time
+import uuid
+import atexit
+import pickle
+import shutil
+import weakref
+import tempfile
+import threading
+
+import streamlit as st
+
+# --- 세션별 메모리 관리 ---------------------------------------------------
+# 세션 하나가 큰 값 (정렬 결과 DataFrame, 업로드한 파일 bytes 등) 을 session_state 에
+# 계속 들고 있으면, 동시 접속이 많을 때 서버 메모리가 끝없이 늘어난다.
+#
+# put()/get() 으로 다루는 값은 session_state 가 아니라 이 모듈의 저장소에 두고,
+# session_state 에는 작은 _Handle 만 넣는다. 그래서 다른 세션의 값도 (그 세션의
+# session_state 를 건드리지 않고) 안전하게 디스크로 내보낼 수 있다.
+#  • 세션의 메모리 합계가 SESSION_MEMORY_BUDGET_MB 를 넘으면 오래 안 쓴 값부터 디스크로 내보낸다
+#  • SESSION_IDLE_SECONDS 동안 쓰지 않은 값은 크기와 상관없이 디스크로 내보낸다
+#  • 디스크로 내보낸 값은 다음 get() 때 다시 읽는다
+#  • 세션이 사라지면 (session_state 와 함께 _Handle 이 정리되면) 값과 임시 파일도 지운다
+#    (같은 key 에 새 값을 넣을 때도 이전 값의 임시 파일을 지우고, 프로세스가 끝나면 임시 디렉토리를 지운다)
+# account() 는 나머지 session_state 값의 크기도 어림잡아 관리자 화면에 보여준다.
+
+DEFAULT_BUDGET_MB = 32
+DEFAULT_IDLE_SECONDS = 600
+MIN_SPILL_BYTES = 64 * 1024  # 이보다 작은 값은 디스크로 내보내지 않는다
+SWEEP_INTERVAL = 30
+SESSION_REPORT_TTL = 6 * 3600  # 이보다 오래 rerun 이 없던 세션은 관리자 화면에서 뺀다
+
+_SPILL_DIR = os.path.join(tempfile.gettempdir(), "slide-scribe-spill", str(os.getpid()))
+
+_LOCK = threading.Lock()
+_ENTRIES = {}   # (session_id, key) -> _Entry
+_SESSIONS = {}  # session_id -> {"user", "last_seen", "other": {key: bytes}}
+_LAST_SWEEP = 0.0
+
+
+def _setting(name, default):
+    try:
+        return float(st.secrets.get(name, default))
+    except Exception:
+        return default
+
+
+def memory_budget():
+    return int(_setting("SESSION_MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB) * 1024 * 1024)
+
+
+def idle_seconds():
+    return _setting("SESSION_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)
+
+
+def estimate_size(value, _depth=0):
+    """값이 차지하는 메모리를 어림잡음 (bytes). DataFrame 은 deep memory_usage 를 쓴다."""
+    if isinstance(value, _Handle):
+        return 0
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage) and hasattr(value, "columns"):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(v, _depth + 1) for v in value)
+    elif hasattr(value, "size") and hasattr(value, "getvalue"):  # st.file_uploader 의 UploadedFile
+        size += int(value.size)
+    return size
+
+
+class _Handle:
+    """session_state 에 대신 넣어 두는 작은 표식. 세션과 함께 사라지면 값도 정리된다."""
+
+    def __init__(self, session_id, key, token):
+        self.session_id = session_id
+        self.key = key
+        self.token = token
+        weakref.finalize(self, _drop, session_id, key, token)
+
+    def __repr__(self):
+        return f"<session_memory {self.key}>"
+
+
+class _Entry:
+    def __init__(self, token, value):
+        self.token = token
+        self.value = value
+        self.size = estimate_size(value)
+        self.spill_path = None
+        self.discarded = False
+        self.last_access = time.time()
+        self.lock = threading.Lock()
+
+    def spill(self):
+        """값을 임시 파일로 내보내고 메모리에서 지움. 내보냈으면 True"""
+        with self.lock:
+            if self.discarded or self.spill_path is not None or self.size < MIN_SPILL_BYTES:
+                return False
+            os.makedirs(_SPILL_DIR, exist_ok=True)
+            path = os.path.join(_SPILL_DIR, f"{self.token}.pkl")
+            with open(path, "wb") as f:
+                pickle.dump(self.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.spill_path, self.value = path, None
+            return True
+
+    def load(self):
+        with self.lock:
+            if self.spill_path is not None:
+                with open(self.spill_path, "rb") as f:
+                    self.value = pickle.load(f)
+                _remove_file(self.spill_path)
+                self.spill_path = None
+            self.last_access = time.time()
+            return self.value
+
+    def discard(self):
+        """저장소에서 빠진 값의 메모리와 임시 파일을 정리 (진행 중인 spill 이 끝난 뒤에)"""
+        with self.lock:
+            self.discarded = True
+            path, self.spill_path, self.value = self.spill_path, None, None
+        if path:
+            _remove_file(path)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _drop(session_id, key, token):
+    with _LOCK:
+        entry = _ENTRIES.get((session_id, key))
+        if entry is None or entry.token != token:
+            return  # 이미 새 값으로 바뀜
+        del _ENTRIES[(session_id, key)]
+    entry.discard()
+
+
+@atexit.register
+def _remove_spill_dir():
+    shutil.rmtree(_SPILL_DIR, ignore_errors=True)
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def put(key, value):
+    """큰 값을 저장. session_state[key] 에는 _Handle 이 들어간다."""
+    session_id = _session_id()
+    token = uuid.uuid4().hex
+    with _LOCK:
+        previous = _ENTRIES.pop((session_id, key), None)
+        _ENTRIES[(session_id, key)] = _Entry(token, value)
+    if previous is not None:
+        previous.discard()  # 이전 handle 의 finalizer 는 token 이 달라 아무것도 지우지 않는다
+    st.session_state[key] = _Handle(session_id, key, token)
+    _enforce_budget(session_id)
+
+
+def get(key, default=None):
+    """put() 으로 저장한 값 (디스크로 내보냈으면 다시 읽음). 일반 session_state 값도 그대로 돌려준다."""
+    handle = st.session_state.get(key, default)
+    if not isinstance(handle, _Handle):
+        return handle
+    with _LOCK:
+        entry = _ENTRIES.get((handle.session_id, key))
+    if entry is None or entry.token != handle.token:
+        return default
+    return entry.load()
+
+
+def pop(key, default=None):
+    value = get(key, default)
+    st.session_state.pop(key, None)
+    return value
+
+
+def _enforce_budget(session_id):
+    """세션의 메모리 합계가 예산을 넘으면 오래 안 쓴 값부터 디스크로 내보냄"""
+    budget = memory_budget()
+    with _LOCK:
+        entries = [e for (sid, _), e in _ENTRIES.items() if sid == session_id and e.spill_path is None]
+    resident = sum(e.size for e in entries)
+    for entry in sorted(entries, key=lambda e: e.last_access):
+        if resident <= budget:
+            break
+        if entry.spill():
+            resident -= entry.size
+
+
+def sweep():
+    """모든 세션에서 오래 쓰지 않은 값을 디스크로 내보냄. 내보낸 값 수 반환"""
+    now = time.time()
+    cutoff = now - idle_seconds()
+    with _LOCK:
+        idle = [e for e in _ENTRIES.values() if e.spill_path is None and e.last_access < cutoff]
+        for sid in [sid for sid, info in _SESSIONS.items() if now - info["last_seen"] > SESSION_REPORT_TTL]:
+            del _SESSIONS[sid]
+    return sum(1 for entry in idle if entry.spill())
+
+
+def account(user_id):
+    """이번 rerun 의 세션 메모리 사용량을 기록하고, 필요하면 백그라운드 sweep 을 시작"""
+    global _LAST_SWEEP
+    session_id = _session_id()
+    other = {}
+    for key in list(st.session_state.keys()):
+        try:
+            value = st.session_state[key]
+        except KeyError:
+            continue
+        if not isinstance(value, _Handle):
+            other[str(key)] = estimate_size(value)
+    now = time.time()
+    with _LOCK:
+        _SESSIONS[session_id] = {"user": user_id, "last_seen": now, "other": other}
+        start_sweep = now - _LAST_SWEEP >= SWEEP_INTERVAL
+        if start_sweep:
+            _LAST_SWEEP = now
+    _enforce_budget(session_id)
+    if start_sweep:
+        from background import executor
+        executor().submit(sweep)
+
+
+def report():
+    """관리자 화면용: 세션별 메모리 사용량 (메모리에 있는 양이 큰 순서)"""
+    now = time.time()
+    with _LOCK:
+        sessions = {sid: dict(info) for sid, info in _SESSIONS.items()}
+        entries = list(_ENTRIES.items())
+    rows = {}
+    for sid, info in sessions.items():
+        rows[sid] = {
+            "session": sid[:8], "user": info["user"], "idle_s": round(now - info["last_seen"]),
+            "resident_bytes": sum(info["other"].values()), "spilled_bytes": 0,
+            "keys": dict(info["other"]),
+        }
+    for (sid, key), entry in entries:
+        row = rows.setdefault(sid, {
+            "session": sid[:8], "user": None, "idle_s": None,
+            "resident_bytes": 0, "spilled_bytes": 0, "keys": {},
+        })
+        row["spilled_bytes" if entry.spill_path else "resident_bytes"] += entry.size
+        row["keys"][key] = entry.size
+    result = []
+    for row in rows.values():
+        top = sorted(row.pop("keys").items(), key=lambda kv: kv[1], reverse=True)[:3]
+        row["top_keys"] = ", ".join(f"{k} ({v / 1024:.0f} KB)" for k, v in top)
+        result.append(row)
+    return sorted(result, key=lambda r: r["resident_bytes"], reverse=True)
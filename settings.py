@@ -3,30 +3,26 @@ import json
 import os
 import shutil
 import pandas as pd
-import time
 from utils import get_user_base_dir
+from record_schema import decode_records, upgrade, validate_records, RecordValidationError
+import serialization
+from analytics import lecture_stats
+import search_index
+import aligned_store
+import alignment
+import archive
+import background
+import catalog
+import record_patches
+import github_storage
+import mirror
+import session_memory
+import profiling
+from auth import is_admin
 
 def load_lecture_names():
-    """lectures 디렉토리에서 사용 가능한 강의 목록 가져오기"""
-    timer_logs_dir = get_user_base_dir()
-    lectures = []
-    
-    if os.path.exists(timer_logs_dir):
-        for lecture_name in os.listdir(timer_logs_dir):
-            lecture_path = os.path.join(timer_logs_dir, lecture_name)
-            if os.path.isdir(lecture_path):
-                lectures.append(lecture_name)
-    
-    return lectures
-
-def save_lecture_names(lecture_names):
-    """lecture_names.json에 강의 이름 목록 저장"""
-    lecture_names_file = "lecture_names.json"
-    try:
-        with open(lecture_names_file, 'w', encoding='utf-8') as f:
-            json.dump(lecture_names, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        st.error(f"강의 이름 저장 중 오류: {e}")
+    """사용 가능한 강의 목록 가져오기 (사용자 카탈로그)"""
+    return catalog.lectures(get_user_base_dir())
 
 def ensure_directory(directory):
     """디렉토리가 존재하는지 확인하고 없으면 생성"""
@@ -34,38 +30,185 @@ def ensure_directory(directory):
         os.makedirs(directory)
 
 def get_json_files_for_lecture(lecture_name):
-    """특정 강의 디렉토리에서 사용 가능한 JSON 파일 목록 가져오기"""
+    """특정 강의에서 사용 가능한 JSON 파일 목록 가져오기 (사용자 카탈로그)"""
     if not lecture_name:
         return []
-    timer_logs_dir = os.path.join(get_user_base_dir(), lecture_name)
-    json_files = []
-    
-    if os.path.exists(timer_logs_dir):
-        for file_name in os.listdir(timer_logs_dir):
-            if file_name.endswith('.json'):
-                json_files.append(file_name)
-    
-    return json_files
+    return catalog.record_names(get_user_base_dir(), lecture_name)
+
+def _lecture_of(json_path):
+    return os.path.basename(os.path.dirname(json_path))
+
+def _file_hash_or_none(json_path):
+    return aligned_store.file_hash(json_path) if os.path.exists(json_path) else None
+
+def _invalidate_aligned(json_path, old_hash=None, records=None):
+    """기록 파일이 바뀌었으므로 정렬 결과를 갱신하고, 더 이상 맞지 않는 결과는 삭제.
+
+    수정 전 해시(old_hash)와 새 레코드가 주어지면 바뀐 슬라이드 구간만 부분 재정렬한다.
+    """
+    base_dir, lecture, record = get_user_base_dir(), _lecture_of(json_path), os.path.basename(json_path)
+    new_hash = _file_hash_or_none(json_path)
+    if old_hash and new_hash and old_hash != new_hash and records is not None:
+        alignment.carry_over(base_dir, lecture, record, old_hash, record, new_hash, records)
+    aligned_store.invalidate(base_dir, lecture, record, new_hash)
+    # SRT Parser 탭이 다음 rerun 에서 결과를 다시 읽도록 함
+    st.session_state.pop('result_source', None)
+    # 로그인 직후 prefetch 해 둔 파일 목록도 더 이상 맞지 않음
+    background.forget_prefetch(st.session_state.get('user_id'))
 
-def load_json_file(json_path):
-    """JSON 파일에서 타이머 기록 로드"""
+def _write_through(json_path):
+    """GitHub 저장소를 쓰면 로컬 기록 파일의 변경(저장 또는 삭제)을 백그라운드에서 GitHub 에 반영.
+    실패해도 다음 미러 동기화 때 다시 시도된다."""
+    if not github_storage.github_enabled():
+        return
+    user_id, base_dir = st.session_state.get('user_id'), get_user_base_dir()
+    lecture, record = _lecture_of(json_path), os.path.basename(json_path)
+    if os.path.exists(json_path):
+        background.submit_job("GitHub 업로드", mirror.push, user_id, base_dir, lecture, record)
+    else:
+        background.submit_job("GitHub 삭제", mirror.remove, user_id, base_dir, lecture, record)
+
+def _show_validation_errors(error):
+    st.error("기록 파일에 문제가 있습니다:\n" + "\n".join(f"- {message}" for message in error.errors))
+
+def _records_hash(payload):
+    """저장 시각 등 헤더를 뺀 레코드 내용의 sha256"""
+    return aligned_store.content_hash(serialization.dumps(payload["records"]))
+
+def _stored_records_hash(json_path):
+    try:
+        return _records_hash(validate_records(serialization.read_file(json_path), _lecture_of(json_path)))
+    except Exception:
+        return None
+
+def load_json_file_for_edit(json_path):
+    """편집할 기록과 그 파일의 sha256. 한 번 읽은 bytes 로 둘 다 구한다"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(json_path, "rb") as f:
+            data = f.read()
+        records = decode_records(upgrade(serialization.loads(data), _lecture_of(json_path)))
+        return records, aligned_store.content_hash(data)
     except Exception as e:
         st.error(f"JSON 파일 로드 중 오류: {e}")
-        return []
+        return [], None
 
 def save_json_file(json_path, data):
-    """타이머 기록을 JSON 파일로 저장"""
+    """타이머 기록을 검증한 뒤 v2 JSON 파일로 저장.
+
+    저장했으면 True, 실패하면 False, 파일의 레코드와 내용이 같아 쓰지 않았으면 None.
+    """
+    try:
+        payload = validate_records(data, _lecture_of(json_path))
+    except RecordValidationError as e:
+        _show_validation_errors(e)
+        return False
+    if os.path.exists(json_path) and _stored_records_hash(json_path) == _records_hash(payload):
+        return None  # 바뀐 것이 없으면 파일 / 카탈로그 / GitHub 모두 그대로 둔다
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        old_hash = _file_hash_or_none(json_path)
+        serialization.write_file(json_path, payload)
+        search_index.index_records(get_user_base_dir(), _lecture_of(json_path), os.path.basename(json_path), payload["records"])
+        catalog.update_record(get_user_base_dir(), _lecture_of(json_path), os.path.basename(json_path))
+        _invalidate_aligned(json_path, old_hash, payload["records"])
+        _write_through(json_path)
         return True
     except Exception as e:
         st.error(f"JSON 파일 저장 중 오류: {e}")
         return False
 
+PAGE_SIZES = (50, 100, 200)
+
+def edit_records(json_path, lecture, record):
+    """기록 편집기. 한 페이지씩만 브라우저에 보내고, 편집은 행 단위 패치로 모았다가 저장할 때 적용"""
+    base_rows, file_hash = load_json_file_for_edit(json_path)
+    if file_hash is None:
+        return
+    patch_key, revision_key = f"json_patch_{lecture}_{record}", f"json_editor_revision_{lecture}_{record}"
+    flash_key = f"json_save_message_{lecture}_{record}"
+    patch = st.session_state.get(patch_key)
+    if patch is None or (patch["base_hash"] != file_hash and not record_patches.changed_rows(patch)):
+        patch = st.session_state[patch_key] = record_patches.new_patch(file_hash, len(base_rows))
+    st.session_state.setdefault(revision_key, 0)
+    pending = record_patches.changed_rows(patch)
+    stale = patch["base_hash"] != file_hash
+
+    if not base_rows and not pending:
+        st.warning("선택한 파일을 불러올 수 없거나 파일이 비어있습니다.")
+        return
+
+    shown = record_patches.view(base_rows, patch)
+    st.write("기록 편집")
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("페이지당 행 수", PAGE_SIZES, key="json_page_size")
+    pages = record_patches.page_count(shown, page_size)
+    page_key = f"json_page_{lecture}_{record}"
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+    with col2:
+        page = st.number_input(f"페이지 (전체 {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    page_rows = record_patches.window(shown, page, page_size)
+    first = (page - 1) * page_size
+    st.caption(f"{len(shown)}행 중 {first + 1}~{first + len(page_rows)}행. "
+               "이 페이지의 편집은 '이 페이지 변경 적용' 을 눌러야 반영됩니다.")
+
+    # 보이는 페이지만 편집기로 보낸다. 적용할 때마다 key 를 바꿔 패치가 반영된 행으로 다시 그린다
+    with st.form(key=f"json_page_form_{lecture}_{record}"):
+        edited_df = st.data_editor(
+            pd.DataFrame([row for _, row in page_rows], columns=record_patches.COLUMNS).fillna(""),
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key=f"json_editor_{lecture}_{record}_{page_size}_{page}_{st.session_state[revision_key]}",
+            column_config={
+                "slide_title": st.column_config.TextColumn("Slide Title", help="슬라이드 제목"),
+                "slide_number": st.column_config.TextColumn("Slide Number", help="슬라이드 번호"),
+                "start_time": st.column_config.TextColumn("Start Time", help="시작 시간"),
+                "end_time": st.column_config.TextColumn("End Time", help="종료 시간"),
+                "notes": st.column_config.TextColumn("Notes", help="메모")
+            }
+        )
+        applied = st.form_submit_button("이 페이지 변경 적용", use_container_width=True)
+    if applied:
+        edited = [
+            (position if isinstance(position, int) else None, row)
+            for position, row in zip(edited_df.index, edited_df.to_dict('records'))
+        ]
+        if record_patches.merge_window(patch, base_rows, page_rows, edited):
+            st.session_state[revision_key] += 1
+            st.rerun()
+
+    if stale:
+        st.warning("편집하는 동안 다른 곳에서 이 파일이 바뀌었습니다. 변경을 취소하고 다시 편집해주세요.")
+    elif pending:
+        st.caption(f"저장하지 않은 변경: {pending}행")
+    col1, col2 = st.columns(2)
+    with col1:
+        save = st.button("변경사항 저장", use_container_width=True, disabled=stale or not pending)
+    with col2:
+        discard = st.button("변경 취소", use_container_width=True, disabled=not pending)
+
+    if save:
+        # 쓰기 직전에 다시 확인: 편집을 시작한 뒤 파일이 바뀌었으면 덮어쓰지 않는다
+        if _file_hash_or_none(json_path) != patch["base_hash"]:
+            st.warning("편집하는 동안 다른 곳에서 이 파일이 바뀌었습니다. 변경을 취소하고 다시 편집해주세요.")
+            return
+        saved = save_json_file(json_path, record_patches.apply(base_rows, patch))
+        if saved is False:
+            st.error("파일 저장 중 오류가 발생했습니다.")
+            return
+        st.session_state[flash_key] = "saved" if saved else "unchanged"
+    if save or discard:
+        st.session_state.pop(patch_key, None)
+        st.session_state[revision_key] += 1
+        st.rerun()
+
+    # 저장 결과 (이번 한 번만 보여주고 다음 rerun 에서는 사라진다)
+    outcome = st.session_state.pop(flash_key, None)
+    if outcome == "saved":
+        st.success(f"{record} 파일이 저장되었습니다.")
+    elif outcome == "unchanged":
+        st.info("변경된 내용이 없어 저장하지 않았습니다.")
+
 def manage_json_files():
     """JSON 파일 관리 기능 구현"""
     st.subheader("JSON 파일 관리")
@@ -97,15 +240,22 @@ def manage_json_files():
                 key=f"json_uploader_{selected_lecture}_{st.session_state[f'uploader_key_{selected_lecture}']}"
             )
             
-            # 업로드된 파일을 세션 상태에 저장
+            # 업로드된 파일을 세션 상태에 저장. 새 파일일 때만 복사한다 (rerun 마다 다시 넣지 않도록
+            # file_id 를 작은 키에 따로 두어, 디스크로 내보낸 값을 비교하려고 다시 읽지 않는다)
+            file_id_key = f"uploaded_file_id_{selected_lecture}"
             if uploaded_file is not None:
-                st.session_state[f"uploaded_file_{selected_lecture}"] = {
-                    "name": uploaded_file.name,
-                    "content": uploaded_file.read()
-                }
+                upload_key = f"uploaded_file_{selected_lecture}"
+                if st.session_state.get(file_id_key) != uploaded_file.file_id or upload_key not in st.session_state:
+                    session_memory.put(upload_key, {
+                        "file_id": uploaded_file.file_id,
+                        "name": uploaded_file.name,
+                        "content": uploaded_file.getvalue()
+                    })
+                    st.session_state[file_id_key] = uploaded_file.file_id
             else:
                 # 파일 업로더가 비어 있으면 세션 상태 초기화
                 st.session_state.pop(f"uploaded_file_{selected_lecture}", None)
+                st.session_state.pop(file_id_key, None)
             
             # 업로드된 기록 저장 버튼
             if st.button(
@@ -113,32 +263,39 @@ def manage_json_files():
                 key=f"save_uploaded_file_{selected_lecture}",
                 disabled=not st.session_state.get(f"uploaded_file_{selected_lecture}")
             ):
-                uploaded_file_info = st.session_state[f"uploaded_file_{selected_lecture}"]
+                uploaded_file_info = session_memory.get(f"uploaded_file_{selected_lecture}")
                 try:
-                    # JSON 파일 검증
-                    json_data = json.loads(uploaded_file_info["content"])
+                    # 기록 파일 검증 및 표준 v2 형식으로 변환 (v1 / 예전 키 이름도 허용)
+                    json_data = validate_records(serialization.loads(uploaded_file_info["content"]), selected_lecture)
                     # 파일 저장 경로
                     upload_path = os.path.join(get_user_base_dir(), selected_lecture, uploaded_file_info["name"])
                     ensure_directory(os.path.join(get_user_base_dir(), selected_lecture))
+                    old_hash = _file_hash_or_none(upload_path)
                     # JSON 파일 저장
-                    with open(upload_path, 'w', encoding='utf-8') as f:
-                        json.dump(json_data, f, ensure_ascii=False, indent=2)
+                    serialization.write_file(upload_path, json_data)
+                    search_index.index_records(get_user_base_dir(), selected_lecture, uploaded_file_info["name"], json_data["records"])
+                    catalog.update_record(get_user_base_dir(), selected_lecture, uploaded_file_info["name"])
+                    _invalidate_aligned(upload_path, old_hash, json_data["records"])
+                    _write_through(upload_path)
                     # 성공 메시지 저장
                     st.session_state[f"upload_success_{selected_lecture}"] = f"{uploaded_file_info['name']} 파일을 불러왔습니다."
                     # 업로드 상태 초기화 및 파일 업로더 리셋
                     st.session_state.pop(f"uploaded_file_{selected_lecture}", None)
+                    st.session_state.pop(file_id_key, None)
                     st.session_state[f"uploader_key_{selected_lecture}"] += 1
                 except json.JSONDecodeError:
                     st.error("업로드된 파일이 유효한 JSON 형식이 아닙니다.")
+                except RecordValidationError as e:
+                    _show_validation_errors(e)
+                except ValueError as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"파일 저장 중 오류: {e}")
             
-            # 성공 메시지 표시
-            if st.session_state.get(f"upload_success_{selected_lecture}"):
-                st.success(st.session_state[f"upload_success_{selected_lecture}"])
-                # 메시지 표시 후 지연해서 제거
-                time.sleep(2)
-                st.session_state.pop(f"upload_success_{selected_lecture}", None)
+            # 성공 메시지 표시 (이번 한 번만 보여주고 다음 rerun 에서는 사라진다)
+            success_message = st.session_state.pop(f"upload_success_{selected_lecture}", None)
+            if success_message:
+                st.success(success_message)
         
         with st.expander("JSON 파일 관리"):
             # JSON 파일 목록
@@ -155,10 +312,9 @@ def manage_json_files():
                 # 파일 삭제와 다운로드 버튼 (JSON 파일 선택 바로 아래)
                 col1, col2 = st.columns(2)
                 with col1:
-                    # JSON 파일 다운로드
+                    # JSON 파일 다운로드 (압축 저장된 파일도 일반 JSON 으로 내려줌)
                     json_path = os.path.join(get_user_base_dir(), selected_lecture, selected_json)
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
+                    file_content = serialization.dumps(serialization.read_file(json_path))
                     st.download_button(
                         label="기록 다운로드",
                         data=file_content,
@@ -172,42 +328,17 @@ def manage_json_files():
                         try:
                             json_path = os.path.join(get_user_base_dir(), selected_lecture, selected_json)
                             os.remove(json_path)
+                            search_index.remove_record(get_user_base_dir(), selected_lecture, selected_json)
+                            catalog.remove_record(get_user_base_dir(), selected_lecture, selected_json)
+                            st.session_state.pop(f"json_files_{selected_lecture}", None)
+                            _invalidate_aligned(json_path)
+                            _write_through(json_path)
                             st.success(f"{selected_json} 파일이 삭제되었습니다.")
                             st.rerun()
                         except Exception as e:
                             st.error(f"파일 삭제 중 오류: {e}")
                 
-                # 파일 내용 불러오기
-                json_data = load_json_file(json_path)
-                
-                if not json_data:
-                    st.warning("선택한 파일을 불러올 수 없거나 파일이 비어있습니다.")
-                    return
-                
-                # 데이터프레임으로 변환
-                df = pd.DataFrame(json_data)
-                
-                # 데이터 에디터
-                st.write("기록 편집")
-                edited_df = st.data_editor(
-                    df,
-                    num_rows="dynamic",
-                    use_container_width=True,
-                    key=f"json_editor_{selected_lecture}_{selected_json}",
-                    column_config={
-                        "slide_number": st.column_config.TextColumn("Slide Number", help="슬라이드 번호"),
-                        "start_time": st.column_config.TextColumn("Start Time", help="시작 시간"),
-                        "end_time": st.column_config.TextColumn("End Time", help="종료 시간"),
-                        "notes": st.column_config.TextColumn("Notes", help="메모")
-                    }
-                )
-                
-                # 변경사항 저장 버튼 (데이터 에디터 아래)
-                if st.button("변경사항 저장", use_container_width=True):
-                    if save_json_file(json_path, edited_df.to_dict('records')):
-                        st.success(f"{selected_json} 파일이 저장되었습니다.")
-                    else:
-                        st.error("파일 저장 중 오류가 발생했습니다.")
+                edit_records(json_path, selected_lecture, selected_json)
 
 def manage_lectures():
     """강의 이름 관리 기능 구현"""
@@ -219,9 +350,10 @@ def manage_lectures():
             if new_lecture.strip():
                 if new_lecture not in st.session_state.lecture_names:
                     st.session_state.lecture_names.append(new_lecture)
-                    save_lecture_names(st.session_state.lecture_names)
-                    # 디렉토리 생성
+                    # 디렉토리 생성 후 카탈로그에 등록
                     ensure_directory(os.path.join(get_user_base_dir(), new_lecture))
+                    catalog.add_lecture(get_user_base_dir(), new_lecture)
+                    background.forget_prefetch(st.session_state.get('user_id'))
                     st.rerun()
                     st.success(f"강의가 추가되었습니다: {new_lecture}")
                 else:
@@ -251,21 +383,264 @@ def manage_lectures():
                     lecture_dir = os.path.join(get_user_base_dir(), lecture)
                     # 디렉토리 삭제
                     if os.path.exists(lecture_dir):
+                        record_paths = [os.path.join(lecture_dir, name) for name in get_json_files_for_lecture(lecture)]
                         try:
                             shutil.rmtree(lecture_dir)
                         except Exception as e:
                             st.error(f"디렉토리 삭제 중 오류: {e}")
+                        for record_path in record_paths:
+                            _write_through(record_path)
+                    search_index.remove_lecture(get_user_base_dir(), lecture)
+                    catalog.remove_lecture(get_user_base_dir(), lecture)
                     st.session_state.lecture_names.remove(lecture)
-                save_lecture_names(st.session_state.lecture_names)
+                    st.session_state.pop(f"json_files_{lecture}", None)
+                background.forget_prefetch(st.session_state.get('user_id'))
                 st.success(f"{len(selected_lectures)}개의 강의가 삭제되었습니다.")
                 st.rerun()
             else:
                 st.warning("삭제할 강의를 선택해주세요.")
 
+def lecture_analytics():
+    """강의별 세션 통계 (Analytics) 구현"""
+    st.subheader("강의 분석")
+
+    available_lectures = st.session_state.get('lecture_names') or load_lecture_names()
+    if not available_lectures:
+        st.info("등록된 강의가 없습니다.")
+        return
+
+    selected_lecture = st.selectbox(
+        "강의 선택",
+        available_lectures,
+        key="lecture_selector_analytics",
+        index=None,
+        placeholder='강의를 선택해주세요'
+    )
+    if not selected_lecture:
+        return
+
+    with st.spinner("기록 분석 중..."):
+        stats = lecture_stats(st.session_state.get('user_id', 'anonymous'), selected_lecture, get_user_base_dir())
+
+    if stats["per_slide"].empty:
+        st.info("분석할 기록이 없습니다.")
+        return
+
+    sessions = stats["sessions"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("세션 수", len(sessions))
+    col2.metric("평균 강의 길이 (분)", f"{sessions['total_min'].mean():.1f}")
+    col3.metric("슬라이드당 평균 (초)", f"{stats['per_slide']['mean'].mean():.1f}")
+
+    st.write("슬라이드별 평균 시간 (초)")
+    st.bar_chart(stats["per_slide"]["mean"])
+
+    st.write("가장 오래 걸린 슬라이드")
+    st.dataframe(stats["slowest"].round(1), use_container_width=True)
+
+    st.write("세션별 강의 길이 추이 (분)")
+    st.line_chart(sessions[["total_min", "recorded_min"]])
+    st.dataframe(sessions.round(1), use_container_width=True)
+
+def manage_archives():
+    """강의 / 전체 기록 zip 내보내기 및 가져오기 구현"""
+    st.subheader("기록 일괄 내보내기 / 가져오기")
+    base_dir = get_user_base_dir()
+
+    with st.expander("zip 으로 내보내기"):
+        lectures = load_lecture_names()
+        scope = st.selectbox(
+            "내보낼 범위",
+            ["전체 강의"] + lectures,
+            key="archive_export_scope"
+        )
+        lecture = None if scope == "전체 강의" else scope
+        file_name = f"{lecture or os.path.basename(base_dir)}.zip"
+        # rerun 마다 zip 을 만들지 않도록 버튼을 누를 때만 만들고, 만든 bytes 는 session_memory 에 둔다
+        if st.button("zip 만들기", key="archive_export_build", use_container_width=True, disabled=not lectures):
+            with archive.export_zip(base_dir, lecture) as zip_file:
+                session_memory.put("archive_export", {"file_name": file_name, "data": zip_file.read()})
+        export = session_memory.get("archive_export")
+        if export and export["file_name"] == file_name:
+            st.download_button(
+                label="zip 다운로드",
+                data=export["data"],
+                file_name=file_name,
+                mime="application/zip",
+                use_container_width=True
+            )
+
+    with st.expander("zip 에서 가져오기"):
+        uploaded_zip = st.file_uploader(
+            "기록 zip 파일을 선택하세요 (<강의>/<기록>.json 구조)",
+            type=["zip"],
+            key=f"archive_uploader_{st.session_state.get('archive_uploader_key', 0)}"
+        )
+        if st.button("가져오기", key="archive_import", disabled=uploaded_zip is None, use_container_width=True):
+            try:
+                imported, errors = archive.import_zip(base_dir, uploaded_zip)
+            except Exception as e:
+                st.error(f"zip 파일을 읽을 수 없습니다: {e}")
+                return
+            for lecture, filename, path, old_hash, records in imported:
+                search_index.index_records(base_dir, lecture, filename, records)
+                _invalidate_aligned(path, old_hash, records)
+                _write_through(path)
+                st.session_state.pop(f"json_files_{lecture}", None)
+            if imported:
+                st.session_state.lecture_names = load_lecture_names()
+                st.success(f"{len(imported)}개의 기록 파일을 가져왔습니다.")
+            if errors:
+                st.warning("가져오지 못한 항목:\n" + "\n".join(f"- {name}: {error}" for name, error in errors))
+            st.session_state['archive_uploader_key'] = st.session_state.get('archive_uploader_key', 0) + 1
+
+def search_records():
+    """강의 기록 / 자막 전문 검색 구현"""
+    st.subheader("기록 검색")
+
+    col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+    with col1:
+        query = st.text_input("검색어", key="search_query_settings", placeholder="슬라이드 제목, 메모, 자막 내용 검색")
+    with col2:
+        if st.button("인덱스 다시 만들기", use_container_width=True, help="저장된 기록 파일의 제목/메모를 다시 색인합니다"):
+            count = search_index.rebuild(get_user_base_dir())
+            st.success(f"{count}개의 기록 파일을 색인했습니다.")
+    if not query.strip():
+        return
+
+    hits = search_index.search(get_user_base_dir(), query)
+    if not hits:
+        st.info("검색 결과가 없습니다.")
+        return
+    kind_labels = {
+        search_index.KIND_TRANSCRIPT: "자막",
+        search_index.KIND_TITLE: "강의안명",
+        search_index.KIND_NOTES: "메모",
+    }
+    st.dataframe(
+        pd.DataFrame([{
+            "강의": hit["lecture"],
+            "기록": hit["record"],
+            "Slide": hit["slide_number"],
+            "구분": kind_labels.get(hit["kind"], hit["kind"]),
+            "내용": hit["snippet"],
+        } for hit in hits]),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def github_usage():
+    """GitHub API 사용량(rate limit) 지표"""
+    st.subheader("GitHub API 사용량")
+    status = github_storage.budget_status()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("요청 / 분", status["requests_per_min"])
+    if status["remaining"] is None:
+        col2.metric("남은 요청", "-")
+    else:
+        col2.metric("남은 요청", f"{status['remaining']} / {status['limit']}")
+    col3.metric("대기 (초)", f"{status['backoff']:.0f}")
+    if status["backoff"] > 0:
+        st.warning("요청 한도에 걸려 잠시 GitHub 요청을 보내지 않습니다. 목록은 로컬 미러의 내용을 보여줍니다.")
+    if status["reset_in"] is not None:
+        st.caption(f"한도 초기화까지 {status['reset_in'] / 60:.0f}분")
+    st.caption(
+        f"읽기 {status['reads']} · 쓰기 {status['writes']} · "
+        f"보류 {status['denied']} · 한도 초과 {status['rate_limited']}"
+    )
+
+def session_memory_usage():
+    """관리자용: 세션별 메모리 사용량"""
+    st.subheader("세션 메모리 (관리자)")
+    rows = session_memory.report()
+    if not rows:
+        st.info("기록된 세션이 없습니다.")
+        return
+    frame = pd.DataFrame(rows)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("세션 수", len(frame))
+    col2.metric("메모리 (MB)", f"{frame['resident_bytes'].sum() / 1024 / 1024:.1f}")
+    col3.metric("디스크로 내보냄 (MB)", f"{frame['spilled_bytes'].sum() / 1024 / 1024:.1f}")
+    frame["resident_kb"] = (frame.pop("resident_bytes") / 1024).round(1)
+    frame["spilled_kb"] = (frame.pop("spilled_bytes") / 1024).round(1)
+    st.dataframe(frame, use_container_width=True, hide_index=True)
+    st.caption(
+        f"세션당 예산 {session_memory.memory_budget() / 1024 / 1024:.0f} MB · "
+        f"{session_memory.idle_seconds():.0f}초 동안 쓰지 않은 값은 디스크로 내보냅니다."
+    )
+
+def profiler_capture():
+    """관리자용: 다음 N 번의 rerun 을 탭 함수별로 프로파일링하고 결과 내려받기"""
+    st.subheader("성능 프로파일링 (관리자)")
+    status = profiling.status()
+    col1, col2, col3 = st.columns([1, 2, 1])
+    runs = col1.number_input("rerun 횟수", min_value=1, max_value=profiling.MAX_RUNS, value=5, key="profile_runs")
+    target = col2.text_input("대상 사용자", key="profile_user", placeholder="비우면 모든 사용자")
+    col3.write("")
+    if status["armed"]:
+        if col3.button("중지", key="profile_stop", use_container_width=True):
+            profiling.disarm()
+            st.rerun()
+        who = status["user"] or "모든 사용자"
+        st.info(f"{who} 의 rerun 을 프로파일링하는 중입니다 ({status['runs']} / {status['requested']}). 새로 고침하면 결과가 갱신됩니다.")
+    elif col3.button("캡처 시작", key="profile_start", use_container_width=True):
+        profiling.arm(runs, target.strip() or None)
+        st.rerun()
+
+    summary = profiling.summary()
+    if not summary:
+        st.caption("캡처한 결과가 없습니다.")
+        return
+    st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+    section = st.selectbox("탭 함수", [row["section"] for row in summary], key="profile_section")
+    top = profiling.top_functions(section)
+    if top:
+        st.dataframe(pd.DataFrame(top), use_container_width=True, hide_index=True)
+    col1, col2, col3 = st.columns(3)
+    col1.download_button(
+        "pstats 다운로드",
+        data=profiling.pstats_bytes(section),
+        file_name=f"{section}.pstats",
+        mime="application/octet-stream",
+        use_container_width=True,
+        disabled=not top
+    )
+    col2.download_button(
+        "flame graph (collapsed) 다운로드",
+        data=profiling.collapsed_stacks(),
+        file_name="slide-scribe.collapsed.txt",
+        mime="text/plain",
+        use_container_width=True
+    )
+    if col3.button("결과 지우기", key="profile_clear", use_container_width=True):
+        profiling.clear()
+        st.rerun()
+    st.caption("pstats 는 `python -m pstats` / snakeviz 로, collapsed stack 은 speedscope 나 flamegraph.pl 로 열 수 있습니다.")
+
 def settings_tab():
     """Settings 탭 구현"""
     with st.container():
         manage_lectures()
     st.divider()
     with st.container():
-        manage_json_files()
\ No newline at end of file
+        manage_json_files()
+    st.divider()
+    with st.container():
+        manage_archives()
+    st.divider()
+    with st.container():
+        search_records()
+    st.divider()
+    with st.container():
+        lecture_analytics()
+    if github_storage.github_enabled():
+        st.divider()
+        with st.container():
+            github_usage()
+    if is_admin(st.session_state.get('user_id')):
+        st.divider()
+        with st.container():
+            session_memory_usage()
+        st.divider()
+        with st.container():
+            profiler_capture()
\ No newline at end of file
@@ -0,0 +1,206 @@
+import os
+import time
+import sqlite3
+import threading
+
+import serialization
+
+# --- 프로세스 간 공유 상태 ------------------------------------------------
+# st.session_state 와 모듈 수준 캐시 (prefetch, 세션의 강의/파일 목록) 는 프로세스마다 따로 있다.
+# 그래서 Streamlit replica 여러 개를 (sticky session 없이) 띄우거나 작업 프로세스가 죽으면
+# 진행 중이던 강의를 잃는다. 다음 두 가지를 프로세스 밖 저장소에 둔다.
+#  • 사용자별 진행 중인 타이머 (timer_running, timer_start, elapsed_time, records 등).
+#    어느 replica 에서 새 세션을 열어도 이어서 기록할 수 있다. 같은 사용자가 여러 곳에서
+#    동시에 기록하면 마지막에 쓴 쪽이 남는다.
+#  • 데이터 세대 (generation): 기록/강의가 바뀔 때마다 (catalog.py 의 모든 변경) 올라가는 값.
+#    다른 프로세스의 세션은 이 값이 바뀐 것을 보고 자기 캐시를 버린다.
+#
+# 저장소는 secrets.toml 의 SHARED_STATE 로 고른다.
+#  • 없거나 "memory": 프로세스 안 dict (replica 하나일 때. 이전과 같은 동작)
+#  • "sqlite:///<경로>": 같은 호스트의 프로세스들이 공유하는 SQLite 파일 (WAL)
+# 다른 저장소 (Redis 등) 는 register_backend("redis", factory) 로 붙인다. factory 는 URL 을 받아
+# MemoryBackend 와 같은 메서드를 가진 객체를 돌려주면 된다.
+# 저장소를 쓸 수 없으면 (잠김, 디스크 오류 등) 앱은 공유 없이 계속 동작한다.
+
+TIMER_TTL = 24 * 3600  # 초. 이보다 오래 갱신되지 않은 타이머는 이어서 불러오지 않는다
+
+
+class MemoryBackend:
+    """프로세스 안에서만 공유하는 기본 저장소"""
+
+    def __init__(self, url=None):
+        self._lock = threading.Lock()
+        self._timers = {}       # user_id -> (updated_at, state bytes)
+        self._generations = {}  # scope -> int
+
+    def load_timer(self, user_id):
+        """(updated_at, state bytes) 또는 None"""
+        with self._lock:
+            return self._timers.get(user_id)
+
+    def save_timer(self, user_id, state):
+        with self._lock:
+            self._timers[user_id] = (time.time(), state)
+
+    def clear_timer(self, user_id):
+        with self._lock:
+            self._timers.pop(user_id, None)
+
+    def generation(self, scope):
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def bump_generation(self, scope):
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            return self._generations[scope]
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS timers (
+    user_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    state BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generations (
+    scope TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteBackend:
+    """같은 호스트의 여러 프로세스가 공유하는 저장소 (WAL 이라 읽기가 쓰기를 기다리지 않는다)"""
+
+    def __init__(self, url):
+        self.path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+        self._local = threading.local()  # 스레드별 연결 (rerun 마다 다시 열지 않는다)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SQLITE_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_timer(self, user_id):
+        row = self._conn().execute(
+            "SELECT updated_at, state FROM timers WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def save_timer(self, user_id, state):
+        self._conn().execute(
+            "INSERT INTO timers (user_id, updated_at, state) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET updated_at = excluded.updated_at, state = excluded.state",
+            (user_id, time.time(), state),
+        )
+
+    def clear_timer(self, user_id):
+        self._conn().execute("DELETE FROM timers WHERE user_id = ?", (user_id,))
+
+    def generation(self, scope):
+        row = self._conn().execute("SELECT value FROM generations WHERE scope = ?", (scope,)).fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self, scope):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO generations (scope, value) VALUES (?, 1) "
+                "ON CONFLICT (scope) DO UPDATE SET value = value + 1",
+                (scope,),
+            )
+            value = conn.execute("SELECT value FROM generations WHERE scope = ?", (scope,)).fetchone()[0]
+            conn.execute("COMMIT")
+            return value
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+_BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend}
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def register_backend(scheme, factory):
+    """SHARED_STATE = "<scheme>://..." 일 때 쓸 저장소 등록"""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        _BACKENDS[scheme] = factory
+        _BACKEND = None
+
+
+def configured_url():
+    """secrets.toml 의 SHARED_STATE 값. 없으면 "memory" """
+    try:
+        import streamlit as st
+        return st.secrets.get("SHARED_STATE") or "memory"
+    except Exception:
+        return "memory"
+
+
+def backend():
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            url = configured_url()
+            factory = _BACKENDS.get(url.split(":", 1)[0])
+            try:
+                _BACKEND = factory(url) if factory else MemoryBackend()
+            except Exception:
+                _BACKEND = MemoryBackend()  # 공유 저장소를 열 수 없으면 프로세스 안에서만 공유
+        return _BACKEND
+
+
+def load_timer(user_id):
+    """저장된 진행 중인 타이머 상태 (dict). 없거나 TIMER_TTL 보다 오래됐으면 None"""
+    try:
+        stored = backend().load_timer(user_id)
+        if stored is None or time.time() - stored[0] > TIMER_TTL:
+            return None
+        return serialization.loads(stored[1])
+    except Exception:
+        return None
+
+
+def save_timer(user_id, state):
+    """진행 중인 타이머 상태 (JSON 으로 직렬화 가능한 dict) 저장. 성공하면 True"""
+    try:
+        backend().save_timer(user_id, serialization.dumps(state))
+        return True
+    except Exception:
+        return False
+
+
+def clear_timer(user_id):
+    try:
+        backend().clear_timer(user_id)
+        return True
+    except Exception:
+        return False
+
+
+def generation(scope):
+    """scope (사용자 디렉토리) 의 데이터 세대. 저장소를 읽을 수 없으면 None"""
+    try:
+        return backend().generation(os.path.normpath(scope))
+    except Exception:
+        return None
+
+
+def bump_generation(scope):
+    """scope 의 데이터가 바뀌었음을 알림. 새 세대 (또는 None) 반환"""
+    try:
+        return backend().bump_generation(os.path.normpath(scope))
+    except Exception:
+        return None
@@ -1,34 +1,36 @@
 import streamlit as st
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-import json
 import os
+import hashlib
 import pandas as pd
 import streamlit.components.v1 as components
-import glob
 from utils import get_user_base_dir
-from github_storage import github_enabled, list_lectures, list_json, load_json, save_json
+from github_storage import github_enabled
+from record_schema import encode_records, decode_records, upgrade, record_time_ms
+import serialization
+import search_index
+import aligned_store
+import alignment
+import background
+import catalog
+import mirror
+import shared_state
 
 def _user_id():
     return st.session_state.get('user_id', 'anonymous')
 
 def load_lecture_names():
-    """Return list of lectures for current user (GitHub or local)."""
-    if github_enabled():
-        return list_lectures(_user_id())
-    timer_logs_dir = get_user_base_dir()
-    if not os.path.exists(timer_logs_dir):
-        return []
-    return [d for d in os.listdir(timer_logs_dir) if os.path.isdir(os.path.join(timer_logs_dir, d))]
+    """Return list of lectures for current user.
 
-def save_lecture_names(lecture_names):
-    """lecture_names.json에 강의 이름 목록 저장"""
-    lecture_names_file = "lecture_names.json"
-    try:
-        with open(lecture_names_file, 'w', encoding='utf-8') as f:
-            json.dump(lecture_names, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        st.error(f"강의 이름 저장 중 오류: {e}")
+    With GitHub storage the local directory is a mirror of the repository
+    (see `mirror.py`), so this always reads local disk — via the per-user
+    catalog (see `catalog.py`) rather than a directory scan.
+    """
+    prefetched = background.prefetched_lectures(_user_id())
+    if prefetched is not None:
+        return prefetched
+    return catalog.lectures(get_user_base_dir())
 
 def ensure_directory(directory):
     """디렉토리가 존재하는지 확인하고 없으면 생성"""
@@ -36,72 +38,103 @@ def ensure_directory(directory):
         os.makedirs(directory)
 
 def save_records_to_json(lecture_name, records):
-    """Save the current session's records.
+    """Submit the current session's records to be saved in the background.
 
     1. Writes to GitHub only when the user explicitly presses **기록 저장**.
-    2. Keeps an up-to-date cached list of JSON files so we don't query GitHub on
-       every Streamlit rerun (which happens whenever the user presses
-       **Record Time**).
+       The file is written to the local mirror first and then pushed to GitHub
+       on a worker thread (with retries) so the timer stays usable; if GitHub
+       keeps failing the file stays local and the next mirror sync uploads it.
+    2. Returns a `background.Job`.  `finish_save_job` applies the result to the
+       cached list of JSON files once the job is done, so we don't query GitHub
+       on every Streamlit rerun.
     """
 
     now_kst = datetime.now(tz=ZoneInfo("Asia/Seoul"))
     date = now_kst.strftime("%Y-%m-%d")
     timestamp = now_kst.strftime("%H%M%S")
     filename = f"{date}_{timestamp}.json"
+    payload = encode_records(records, lecture_name)
+    background.forget_prefetch(_user_id())
 
-    # --- primary: GitHub ---
+    # 작업 스레드는 session_state 를 볼 수 없으므로 필요한 값을 여기서 모두 넘긴다
+    args = (_user_id(), get_user_base_dir(), lecture_name, filename, payload,
+            st.session_state.get('selected_json_file'))
     if github_enabled():
-        if save_json(_user_id(), lecture_name, filename, records):
-            # 새 파일을 캐시에 반영하여 이후 rerun 에서 GitHub 호출이 발생하지 않도록 함
-            key = f"json_files_{lecture_name}"
-            new_path = f"github://{lecture_name}/{filename}"
-            st.session_state.setdefault(key, [])
-            if new_path not in st.session_state[key]:
-                st.session_state[key].insert(0, new_path)
-            return new_path
-
-    # --- fallback: local ---
-    try:
-        directory = os.path.join(get_user_base_dir(), lecture_name)
-        ensure_directory(directory)
-        file_path = os.path.join(directory, filename)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
-
-        # update local cache as well
-        key = f"json_files_{lecture_name}"
-        st.session_state.setdefault(key, [])
-        if file_path not in st.session_state[key]:
-            st.session_state[key].insert(0, file_path)
-
-        return file_path
-    except Exception as e:
-        st.error(f"JSON 파일 저장 중 오류: {e}")
+        return background.submit_job("기록 저장", _store_and_push, *args, fallback=_store_locally)
+    return background.submit_job("기록 저장", _store_locally, *args)
+
+def _store_and_push(user_id, base_dir, lecture_name, filename, payload, source):
+    file_path = _store_locally(user_id, base_dir, lecture_name, filename, payload, source)
+    mirror.push(user_id, base_dir, lecture_name, filename)
+    return file_path
+
+def _store_locally(user_id, base_dir, lecture_name, filename, payload, source):
+    directory = os.path.join(base_dir, lecture_name)
+    ensure_directory(directory)
+    file_path = os.path.join(directory, filename)
+    serialization.write_file(file_path, payload)
+    search_index.index_records(base_dir, lecture_name, filename, payload["records"])
+    catalog.update_record(base_dir, lecture_name, filename)
+    _carry_over_aligned(base_dir, lecture_name, source, file_path, payload["records"])
+    return file_path
+
+def finish_save_job(job, lecture_name):
+    """완료된 저장 작업의 결과를 세션 캐시에 반영. 저장된 경로(또는 None) 반환"""
+    saved_path = job.result()
+    if saved_path is None:
         return None
+    # 새 파일을 캐시에 반영하여 이후 rerun 에서 GitHub 호출이 발생하지 않도록 함
+    key = f"json_files_{lecture_name}"
+    st.session_state.setdefault(key, [])
+    if saved_path not in st.session_state[key]:
+        st.session_state[key].insert(0, saved_path)
+    st.session_state.selected_json_file = saved_path
+    return saved_path
+
+def _carry_over_aligned(base_dir, lecture_name, source, file_path, records):
+    """불러온 기록을 고쳐 새 파일로 저장한 경우, 원본 기록의 정렬 결과를 바뀐 슬라이드만
+    다시 계산하여 새 파일로 옮긴다 (SRT Parser 에서 전체 재정렬이 필요 없도록)."""
+    if not source or not os.path.exists(source):
+        return
+    if os.path.basename(os.path.dirname(source)) != lecture_name:
+        return
+    try:
+        alignment.carry_over(
+            base_dir, lecture_name,
+            os.path.basename(source), aligned_store.file_hash(source),
+            os.path.basename(file_path), aligned_store.file_hash(file_path),
+            records
+        )
+    except (OSError, ValueError):
+        pass
 
-def load_records_from_json(file_path_or_ref):
-    """Load records from local path or github ref (github://lecture/file)."""
+def load_record_payload(file_path_or_ref):
+    """Load a v2 record payload from a local path (the GitHub mirror when enabled).
+
+    v1 files (plain record lists) are upgraded transparently.
+    """
     if file_path_or_ref is None:
-        return []
-    if file_path_or_ref.startswith("github://"):
-        path_part = file_path_or_ref.replace("github://", "", 1)
-        lecture, filename = path_part.split("/", 1)
-        return load_json(_user_id(), lecture, filename)
+        return None
     try:
-        with open(file_path_or_ref, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        lecture = os.path.basename(os.path.dirname(file_path_or_ref))
+        return upgrade(serialization.read_file(file_path_or_ref), lecture)
     except Exception:
         st.error("JSON 파일 로드 중 오류")
-        return []
+        return None
+
+def load_records_from_json(file_path_or_ref):
+    """Load records (display form) from a local path."""
+    payload = load_record_payload(file_path_or_ref)
+    return decode_records(payload) if payload else []
 
 def get_existing_json_files(lecture_name):
     """Return previously saved JSON file list for a lecture.
 
-    To avoid a network round-trip to GitHub on every rerun we cache the values
-    in `st.session_state`.  The cache is refreshed only when:
-      • the user selects a different lecture (=> new cache key), or
-      • the user presses **기록 저장** which adds the newly created file to the
-        cached list (see `save_records_to_json`).
+    The listing is cached in `st.session_state`.  The cache is refreshed only when:
+      • the user selects a different lecture (=> new cache key),
+      • a **기록 저장** job finishes, which adds the newly created file to the
+        cached list (see `finish_save_job`), or
+      • a mirror sync brings in changes from GitHub (see `app.sync_storage`).
     """
 
     if not lecture_name:
@@ -113,19 +146,98 @@ def get_existing_json_files(lecture_name):
     if key in st.session_state:
         return st.session_state[key]
 
-    # Otherwise, fetch once and cache the result
-    if github_enabled():
-        files = [f"github://{lecture_name}/{name}" for name in list_json(_user_id(), lecture_name)]
-    else:
-        directory = os.path.join(get_user_base_dir(), lecture_name)
-        if os.path.exists(directory):
-            files = sorted(glob.glob(f"{directory}/*.json"), reverse=True)
-        else:
-            files = []
+    # Otherwise, fetch once and cache the result (using the post-login prefetch if it got there first)
+    files = background.prefetched_json_files(_user_id(), lecture_name)
+    if files is None:
+        files = catalog.record_paths(get_user_base_dir(), lecture_name)
 
     st.session_state[key] = files
     return files
 
+# 진행 중인 타이머는 shared_state 에도 남겨 둔다. 다른 replica 에서 새 세션을 열거나
+# 작업 프로세스가 죽은 뒤에도 같은 사용자는 이어서 기록할 수 있다.
+SHARED_TIMER_KEYS = (
+    "lecture_name", "timer_running", "timer_start", "start_time", "elapsed_time",
+    "last_slide_start_time", "records", "slide_number", "start_time_value", "selected_json_file",
+)
+_DATETIME_KEYS = ("timer_start", "start_time")
+
+def _timer_snapshot():
+    state = {key: st.session_state.get(key) for key in SHARED_TIMER_KEYS}
+    for key in _DATETIME_KEYS:
+        if state[key] is not None:
+            state[key] = state[key].isoformat()
+    return state
+
+def _snapshot_digest(state):
+    return hashlib.sha1(serialization.dumps(state)).hexdigest()
+
+def restore_shared_timer():
+    """새 세션이면 shared_state 에 남아 있는 진행 중인 타이머를 불러온다. 불러왔으면 True"""
+    state = shared_state.load_timer(_user_id())
+    if not state:
+        return False
+    try:
+        for key in _DATETIME_KEYS:
+            if state.get(key):
+                state[key] = datetime.fromisoformat(state[key])
+    except (TypeError, ValueError):
+        return False
+    if state.get("lecture_name") not in st.session_state.lecture_names:
+        state.pop("lecture_name", None)  # 그 사이 삭제된 강의
+    for key in SHARED_TIMER_KEYS:
+        if key in state:
+            st.session_state[key] = state[key]
+    st.session_state.shared_timer_digest = _snapshot_digest(_timer_snapshot())
+    return True
+
+def publish_shared_timer():
+    """타이머 상태가 바뀌었으면 shared_state 에 저장. 진행 중인 기록이 없으면 지운다."""
+    state = _timer_snapshot()
+    idle = not state["timer_running"] and not state["records"] and not state["elapsed_time"]
+    digest = None if idle else _snapshot_digest(state)
+    if digest == st.session_state.get('shared_timer_digest'):
+        return
+    if idle:
+        stored = shared_state.clear_timer(_user_id())
+    else:
+        stored = shared_state.save_timer(_user_id(), state)
+    if stored:
+        st.session_state.shared_timer_digest = digest
+
+def save_status():
+    """진행 중인 저장 작업의 상태 표시. 작업이 있는 동안만 1초마다 이 부분만 다시 그린다."""
+    job = st.session_state.get('save_job')
+
+    @st.fragment(run_every=1 if job is not None else None)
+    def _render():
+        job = st.session_state.get('save_job')
+        if job is None:
+            message = st.session_state.get('save_message')
+            if message:
+                (st.warning if message[0] == "warning" else st.success)(message[1])
+            return
+        if not job.done():
+            st.info(f"⏳ {job.status()}")
+            return
+        # 작업이 끝났으면 결과를 반영하고 전체를 다시 그려 기록 목록을 갱신한다
+        saved_path = finish_save_job(job, st.session_state.pop('save_job_lecture', None))
+        st.session_state.save_job = None
+        if saved_path is None:
+            st.session_state.save_message = ("warning", job.status())
+        elif job.used_fallback:
+            st.session_state.save_message = (
+                "warning", f"GitHub 저장에 실패하여 로컬에만 저장했습니다 (다음 동기화 때 다시 올립니다): {saved_path}"
+            )
+        else:
+            st.session_state.save_message = ("success", f"JSON 파일이 저장되었습니다: {saved_path}")
+        st.rerun()
+
+    _render()
+    # 메시지는 저장 직후 한 번만 보여준다
+    if job is None:
+        st.session_state.pop('save_message', None)
+
 def lecture_timer_tab():
     """Slide Timer 탭 구현"""
     #st.header("Slide Timer")
@@ -133,6 +245,8 @@ def lecture_timer_tab():
     # 세션 상태 초기화
     if 'lecture_names' not in st.session_state:
         st.session_state.lecture_names = load_lecture_names()
+    if 'timer_running' not in st.session_state and restore_shared_timer():
+        st.toast("진행 중이던 강의 기록을 이어서 불러왔습니다.")
     if 'timer_running' not in st.session_state:
         st.session_state.timer_running = False
     if 'start_time' not in st.session_state:
@@ -196,7 +310,8 @@ def lecture_timer_tab():
                 st.session_state.selected_json_file = None
             else:
                 file_path = json_files[selected_index - 1]
-                records = load_records_from_json(file_path)
+                payload = load_record_payload(file_path)
+                records = decode_records(payload) if payload else []
                 if records:
                     st.session_state.records = records
                     st.session_state.selected_json_file = file_path
@@ -206,13 +321,12 @@ def lecture_timer_tab():
                     # 마지막 슬라이드의 종료 시간 설정
                     last_record = records[-1]
                     st.session_state.last_slide_start_time = last_record["end_time"]
-                    # 시작 시간 설정
+                    # 시작 시간 설정 (v2 는 밀리초로 저장되어 있어 파싱이 필요 없음)
                     try:
-                        start_time_str = records[-1]["end_time"]
-                        st.session_state.start_time = datetime.strptime(start_time_str, "%H:%M:%S.%f")
-                        st.session_state.start_time_value = start_time_str
+                        last_end_time = datetime(1900, 1, 1) + timedelta(milliseconds=record_time_ms(payload["records"][-1], "end"))
+                        st.session_state.start_time = last_end_time
+                        st.session_state.start_time_value = last_record["end_time"]
                         # 경과 시간 계산 (마지막 종료 시간 - 시작 시간)
-                        last_end_time = datetime.strptime(last_record["end_time"], "%H:%M:%S.%f")
                         st.session_state.elapsed_time = (last_end_time - st.session_state.start_time).total_seconds() * 1000
                     except ValueError:
                         st.session_state.start_time = None
@@ -418,16 +532,12 @@ def lecture_timer_tab():
             st.session_state["notes_input"] = ""
             st.rerun()
 
-        # JSON 저장
-        if st.button("기록 저장", use_container_width=True, disabled=not st.session_state.records):
-            json_file_path = save_records_to_json(
-                lecture_name,
-                st.session_state.records
-            )
-            
-            if json_file_path:
-                st.success(f"JSON 파일이 저장되었습니다: {json_file_path}")
-                st.session_state.selected_json_file = json_file_path
+        # JSON 저장 (백그라운드에서 진행되며, 그동안에도 기록을 계속할 수 있다)
+        save_pending = st.session_state.get('save_job') is not None
+        if st.button("기록 저장", use_container_width=True, disabled=not st.session_state.records or save_pending):
+            st.session_state.save_job = save_records_to_json(lecture_name, st.session_state.records)
+            st.session_state.save_job_lecture = lecture_name
+        save_status()
 
     with right_col:
         # 기록된 시간 표시
@@ -449,4 +559,6 @@ def lecture_timer_tab():
             if edited_df is not None:
                 st.session_state.records = edited_df.to_dict('records')
         else:
-            st.info("표시할 기록이 없습니다.")
\ No newline at end of file
+            st.info("표시할 기록이 없습니다.")
+
+    publish_shared_timer()
\ No newline at end of file
@@ -1,141 +1,135 @@
 import pandas as pd
-import re
-from datetime import datetime
 import streamlit as st
-import json
 import os
+import serialization
+import search_index
+import aligned_store
+import alignment
+import calibration
+import session_memory
+import catalog
 from utils import get_user_base_dir
-
-def parse_srt_time(time_str):
-    """SRT 및 CSV 시간 문자열을 초 단위로 변환"""
-    time_str = time_str.replace('.', ',')
-    try:
-        time_obj = datetime.strptime(time_str, "%H:%M:%S,%f")
-        return time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1e6
-    except ValueError as e:
-        raise ValueError(f"Invalid time format: {time_str}. Expected HH:MM:SS,fff") from e
-
-def read_srt_file(srt_content):
-    """SRT 파일 내용을 읽고 자막 데이터를 파싱"""
-    subtitles = []
-    blocks = srt_content.strip().split('\n\n')
-    
-    for block in blocks:
-        lines = block.strip().split('\n')
-        if len(lines) < 3:
-            continue
-        index = lines[0]
-        time_range = lines[1]
-        text = ' '.join(lines[2:]).replace('\n', ' ')
-        
-        try:
-            start_time, end_time = re.match(r"(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})", time_range).groups()
-            subtitles.append({
-                'index': index,
-                'start_time': parse_srt_time(start_time),
-                'end_time': parse_srt_time(end_time),
-                'text': text
-            })
-        except (re.error, ValueError):
-            continue
-    
-    return subtitles
+from record_schema import validate_records, format_time_ms
+from captions import parse_srt_time, read_srt_file, read_captions, collapse_rolling, UPLOAD_TYPES  # parse_srt_time / read_srt_file 은 이전 import 경로 호환용
 
 def get_available_lectures():
-    """lectures 디렉토리에서 사용 가능한 강의 목록 가져오기"""
-    timer_logs_dir = get_user_base_dir()
-    lectures = []
-    
-    if os.path.exists(timer_logs_dir):
-        for lecture_name in os.listdir(timer_logs_dir):
-            lecture_path = os.path.join(timer_logs_dir, lecture_name)
-            if os.path.isdir(lecture_path):
-                lectures.append(lecture_name)
-    
-    return lectures
+    """사용 가능한 강의 목록 가져오기 (사용자 카탈로그)"""
+    return catalog.lectures(get_user_base_dir())
 
 def get_json_files_for_lecture(lecture_name):
-    """특정 강의 디렉토리에서 사용 가능한 JSON 파일 목록 가져오기"""
+    """특정 강의에서 사용 가능한 JSON 파일 목록 가져오기 (사용자 카탈로그)"""
     if not lecture_name:
         return []
-    timer_logs_dir = os.path.join(get_user_base_dir(), lecture_name)
-    json_files = []
-    
-    if os.path.exists(timer_logs_dir):
-        for file_name in os.listdir(timer_logs_dir):
-            if file_name.endswith('.json'):
-                json_files.append(file_name)
-    
-    return json_files
+    return catalog.record_names(get_user_base_dir(), lecture_name)
+
+def _split_json_path(json_path):
+    """timer_logs/<user>/<lecture>/<record>.json -> (base_dir, lecture, record)"""
+    lecture_dir, record = os.path.split(json_path)
+    base_dir, lecture = os.path.split(lecture_dir)
+    return base_dir, lecture, record
 
 def load_json_file(json_path):
-    """JSON 파일에서 타이머 기록 로드"""
+    """JSON 파일에서 타이머 기록을 로드하고 검증. (표준 v2 payload, 파일 내용 해시) 반환"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        payload = validate_records(serialization.loads(raw), _split_json_path(json_path)[1])
+        return payload, aligned_store.content_hash(raw)
     except Exception as e:
         st.error(f"JSON 파일 로드 중 오류: {e}")
-        return []
+        return None, None
+
+def _slides_frame(slides):
+    return pd.DataFrame(slides) if slides else None
 
-def process_files(srt_file=None, json_path=None):
-    """JSON과 SRT 파일을 처리하여 슬라이드별로 자막을 합쳐 데이터프레임 반환"""
+def load_aligned_result(json_path):
+    """SRT 를 다시 올리지 않아도, 현재 기록 파일에 대해 저장된 정렬 결과가 있으면 반환"""
+    try:
+        record_hash = aligned_store.file_hash(json_path)
+    except OSError:
+        return None
+    base_dir, lecture, record = _split_json_path(json_path)
+    artifact = aligned_store.load(base_dir, lecture, record, record_hash)
+    return _slides_frame(artifact["slides"]) if artifact else None
+
+def process_files(srt_file=None, json_path=None, collapse=False, calibrate=False):
+    """JSON과 SRT 파일을 처리하여 슬라이드별로 자막을 합쳐 데이터프레임 반환.
+
+    같은 (SRT, 기록 파일, 정렬 버전) 조합의 결과가 저장되어 있으면 그대로 사용한다.
+    collapse=True 면 정렬 전에 롤링 자막의 반복 구간을 잘라내고, 줄어든 양을
+    session_state.cue_stats 에 남긴다.
+    calibrate=True 면 정렬 전에 기록 시간과 자막 시간 사이의 차이 (와 시계 drift) 를 찾아
+    기록 구간에 적용하고, 보정 정보를 session_state.time_calibration 에 남긴다.
+    """
     # 타이머 기록 읽기 (JSON 파일)
     if json_path:
-        records = load_json_file(json_path)
-        df = pd.DataFrame(records)
+        payload, record_hash = load_json_file(json_path)
+        if payload is None:
+            return None
     else:
         st.error("타이머 기록(JSON) 필요")
         return None
     
-    # SRT 파일 읽기 (Streamlit UploadedFile 처리)
-    srt_content = srt_file.read().decode('utf-8')
-    subtitles = read_srt_file(srt_content)
-    
-    # 출력 데이터 준비
-    output_data = []
-    
-    # 각 슬라이드별로 자막 매핑
-    for _, row in df.iterrows():
-        slide_num = row['slide_number'] if 'slide_number' in df.columns else row['Slide Number']
-        start_time = parse_srt_time(row['start_time'] if 'start_time' in df.columns else row['Start Time'])
-        end_time = parse_srt_time(row['end_time'] if 'end_time' in df.columns else row['End Time'])
-        
-        # 해당 시간 구간에 속하는 자막 텍스트 수집
-        slide_texts = []
-        for subtitle in subtitles:
-            if subtitle['start_time'] >= start_time and subtitle['end_time'] <= end_time:
-                slide_texts.append(subtitle['text'])
-        
-        # 자막 텍스트를 공백으로 합침
-        combined_text = ' '.join(slide_texts)
-        
-        if combined_text:  # 텍스트가 있는 경우에만 추가
-            output_data.append({
-                'Slide Number': slide_num,
-                'Text': combined_text
-            })
+    # 자막 파일 읽기 (Streamlit UploadedFile 처리. SRT / WebVTT / SBV)
+    srt_bytes = srt_file.getvalue()
+    srt_hash = aligned_store.content_hash(srt_bytes)
+    # 중복 제거 / 시간 보정을 거친 결과는 원본 큐로 만든 결과와 다른 키로 저장한다
+    variant = [name for name, enabled in (("rolling", collapse), ("calibrated", calibrate)) if enabled]
+    if variant:
+        srt_hash = aligned_store.content_hash(":".join([srt_hash] + variant).encode())
+    base_dir, lecture, record = _split_json_path(json_path)
+    st.session_state.cue_stats = None
+    st.session_state.time_calibration = None
+    artifact = aligned_store.load(base_dir, lecture, record, record_hash, srt_hash)
+    if artifact is not None:
+        st.session_state.cue_stats = artifact.get("cue_stats")
+        st.session_state.time_calibration = artifact.get("calibration")
+        return _slides_frame(artifact["slides"])
+
+    # 같은 SRT 로 정렬한 이전 결과가 있으면 (기록만 수정된 경우) 바뀐 구간만 다시 계산
+    previous = aligned_store.latest_for_srt(base_dir, lecture, record, srt_hash)
+    cue_stats = None
+    if previous is not None:
+        cues = [tuple(c) for c in previous['cues']]
+        cue_stats = previous.get('cue_stats')
+    else:
+        # 형식을 판별해 기록과 같은 정수 밀리초 좌표의 큐로 읽는다
+        # (아주 큰 파일은 여러 프로세스로 나눠 파싱한다. 결과는 같음)
+        cues = read_captions(srt_bytes)
+        if collapse:
+            cues, cue_stats = collapse_rolling(cues)
+    records, time_fit = payload['records'], None
+    if calibrate:
+        records, time_fit = calibration.calibrate(records, cues)
+    if previous is not None:
+        result = alignment.realign(previous, records, cues)
+    else:
+        result = alignment.align(records, cues)
+    st.session_state.cue_stats = cue_stats
+    st.session_state.time_calibration = time_fit
+    try:
+        aligned_store.save(base_dir, lecture, record, srt_hash, record_hash, result, cues, cue_stats, time_fit)
+    except OSError:
+        pass  # 결과 저장 실패는 캐시를 못 쓰는 것일 뿐, 파싱 결과는 그대로 보여준다
     
     # 데이터프레임 반환
-    if output_data:
-        return pd.DataFrame(output_data)
-    else:
-        return None
+    return _slides_frame(result["slides"])
 
 def srt_parser_tab():
     """SRT Parser 탭 구현"""
-    # 초기화
-    if 'result_df' not in st.session_state:
-        st.session_state.result_df = None
-    
+    # 정렬 결과 DataFrame 은 클 수 있으므로 session_memory 로 관리한다 (유휴 시 디스크로 내보냄)
+    result_df = session_memory.get('result_df')
+
     # 레이아웃 설정
     col1, col2 = st.columns([1, 2])  # 좌측: 파일 업로드, 우측: 결과
     
     with col1:
         # st.subheader("File Upload")
-        # SRT 파일 업로드
-        srt_file = st.file_uploader("SRT 파일 업로드", type=["srt"], key="srt_uploader")
+        # 자막 파일 업로드 (SRT / WebVTT / SBV)
+        srt_file = st.file_uploader("자막 파일 업로드 (SRT, VTT, SBV)", type=UPLOAD_TYPES, key="srt_uploader")
         
         # 강의 선택 및 JSON 파일 선택
+        json_path = None
         available_lectures = get_available_lectures()
         if available_lectures:
             selected_lecture = st.selectbox(
@@ -163,27 +157,73 @@ def srt_parser_tab():
                 )
                 if selected_json_file:
                     json_path = os.path.join(get_user_base_dir(), selected_lecture, selected_json_file)
-            else:
-                json_path = None
         else:
             st.info("등록된 강의가 없습니다.")
-            json_path = None
+
+        # 기록을 바꿔 선택하면, 그 기록에 대해 저장된 정렬 결과를 바로 보여준다
+        if json_path and st.session_state.get('result_source') != json_path:
+            st.session_state.result_source = json_path
+            st.session_state.cue_stats = None
+            st.session_state.time_calibration = None
+            result_df = load_aligned_result(json_path)
+            session_memory.put('result_df', result_df)
         
+        collapse = st.toggle(
+            "반복 자막 합치기",
+            value=True,
+            key="collapse_rolling",
+            help="자동 생성 자막처럼 앞 자막의 끝부분이 다음 자막에 반복되면, 반복된 부분을 한 번만 남깁니다.",
+        )
+        calibrate = st.toggle(
+            "시간 자동 보정",
+            value=True,
+            key="calibrate_offset",
+            help="기록의 시작 시각이 녹화 시작과 다르면 (벽시계 시각으로 기록한 경우 등) 자막 사이 빈틈과 "
+                 "슬라이드 경계가 가장 잘 맞는 시간 차이와 시계 오차를 찾아 적용합니다.",
+        )
+
         # 처리 버튼
         if st.button("Parse SRT", type='primary', use_container_width=True, disabled=not (srt_file and json_path)):
             if srt_file is None:
-                st.error("SRT 파일을 업로드 해주세요.")
+                st.error("자막 파일을 업로드 해주세요.")
             elif json_path is None:
                 st.error("JSON 파일을 선택해주세요.")
             else:
                 with st.spinner("Processing..."):
-                    st.session_state.result_df = process_files(srt_file, json_path)
+                    result_df = process_files(srt_file, json_path, collapse=collapse, calibrate=calibrate)
+                session_memory.put('result_df', result_df)
+                if result_df is not None:
+                    search_index.index_transcript(
+                        get_user_base_dir(),
+                        selected_lecture,
+                        selected_json_file,
+                        zip(result_df['Slide Number'], result_df['Text'])
+                    )
+
+        # 반복 자막을 합쳐서 줄어든 양
+        cue_stats = st.session_state.get('cue_stats')
+        if cue_stats and result_df is not None and cue_stats["chars_in"]:
+            saved = 1 - cue_stats["chars_out"] / cue_stats["chars_in"]
+            st.caption(
+                f"반복 자막 합치기: 자막 {cue_stats['cues_in']:,}개 → {cue_stats['cues_out']:,}개, "
+                f"텍스트 {cue_stats['chars_in']:,}자 → {cue_stats['chars_out']:,}자 ({saved:.0%} 감소)"
+            )
+
+        # 기록 시간을 자막 시간에 맞춘 보정
+        time_fit = st.session_state.get('time_calibration')
+        if time_fit and time_fit["applied"] and result_df is not None:
+            sign = "-" if time_fit["shift_ms"] < 0 else "+"
+            drift = f", 시계 오차 {time_fit['scale'] - 1:+.3%}" if time_fit["scale"] != 1 else ""
+            st.caption(
+                f"시간 자동 보정: 기록 시간 {sign}{format_time_ms(abs(time_fit['shift_ms']))}{drift} → "
+                f"자막 {time_fit['cues']:,}개 중 {time_fit['kept_after']:,}개 사용 (보정 전 {time_fit['kept_before']:,}개)"
+            )
     
     with col2:
         st.subheader("Parsed SRT")
-        if st.session_state.result_df is not None:
-            if not st.session_state.result_df.empty:
-                for _, row in st.session_state.result_df.iterrows():
+        if result_df is not None:
+            if not result_df.empty:
+                for _, row in result_df.iterrows():
                     st.markdown(f'<div class="slide-number">Slide {row["Slide Number"]}</div>', unsafe_allow_html=True)
                     # 마크다운 코드 블록으로 텍스트 출력 (문자열 분리)
                     text_content = row['Text']
@@ -192,4 +232,4 @@ def srt_parser_tab():
             else:
                 st.warning("추출된 내용이 없습니다.")
         else:
-            st.info("SRT 파일을 업로드하고, JSON 파일을 선택해주세요.")
\ No newline at end of file
+            st.info("자막 파일을 업로드하고, JSON 파일을 선택해주세요.")
\ No newline at end of file